@@ -1,5 +1,6 @@
 import streamlit as st
 from utils.auth import check_authentication, logout
+from utils.metrics import timed_page
 
 # Page configuration
 st.set_page_config(
@@ -9,6 +10,7 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@timed_page("Home")
 def main():
     # Check authentication first
     if not check_authentication():
@@ -26,6 +28,10 @@ def main():
         st.page_link("pages/1_Dashboard.py", label="Dashboard", icon="📈")
         st.page_link("pages/2_Live_Update.py", label="Live Update", icon="⏱️") 
         st.page_link("pages/3_Historical.py", label="Historical Entry", icon="📅")
+        st.page_link("pages/4_Browse.py", label="Browse History", icon="🗂️")
+        st.page_link("pages/5_Analytics.py", label="Analytics", icon="📊")
+        st.page_link("pages/6_Search.py", label="Search", icon="🔎")
+        st.page_link("pages/7_Map.py", label="Map", icon="🗺️")
         
         st.divider()
         
@@ -0,0 +1,73 @@
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.generator import generate_activities
+from utils.sqlite_handler import SQLiteHandler
+from utils.formatting import format_activities_table
+
+def per_row_table(handler, activities, description_length=50):
+    """The Dashboard's original path: format each dict, then build a second list"""
+    rows = []
+    for activity in activities:
+        formatted = handler.format_activity_for_display(activity)
+        rows.append({
+            "Time": formatted.get("timestamp", "N/A"),
+            "Type": formatted.get("type", "N/A").title(),
+            "Location": formatted.get("location", "Not specified"),
+            "Score": formatted.get("perception_score", "N/A"),
+            "Description": formatted.get("description", "No description")[:description_length] + ("..." if len(str(formatted.get("description", ""))) > description_length else ""),
+            "Tags": formatted.get("tags", "")
+        })
+    return pd.DataFrame(rows)
+
+def _measure(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    
+    # Separate run for memory, since tracing slows the timed runs down
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_mb": round(peak / 1024 / 1024, 1)}
+
+def run(row_counts=(10_000, 1_000_000), repeat=3, seed=0):
+    """Time both formatters at each row count; returns one result dict per count"""
+    handler = SQLiteHandler.__new__(SQLiteHandler)  # the formatters need no cache or connection
+    results = []
+    for count in row_counts:
+        activities = list(generate_activities(count, seed))
+        # Larger inputs get a single timed run
+        runs = repeat if count <= 100_000 else 1
+        per_row = _measure(lambda: per_row_table(handler, activities), runs)
+        vectorized = _measure(lambda: format_activities_table(activities), runs)
+        results.append({
+            "rows": count,
+            "per_row": per_row,
+            "vectorized": vectorized,
+            "speedup": round(per_row["seconds"] / vectorized["seconds"], 1) if vectorized["seconds"] else None
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-row and vectorized activity table formatters")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000], help="Row counts to test (default: 10000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per size up to 100k rows; the best is kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    print(f"{'rows':>10}  {'per-row s':>10}  {'peak MB':>8}  {'vector s':>10}  {'peak MB':>8}  {'speedup':>7}")
+    for result in run(args.rows, args.repeat, args.seed):
+        print(
+            f"{result['rows']:>10}  {result['per_row']['seconds']:>10}  {result['per_row']['peak_mb']:>8}  "
+            f"{result['vectorized']['seconds']:>10}  {result['vectorized']['peak_mb']:>8}  {result['speedup']:>6}x"
+        )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,151 @@
+import io
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+# Tags follow a Zipf distribution: a few are on most activities, most are rare
+TAG_VOCABULARY = [
+    "work", "family", "friends", "exercise", "outdoors", "reading", "music", "cooking", "travel", "coffee",
+    "meeting", "walk", "running", "gym", "yoga", "cycling", "study", "gaming", "movies", "shopping",
+    "cleaning", "gardening", "volunteering", "podcast", "meditation", "swimming", "hiking", "concert",
+    "museum", "restaurant", "commute", "doctor", "kids", "pets", "writing", "painting", "photography",
+    "language", "coding", "chores", "date night", "birthday", "holiday", "beach", "camping", "climbing",
+    "tennis", "football", "basketball", "dancing", "theatre", "board games", "baking", "errands",
+    "nap", "journaling", "sauna", "market", "road trip", "festival"
+]
+TAG_WEIGHTS = list(accumulate(1 / (rank + 1) for rank in range(len(TAG_VOCABULARY))))
+
+PLACES = ["Home", "Office", "Park", "Gym", "Cafe", "Library", "Beach", "Trail", "Restaurant", "Station", "School", "Market"]
+
+# Where someone spends their time: (lat, lng, spread in degrees, share of located activities)
+REGIONS = [
+    (52.52, 13.40, 0.05, 0.55),
+    (52.48, 13.30, 0.01, 0.25),
+    (48.86, 2.35, 0.08, 0.10),
+    (41.39, 2.17, 0.10, 0.07),
+    (40.71, -74.01, 0.10, 0.03),
+]
+REGION_WEIGHTS = list(accumulate(region[3] for region in REGIONS))
+
+# Perception scores -5 .. +5, leaning positive like self-reported mood
+SCORE_WEIGHTS = list(accumulate(math.exp(-((score - 1.5) ** 2) / (2 * 2.2 ** 2)) for score in range(-5, 6)))
+
+# Activities by hour of day, quiet at night and busiest in the evening
+HOUR_WEIGHTS = list(accumulate([1, 1, 1, 1, 1, 2, 4, 7, 9, 9, 8, 8, 9, 8, 8, 8, 9, 10, 12, 13, 12, 9, 5, 2]))
+
+WORDS = (
+    "had a great time with the team today went for a long walk in the park after lunch felt tired but "
+    "happy finally finished the book we talked about plans for the weekend quick session before work "
+    "met an old friend for coffee the weather was perfect rainy afternoon spent inside cooking dinner"
+).split()
+
+STORAGE_URL = "http://127.0.0.1/storage/v1/object/public/activity-media"
+
+def _media_url(rng, file_type, extension):
+    digest = f"{rng.getrandbits(256):064x}"
+    return f"{STORAGE_URL}/{file_type}s/{digest[:2]}/{digest}.{extension}"
+
+def generate_activity(rng, created_at):
+    """One synthetic activity row, shaped like the activities table, created at created_at"""
+    activity_type = "live" if rng.random() < 0.7 else "historical"
+    if activity_type == "live":
+        # Logged when the timer stops
+        timer_duration = int(rng.lognormvariate(math.log(40 * 60), 0.8))
+        timestamp = created_at - timedelta(seconds=timer_duration)
+    else:
+        timer_duration = None
+        timestamp = created_at - timedelta(days=rng.expovariate(1 / 3), hours=rng.uniform(0, 12))
+    
+    location = None
+    if rng.random() < 0.8:
+        lat, lng, spread, _ = rng.choices(REGIONS, cum_weights=REGION_WEIGHTS)[0]
+        location = {
+            "lat": round(rng.gauss(lat, spread), 6),
+            "lng": round(rng.gauss(lng, spread), 6),
+            "description": rng.choice(PLACES) if rng.random() < 0.6 else ""
+        }
+    elif rng.random() < 0.5:
+        location = {"lat": None, "lng": None, "description": rng.choice(PLACES)}
+    
+    tags = []
+    for tag in rng.choices(TAG_VOCABULARY, cum_weights=TAG_WEIGHTS, k=rng.choice([0, 1, 1, 2, 2, 3, 4])):
+        if tag not in tags:
+            tags.append(tag)
+    
+    word_count = int(rng.lognormvariate(math.log(12), 0.9)) if rng.random() < 0.75 else 0
+    description = " ".join(rng.choices(WORDS, k=word_count)).capitalize()
+    
+    media_urls, thumbnail_urls = [], []
+    if rng.random() < 0.15:
+        for _ in range(rng.randint(1, 4)):
+            if rng.random() < 0.85:
+                media_urls.append(_media_url(rng, "image", "jpg"))
+                thumbnail_urls.append(_media_url(rng, "thumbnail", "jpg"))
+            else:
+                media_urls.append(_media_url(rng, "video", "mp4"))
+    
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "created_at": created_at.isoformat(),
+        "timestamp": timestamp.isoformat(),
+        "type": activity_type,
+        "location": location,
+        "perception_score": rng.choices(range(-5, 6), cum_weights=SCORE_WEIGHTS)[0],
+        "tags": tags,
+        "description": description,
+        "timer_duration": timer_duration,
+        "media_urls": media_urls,
+        "thumbnail_urls": thumbnail_urls
+    }
+
+def generate_activities(count, seed=0, end=None, days=730):
+    """Yield count activities in created_at order, spread over `days` days up to end (default now)
+
+    The same seed always gives the same activities (apart from end).
+    """
+    rng = random.Random(seed)
+    end = end or datetime.now(timezone.utc)
+    start = end - timedelta(days=days)
+    # Sorted creation times, each on a weighted hour of its day
+    created = sorted(
+        start + timedelta(days=rng.randrange(days), hours=rng.choices(range(24), cum_weights=HOUR_WEIGHTS)[0], seconds=rng.uniform(0, 3600))
+        for _ in range(count)
+    )
+    for created_at in created:
+        yield generate_activity(rng, created_at)
+
+class UploadedFile(io.BytesIO):
+    """In-memory stand-in for Streamlit's UploadedFile: a named, sized, seekable file"""
+    
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+def generate_media_files(count, seed=0, photo_size=(2400, 1800), video_bytes=2 * 1024 * 1024):
+    """Upload-ready photos (JPEG, about nine in ten) and videos with content unique to the seed
+
+    Photos are smooth gradients with noise, which compress like camera
+    pictures rather than like flat colour; videos are random bytes.
+    """
+    from PIL import Image, ImageDraw
+    
+    rng = random.Random(seed)
+    files = []
+    for index in range(count):
+        if rng.random() < 0.9:
+            image = Image.linear_gradient("L").resize(photo_size).convert("RGB")
+            draw = ImageDraw.Draw(image)
+            for _ in range(200):
+                x, y = rng.randrange(photo_size[0]), rng.randrange(photo_size[1])
+                colour = tuple(rng.randrange(256) for _ in range(3))
+                draw.ellipse((x, y, x + rng.randint(20, 300), y + rng.randint(20, 300)), fill=colour)
+            image = Image.blend(image, Image.effect_noise(photo_size, 40).convert("RGB"), 0.15)
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=90)
+            files.append(UploadedFile(f"photo_{seed}_{index}.jpg", buffer.getvalue()))
+        else:
+            files.append(UploadedFile(f"clip_{seed}_{index}.mp4", rng.randbytes(video_bytes)))
+    return files
\ No newline at end of file
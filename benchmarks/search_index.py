@@ -0,0 +1,55 @@
+import argparse
+import time
+from itertools import islice
+
+from benchmarks.generator import generate_activities
+from utils.search import SearchIndex
+
+# Activities handed to the index per add() call
+BATCH_SIZE = 10_000
+
+# From very common description words down to rare tags, and multi-word queries
+DEFAULT_QUERIES = ["time", "walk park", "coffee friend", "work", "rainy cooking", "festival", "sauna beach", "home"]
+
+def run(count=1_000_000, queries=DEFAULT_QUERIES, page_size=25, repeat=5, seed=0):
+    """Build an index of count documents and time each query's first and a deep page
+
+    Returns {"rows", "build_seconds", "queries": [...]} with the best of
+    `repeat` timings in milliseconds.
+    """
+    index = SearchIndex()
+    activities = generate_activities(count, seed)
+    started = time.perf_counter()
+    while batch := list(islice(activities, BATCH_SIZE)):
+        index.add(batch)
+    build_seconds = time.perf_counter() - started
+    
+    results = []
+    for query in queries:
+        timings = {}
+        for label, offset in (("first_page_ms", 0), ("page_41_ms", 40 * page_size)):
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                index.search(query, page_size, offset)
+                best = min(best, time.perf_counter() - started)
+            timings[label] = round(best * 1000, 2)
+        results.append({"query": query, **timings})
+    return {"rows": count, "build_seconds": round(build_seconds, 1), "queries": results}
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the in-process search index on synthetic activities")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Documents to index (default: 1000000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query; the best is kept (default: 5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("queries", nargs="*", default=DEFAULT_QUERIES, help="Queries to time")
+    args = parser.parse_args()
+    
+    result = run(args.rows, args.queries, repeat=args.repeat, seed=args.seed)
+    print(f"Indexed {result['rows']} activities in {result['build_seconds']} s")
+    print(f"{'query':<16}  {'page 1 ms':>10}  {'page 41 ms':>10}")
+    for timing in result["queries"]:
+        print(f"{timing['query']:<16}  {timing['first_page_ms']:>10}  {timing['page_41_ms']:>10}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,446 @@
+import argparse
+import base64
+import json
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from utils.query import ACTIVITY_FIELDS, DESCRIPTION_PREVIEW_LENGTH
+from utils.rollups import ROLLUP_TABLE
+
+# Rows are kept as tuples in this column order, which takes about half the
+# memory of dicts at a million rows
+COLUMNS = list(ACTIVITY_FIELDS)
+COLUMN_INDEX = {column: index for index, column in enumerate(COLUMNS)}
+CREATED_AT = COLUMN_INDEX["created_at"]
+
+STORAGE_BUCKET = "activity-media"
+COMPARISONS = {
+    "eq": lambda value, operand: value == operand,
+    "neq": lambda value, operand: value != operand,
+    "gt": lambda value, operand: value > operand,
+    "gte": lambda value, operand: value >= operand,
+    "lt": lambda value, operand: value < operand,
+    "lte": lambda value, operand: value <= operand,
+}
+
+class StandInError(Exception):
+    """An error answered with a PostgREST-shaped JSON body"""
+    
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+def _operand(value, operand):
+    # Query string values are text; compare them as the column's type
+    if isinstance(value, bool):
+        return operand == "true"
+    if isinstance(value, (int, float)):
+        return float(operand)
+    return operand
+
+def _parse_filter(column, expression):
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, operand = expression.partition(".")
+    if op == "is":
+        expected = {"null": None, "true": True, "false": False}.get(operand, ...)
+        if expected is ...:
+            raise StandInError(400, "PGRST100", f'"failed to parse filter (is.{operand})"')
+        test = lambda value: value is expected
+    elif op in COMPARISONS:
+        compare = COMPARISONS[op]
+        test = lambda value: value is not None and compare(value, _operand(value, operand))
+    else:
+        raise StandInError(400, "PGRST100", f'"failed to parse filter ({expression})" is not supported by the stand-in')
+    return column, (lambda value: not test(value)) if negate else test
+
+def _sort_key(value):
+    # Nulls sort before every value
+    return (False, 0) if value is None else (True, value)
+
+def _parse_select(select):
+    # [(output name, column)], e.g. "description:description_preview"
+    fields = []
+    for item in (select or "*").split(","):
+        name, _, column = item.strip().partition(":")
+        fields.append((name, column or name))
+    return fields
+
+class StandInDatabase:
+    """In-memory activities, daily rollups, tag counts and storage objects
+
+    Activities are kept sorted by created_at, which plays the part of the
+    created_at index: the newest rows are a slice and today's count is a
+    binary search. Rollups are folded in as rows arrive, like the
+    increment_activity_rollups function.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self.lock:
+            self.rows = []
+            self.created = []
+            self.ids = set()
+            self.rollups = {}
+            self.tag_counts = {}
+            self.objects = {}
+            self.uploads = {}
+    
+    def load(self, activities):
+        """Replace the activities with rows from an iterable of dicts in created_at order"""
+        self.reset()
+        rollup_rows = []
+        for activity in activities:
+            self._append(activity)
+            rollup_rows.append({
+                "activity_timestamp": activity.get("timestamp"),
+                "activity_type": activity.get("type"),
+                "score": activity.get("perception_score"),
+                "duration": activity.get("timer_duration")
+            })
+            if len(rollup_rows) >= 10_000:
+                self.increment_rollups(rollup_rows)
+                rollup_rows = []
+        self.increment_rollups(rollup_rows)
+        return len(self.rows)
+    
+    def _append(self, activity):
+        activity.setdefault("id", str(uuid.uuid4()))
+        activity.setdefault("created_at", _now())
+        row = tuple(activity.get(column) for column in COLUMNS)
+        # Rows arrive in created_at order, so this is nearly always an append
+        position = len(self.rows)
+        if self.created and row[CREATED_AT] < self.created[-1]:
+            position = bisect_right(self.created, row[CREATED_AT])
+        self.rows.insert(position, row)
+        self.created.insert(position, row[CREATED_AT])
+        self.ids.add(row[COLUMN_INDEX["id"]])
+        return row
+    
+    def insert(self, activities, ignore_duplicates=False):
+        """Insert rows and return the ones inserted, as dicts"""
+        inserted = []
+        with self.lock:
+            for activity in activities:
+                unknown = set(activity) - set(COLUMNS)
+                if unknown:
+                    raise StandInError(400, "PGRST204", f"Could not find the '{sorted(unknown)[0]}' column of 'activities' in the schema cache")
+                if activity.get("id") in self.ids:
+                    if ignore_duplicates:
+                        continue
+                    raise StandInError(409, "23505", 'duplicate key value violates unique constraint "activities_pkey"')
+                inserted.append(dict(zip(COLUMNS, self._append(dict(activity)))))
+        return inserted
+    
+    def increment_rollups(self, rows):
+        with self.lock:
+            for row in rows:
+                key = ((row.get("activity_timestamp") or _now())[:10], row.get("activity_type"))
+                rollup = self.rollups.setdefault(key, [0, 0, 0, 0, 0])
+                rollup[0] += 1
+                if row.get("score") is not None:
+                    rollup[1] += 1
+                    rollup[2] += row["score"]
+                    rollup[3] += row["score"] ** 2
+                rollup[4] += row.get("duration") or 0
+    
+    def increment_tags(self, rows):
+        with self.lock:
+            for row in rows:
+                for tag in row.get("tags") or []:
+                    self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+    
+    def rollup_rows(self):
+        with self.lock:
+            return [
+                {
+                    "day": day, "type": activity_type, "activity_count": count,
+                    "perception_count": perception_count, "perception_sum": perception_sum,
+                    "perception_sum_sq": perception_sum_sq, "timer_duration_total": duration
+                }
+                for (day, activity_type), (count, perception_count, perception_sum, perception_sum_sq, duration) in sorted(self.rollups.items())
+            ]
+    
+    def recent(self, limit, offset=0):
+        """The newest rows first, straight off the end of the created_at order"""
+        with self.lock:
+            end = max(len(self.rows) - offset, 0)
+            return self.rows[max(end - limit, 0):end][::-1]
+    
+    def count_since(self, created_at):
+        with self.lock:
+            return len(self.created) - bisect_left(self.created, created_at)
+    
+    def project(self, row, fields):
+        projected = {}
+        for name, column in fields:
+            if column == "*":
+                projected.update(zip(COLUMNS, row))
+            elif column == "description_preview":
+                projected[name] = (row[COLUMN_INDEX["description"]] or "")[:DESCRIPTION_PREVIEW_LENGTH]
+            elif column in COLUMN_INDEX:
+                projected[name] = row[COLUMN_INDEX[column]]
+            else:
+                raise StandInError(400, "42703", f"column activities.{column} does not exist")
+        return projected
+    
+    def select(self, params):
+        """Rows for a PostgREST query string, as (rows, total matching rows)"""
+        fields = _parse_select(params.pop("select", None))
+        order = [item.split(".") for item in params.pop("order", "").split(",") if item]
+        limit = int(params.pop("limit")) if "limit" in params else None
+        offset = int(params.pop("offset", 0))
+        filters = []
+        for column, expression in params.items():
+            if column not in COLUMN_INDEX:
+                raise StandInError(400, "42703", f"column activities.{column} does not exist")
+            filters.append(_parse_filter(column, expression))
+        
+        if not filters and order and order[0][0] == "created_at" and limit is not None:
+            # The common "newest first" read, served like an index scan
+            newest = order[0][1:2] == ["desc"]
+            rows = self.recent(limit, offset) if newest else self.rows[offset:offset + limit]
+            total = len(self.rows)
+        else:
+            with self.lock:
+                rows = [
+                    row for row in self.rows
+                    if all(test(row[COLUMN_INDEX[column]]) for column, test in filters)
+                ]
+            # Stable sorts, least significant key first
+            for column, *direction in reversed(order):
+                if column not in COLUMN_INDEX:
+                    raise StandInError(400, "42703", f"column activities.{column} does not exist")
+                index = COLUMN_INDEX[column]
+                rows.sort(key=lambda row: _sort_key(row[index]), reverse="desc" in direction)
+            total = len(rows)
+            rows = rows[offset:offset + limit if limit is not None else None]
+        return [self.project(row, fields) for row in rows], total
+    
+    def dashboard_summary(self, today_start, recent_limit=10):
+        """Same result as the get_dashboard_summary function in the README"""
+        rollups = self.rollup_rows()
+        perception_count = sum(row["perception_count"] for row in rollups)
+        fields = _parse_select("id,created_at,timestamp,type,location,perception_score,tags,description:description_preview")
+        return {
+            "total_today": self.count_since(today_start),
+            "total_all_time": sum(row["activity_count"] for row in rollups),
+            "avg_perception": round(sum(row["perception_sum"] for row in rollups) / perception_count, 2) if perception_count else 0,
+            "recent": [self.project(row, fields) for row in self.recent(recent_limit)] if recent_limit else []
+        }
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """Answers the PostgREST and Storage requests the Supabase client makes"""
+    
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs
+    # add about 40 ms to every response
+    disable_nagle_algorithm = True
+    
+    @property
+    def database(self):
+        return self.server.database
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, status, body=None, headers=None):
+        payload = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+    
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+    
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        body = self._body() if self.command in ("POST", "PATCH", "PUT") else b""
+        try:
+            if parts[:2] == ["rest", "v1"] and len(parts) == 4 and parts[2] == "rpc":
+                self._rpc(parts[3], json.loads(body or b"{}"))
+            elif parts[:2] == ["rest", "v1"] and len(parts) == 3:
+                self._table(parts[2], dict(parse_qsl(url.query, keep_blank_values=True)), body)
+            elif parts[:3] == ["storage", "v1", "object"] and len(parts) > 4:
+                self._object(parts[3], "/".join(parts[4:]), body)
+            elif parts[:4] == ["storage", "v1", "upload", "resumable"] and len(parts) <= 5:
+                self._resumable(parts[4] if len(parts) == 5 else None, body)
+            else:
+                raise StandInError(404, "PGRST000", f"{self.command} {url.path} is not supported by the stand-in")
+        except StandInError as e:
+            self._send(e.status, {"code": e.code, "message": str(e), "details": None, "hint": None})
+    
+    do_GET = do_HEAD = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+    
+    def _table(self, table, params, body):
+        prefer = self.headers.get("Prefer", "")
+        if table == ROLLUP_TABLE and self.command in ("GET", "HEAD"):
+            rows = self.database.rollup_rows()
+            for column in ("day", "type"):
+                if column in params:
+                    _, test = _parse_filter(column, params[column])
+                    rows = [row for row in rows if test(row[column])]
+            self._send(200, rows)
+            return
+        if table != "activities":
+            raise StandInError(404, "42P01", f'relation "public.{table}" does not exist')
+        
+        if self.command in ("GET", "HEAD"):
+            offset = int(params.get("offset", 0))
+            rows, total = self.database.select(params)
+            count = str(total) if "count=exact" in prefer else "*"
+            content_range = f"{offset}-{offset + len(rows) - 1}/{count}" if rows else f"*/{count}"
+            self._send(200, rows, {"Content-Range": content_range})
+        elif self.command == "POST":
+            activities = json.loads(body or b"[]")
+            if isinstance(activities, dict):
+                activities = [activities]
+            inserted = self.database.insert(activities, ignore_duplicates="resolution=ignore-duplicates" in prefer)
+            if "return=representation" in prefer:
+                fields = _parse_select(params.get("select"))
+                self._send(201, [{name: row.get(column) for name, column in fields} if fields != [("*", "*")] else row for row in inserted])
+            else:
+                self._send(201)
+        else:
+            raise StandInError(405, "PGRST000", f"{self.command} on tables is not supported by the stand-in")
+    
+    def _rpc(self, function, arguments):
+        if function == "increment_activity_rollups":
+            self.database.increment_rollups(arguments.get("activities") or [])
+            self._send(204)
+        elif function == "increment_activity_tags":
+            self.database.increment_tags(arguments.get("activities") or [])
+            self._send(204)
+        elif function == "insert_activities":
+            inserted = [
+                {
+                    "id": row["id"], "activity_timestamp": row["timestamp"], "activity_type": row["type"],
+                    "score": row["perception_score"], "duration": row["timer_duration"], "tags": row["tags"]
+                }
+                for row in self.database.insert(arguments.get("activities") or [], arguments.get("ignore_duplicates", False))
+            ]
+            self.database.increment_rollups(inserted)
+            self.database.increment_tags(inserted)
+            self._send(200, inserted)
+        elif function == "get_dashboard_summary":
+            self._send(200, self.database.dashboard_summary(arguments["today_start"], arguments.get("recent_limit", 10)))
+        else:
+            raise StandInError(404, "PGRST202", f"Could not find the function public.{function} in the schema cache")
+    
+    def _object(self, bucket, path, body):
+        if bucket != STORAGE_BUCKET:
+            raise StandInError(404, "NoSuchBucket", "Bucket not found")
+        if self.command == "HEAD":
+            self._send(200 if path in self.database.objects else 404)
+        elif self.command in ("POST", "PUT"):
+            # Multipart form with the file; only its size is kept
+            self.database.objects[path] = len(body)
+            self._send(200, {"Key": f"{bucket}/{path}", "Id": str(uuid.uuid4())})
+        else:
+            raise StandInError(405, "PGRST000", f"{self.command} on objects is not supported by the stand-in")
+    
+    def _resumable(self, upload_id, body):
+        # tus 1.0 creation, offset and chunk requests, as served by Storage
+        headers = {"Tus-Resumable": "1.0.0"}
+        if upload_id is None and self.command == "POST":
+            metadata = dict(
+                (key, base64.b64decode(value).decode()) for key, value in
+                (item.split(" ", 1) for item in self.headers.get("Upload-Metadata", "").split(",") if item)
+            )
+            if metadata.get("bucketName") != STORAGE_BUCKET:
+                raise StandInError(404, "NoSuchBucket", "Bucket not found")
+            upload_id = uuid.uuid4().hex
+            with self.database.lock:
+                self.database.uploads[upload_id] = {
+                    "path": metadata["objectName"],
+                    "length": int(self.headers["Upload-Length"]),
+                    "data": bytearray()
+                }
+            self._send(201, None, {**headers, "Location": f"/storage/v1/upload/resumable/{upload_id}"})
+            return
+        
+        upload = self.database.uploads.get(upload_id)
+        if upload is None:
+            raise StandInError(404, "NoSuchUpload", "Upload not found")
+        if self.command == "HEAD":
+            self._send(200, None, {**headers, "Upload-Offset": str(len(upload["data"])), "Upload-Length": str(upload["length"])})
+        elif self.command == "PATCH":
+            with self.database.lock:
+                if int(self.headers.get("Upload-Offset", -1)) != len(upload["data"]):
+                    raise StandInError(409, "OffsetMismatch", "Upload-Offset does not match the stored offset")
+                upload["data"] += body[:upload["length"] - len(upload["data"])]
+                if len(upload["data"]) == upload["length"]:
+                    self.database.objects[upload["path"]] = upload["length"]
+            self._send(204, None, {**headers, "Upload-Offset": str(len(upload["data"]))})
+        else:
+            raise StandInError(405, "PGRST000", f"{self.command} on uploads is not supported by the stand-in")
+
+class StandInServer(ThreadingHTTPServer):
+    """Local HTTP stand-in for the Supabase endpoints the data handler uses
+
+    Serves PostgREST selects and inserts on the activities table, the
+    rollup table, the insert_activities, increment_activity_rollups,
+    increment_activity_tags and get_dashboard_summary functions, and object
+    existence checks, uploads and resumable (tus) uploads in the media
+    bucket. Point SUPABASE_URL at `url`.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), StandInRequestHandler)
+        self.database = StandInDatabase()
+        self._thread = None
+    
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+    
+    def start(self):
+        """Serve on a background thread and return self"""
+        self._thread = threading.Thread(target=self.serve_forever, name="supabase-stand-in", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve generated activities on a local stand-in for the Supabase API")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--activities", type=int, default=1000, help="Generated activities to serve (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    from benchmarks.generator import generate_activities
+    
+    server = StandInServer(port=args.port)
+    server.database.load(generate_activities(args.activities, args.seed))
+    print(f"Serving {args.activities} activities on {server.url}; use any SUPABASE_ANON_KEY")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PAGES = ["app.py"] + sorted(str(path.relative_to(ROOT)) for path in (ROOT / "pages").glob("*.py"))
+
+# Dependencies worth keeping off pages that don't need them
+HEAVY_MODULES = ["pandas", "numpy", "altair", "pyarrow", "supabase", "postgrest", "geocoder", "streamlit_geolocation", "PIL", "httpx"]
+
+def seed_database(path, media_root, count, seed=0):
+    """Fill a fresh local database with count synthetic activities"""
+    from benchmarks.generator import generate_activities
+    from utils.sqlite_handler import SQLiteHandler
+    
+    handler = SQLiteHandler(path, media_root)
+    handler.add_activities_batch(generate_activities(count, seed))
+
+def measure_page(page):
+    """Time importing Streamlit, then a page's first run and a rerun, in this (fresh) process
+
+    The first run includes importing everything the page needs; the rerun
+    only renders, so their difference is the page's import cost.
+    """
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_seconds = time.perf_counter() - started
+    before = set(sys.modules)
+    
+    app = AppTest.from_file(str(ROOT / page), default_timeout=120)
+    app.session_state["authenticated"] = True
+    started = time.perf_counter()
+    app.run()
+    first_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    app.run()
+    rerun_seconds = time.perf_counter() - started
+    
+    loaded = set(sys.modules) - before
+    return {
+        "page": page,
+        "streamlit_import_ms": round(streamlit_seconds * 1000, 1),
+        "first_run_ms": round(first_seconds * 1000, 1),
+        "rerun_ms": round(rerun_seconds * 1000, 1),
+        "import_ms": round((first_seconds - rerun_seconds) * 1000, 1),
+        "modules": len(loaded),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in loaded],
+        "exceptions": [exception.value for exception in app.exception]
+    }
+
+def run(pages=PAGES, repeat=3, activities=200, seed=0):
+    """Measure every page in `repeat` fresh interpreters against a seeded local database
+
+    Returns one dict per page with the median timings in milliseconds, the
+    number of modules its first run imported and which HEAVY_MODULES were
+    among them.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            DATA_BACKEND="sqlite",
+            SQLITE_PATH=os.path.join(directory, "activities.db"),
+            MEDIA_ROOT=os.path.join(directory, "media"),
+            ACTIVITY_QUEUE_PATH=os.path.join(directory, "queue.db"),
+            PYTHONPATH=str(ROOT)
+        )
+        seed_database(env["SQLITE_PATH"], env["MEDIA_ROOT"], activities, seed)
+        
+        results = []
+        for page in pages:
+            samples = []
+            for _ in range(repeat):
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.startup", "--measure", page],
+                    cwd=ROOT, env=env, capture_output=True, text=True, check=True
+                ).stdout
+                samples.append(json.loads(output.strip().splitlines()[-1]))
+            result = dict(samples[-1])
+            for name in ("streamlit_import_ms", "first_run_ms", "rerun_ms", "import_ms"):
+                result[name] = round(statistics.median(sample[name] for sample in samples), 1)
+            results.append(result)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each page's imports and first render in fresh interpreters")
+    parser.add_argument("pages", nargs="*", default=PAGES, help="Pages to measure, relative to the app root (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per page; the median is kept (default: 3)")
+    parser.add_argument("--activities", type=int, default=200, help="Activities in the local database (default: 200)")
+    parser.add_argument("--budget-ms", type=float, help="Exit with status 1 if any page's first run takes longer")
+    parser.add_argument("--measure", metavar="PAGE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure:
+        print(json.dumps(measure_page(args.measure)))
+        return
+    
+    results = run(args.pages, args.repeat, args.activities)
+    print(f"{'page':<26}  {'first run ms':>12}  {'imports ms':>10}  {'rerun ms':>8}  {'modules':>7}  heavy modules")
+    for result in results:
+        print(
+            f"{result['page']:<26}  {result['first_run_ms']:>12}  {result['import_ms']:>10}  "
+            f"{result['rerun_ms']:>8}  {result['modules']:>7}  {', '.join(result['heavy_modules']) or '-'}"
+        )
+        for exception in result["exceptions"]:
+            print(f"  ! {exception}")
+    print(f"Streamlit itself takes {statistics.median(result['streamlit_import_ms'] for result in results)} ms to import")
+    
+    if args.budget_ms is not None:
+        slow = [result["page"] for result in results if result["first_run_ms"] > args.budget_ms]
+        if slow:
+            print(f"Over the {args.budget_ms:g} ms budget: {', '.join(slow)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+# Operations timed at each size, in report order
+OPERATIONS = [
+    "add_activity",
+    "get_recent_activities",
+    "get_recent_activities_cached",
+    "get_activity_stats",
+    "get_activity_stats_cached",
+    "process_media_uploads",
+    "format_activity_for_display",
+]
+
+def _summary(samples):
+    """Median, 95th percentile, min and max of samples in seconds, as milliseconds"""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3)
+    }
+
+def _time(function, repeat, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+def _new_activity(rng):
+    # What the Live Update page submits: no id or created_at, tags as typed
+    from benchmarks.generator import generate_activity
+    
+    activity = generate_activity(rng, datetime.now(timezone.utc))
+    for column in ("id", "created_at", "media_urls", "thumbnail_urls"):
+        del activity[column]
+    activity["tags"] = ", ".join(activity["tags"])
+    return activity
+
+def bench_size(handler, database, size, repeat, seed, media_files):
+    """Time each of OPERATIONS against `size` generated activities"""
+    import random
+    
+    from benchmarks.generator import generate_activities, generate_media_files
+    from benchmarks.stand_in import COLUMNS
+    
+    started = time.perf_counter()
+    database.load(generate_activities(size, seed))
+    load_seconds = time.perf_counter() - started
+    rng = random.Random(seed)
+    results = {}
+    
+    results["add_activity"] = _time(lambda: handler.add_activity(_new_activity(rng)), repeat)
+    # Cold reads go to the stand-in every time; cached ones are served by the read cache
+    results["get_recent_activities"] = _time(lambda: handler.get_recent_activities(limit=10), repeat, handler.cache.invalidate)
+    results["get_recent_activities_cached"] = _time(lambda: handler.get_recent_activities(limit=10), repeat)
+    results["get_activity_stats"] = _time(handler.get_activity_stats, repeat, handler.cache.invalidate)
+    results["get_activity_stats_cached"] = _time(handler.get_activity_stats, repeat)
+    
+    # Fresh files every run, so neither the media index nor the storage
+    # existence check can skip the work
+    uploads = [generate_media_files(media_files, seed=f"{seed}-{size}-{run}") for run in range(max(repeat // 4, 1))]
+    batches = iter(uploads)
+    results["process_media_uploads"] = _time(lambda: handler.process_media_uploads(next(batches)), len(uploads))
+    results["process_media_uploads"]["files"] = media_files
+    
+    # Per row over the newest rows, since that is what the tables format
+    rows = [dict(zip(COLUMNS, row)) for row in database.recent(min(size, 10_000))]
+    formatted = _time(lambda: [handler.format_activity_for_display(row) for row in rows], repeat)
+    results["format_activity_for_display"] = {
+        **formatted,
+        "rows": len(rows),
+        "median_us_per_row": round(formatted["median_ms"] * 1000 / len(rows), 3) if rows else None
+    }
+    return {"rows": size, "load_seconds": round(load_seconds, 2), "operations": results}
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes=SIZES, repeat=20, seed=0, media_files=4):
+    """Run the suite against a local Supabase stand-in and return the report dict
+
+    The report has run metadata (time, git commit, Python, platform and the
+    settings) and one entry per size with millisecond summaries per
+    operation, ready to be written as JSON and compared with compare().
+    """
+    from benchmarks.stand_in import StandInServer
+    
+    server = StandInServer().start()
+    os.environ["SUPABASE_URL"] = server.url
+    os.environ["SUPABASE_ANON_KEY"] = "benchmark"
+    
+    from utils.data_handler import SupabaseHandler, get_image_pool
+    
+    handler = SupabaseHandler()
+    # Start the image workers before anything is timed
+    get_image_pool().submit(int).result()
+    
+    try:
+        results = [bench_size(handler, server.database, size, repeat, seed, media_files) for size in sizes]
+    finally:
+        server.stop()
+    
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {"sizes": list(sizes), "repeat": repeat, "seed": seed, "media_files": media_files},
+        "results": results
+    }
+
+def compare(previous, current):
+    """Yield (rows, operation, previous median ms, current median ms, ratio) for operations in both reports"""
+    previous_sizes = {result["rows"]: result["operations"] for result in previous["results"]}
+    for result in current["results"]:
+        before = previous_sizes.get(result["rows"])
+        if before is None:
+            continue
+        for operation in OPERATIONS:
+            if operation in before and operation in result["operations"]:
+                old, new = before[operation]["median_ms"], result["operations"][operation]["median_ms"]
+                yield result["rows"], operation, old, new, round(new / old, 2) if old else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the data handler against generated activities on a local Supabase stand-in")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Activity counts to test (default: 1000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per operation (default: 20)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--media-files", type=int, default=4, help="Files per process_media_uploads call (default: 4)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", metavar="REPORT", help="Earlier JSON report to compare medians with")
+    args = parser.parse_args()
+    
+    report = run(args.sizes, args.repeat, args.seed, args.media_files)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    
+    print(f"{'rows':>9}  {'operation':<30}  {'median ms':>10}  {'p95 ms':>10}")
+    for result in report["results"]:
+        for operation in OPERATIONS:
+            summary = result["operations"][operation]
+            print(f"{result['rows']:>9}  {operation:<30}  {summary['median_ms']:>10}  {summary['p95_ms']:>10}")
+    
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+        print(f"\nCompared with {args.compare} ({previous.get('git_commit') or 'unknown commit'}):")
+        print(f"{'rows':>9}  {'operation':<30}  {'before ms':>10}  {'after ms':>10}  {'ratio':>6}")
+        for rows, operation, old, new, ratio in compare(previous, report):
+            print(f"{rows:>9}  {operation:<30}  {old:>10}  {new:>10}  {ratio:>6}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
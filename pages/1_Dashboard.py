@@ -1,13 +1,11 @@
 import streamlit as st
-import pandas as pd
-import sys
-import os
-
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datetime import date, timedelta
 
 from utils.auth import check_authentication
-from utils.data_handler import SupabaseHandler
+from utils.metrics import timed_page
+from utils.data_handler import get_data_handler
+from utils.rollups import summarize_rollups
+from utils.query import SUMMARY_QUERY
 
 # Page configuration
 st.set_page_config(
@@ -16,13 +14,14 @@ st.set_page_config(
     layout="wide"
 )
 
+@timed_page("Dashboard")
 def main():
     # Check authentication
     if not check_authentication():
         return
     
     # Initialize data handler
-    db_handler = SupabaseHandler()
+    db_handler = get_data_handler()
     
     # Page header
     st.title("📈 Dashboard")
@@ -46,9 +45,17 @@ def main():
     st.subheader("📊 Quick Statistics")
     
     with st.spinner("Loading statistics..."):
-        stats = db_handler.get_activity_stats()
+        # Independent reads, fetched concurrently
+        week_start = date.today() - timedelta(days=6)
+        page_data = db_handler.gather_reads({
+            "dashboard": ("get_dashboard_data", {"limit": 10}),
+            "week": ("get_daily_rollups", {"start_day": week_start})
+        })
+        dashboard_data = page_data["dashboard"]
+        stats = dashboard_data["stats"]
+        week = summarize_rollups(page_data["week"])
     
-    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
     
     with metric_col1:
         st.metric(
@@ -71,6 +78,13 @@ def main():
         )
     
     with metric_col3:
+        st.metric(
+            label="📆 Last 7 Days",
+            value=week["activity_count"],
+            help="Number of activities in the last 7 days, including today"
+        )
+    
+    with metric_col4:
         st.metric(
             label="📈 Total Activities", 
             value=stats["total_all_time"],
@@ -82,25 +96,12 @@ def main():
     # Recent Activities Section
     st.subheader("🕐 Recent Activities")
     
-    with st.spinner("Loading recent activities..."):
-        activities = db_handler.get_recent_activities(limit=10)
+    # Summary columns only; descriptions arrive cut to a preview
+    activities = SUMMARY_QUERY.to_rows(dashboard_data["recent"])
     
     if activities:
-        # Format activities for display
-        formatted_activities = []
-        for activity in activities:
-            formatted = db_handler.format_activity_for_display(activity)
-            formatted_activities.append({
-                "Time": formatted.get("timestamp", "N/A"),
-                "Type": formatted.get("type", "N/A").title(),
-                "Location": formatted.get("location", "Not specified"),
-                "Score": formatted.get("perception_score", "N/A"),
-                "Description": formatted.get("description", "No description")[:50] + ("..." if len(str(formatted.get("description", ""))) > 50 else ""),
-                "Tags": formatted.get("tags", "")
-            })
-        
-        # Display as dataframe
-        df = pd.DataFrame(formatted_activities)
+        # Format activities for display, one vectorized pass per column
+        df = db_handler.format_activities_for_display(activities, description_length=50)
         
         # Style the dataframe
         st.dataframe(
@@ -126,16 +127,20 @@ def main():
             }
         )
         
-        # Show more details option
-        with st.expander("🔍 View Full Activity Details"):
-            selected_idx = st.selectbox(
-                "Select activity to view details:",
-                range(len(activities)),
-                format_func=lambda x: f"{formatted_activities[x]['Time']} - {formatted_activities[x]['Description'][:30]}..."
-            )
+        # Show more details option; the body only runs while it is open, so
+        # the whole row is fetched only when someone asks for it
+        with st.expander("🔍 View Full Activity Details", key="dashboard_details", on_change="rerun") as details:
+            if details.open:
+                selected_idx = st.selectbox(
+                    "Select activity to view details:",
+                    range(len(activities)),
+                    format_func=lambda x: f"{df.at[x, 'Time']} - {df.at[x, 'Description'][:30]}..."
+                )
+            else:
+                selected_idx = None
             
-            if selected_idx is not None:
-                selected_activity = activities[selected_idx]
+            selected_activity = db_handler.get_activity(activities[selected_idx].id) if selected_idx is not None else None
+            if selected_activity:
                 
                 # Display full details
                 detail_col1, detail_col2 = st.columns(2)
@@ -154,6 +159,8 @@ def main():
                     
                     if selected_activity.get('media_urls'):
                         st.write("📸 **Media Files:**")
+                        if selected_activity.get('thumbnail_urls'):
+                            st.image(selected_activity['thumbnail_urls'], width=120)
                         for i, url in enumerate(selected_activity['media_urls']):
                             st.write(f"- [Media {i+1}]({url})")
     else:
@@ -167,6 +174,23 @@ def main():
             if st.button("📅 Add Historical Activity", use_container_width=True, key="historical_empty"):
                 st.switch_page("pages/3_Historical.py")
     
+    # Read cache counters, for tuning the per-query TTLs
+    with st.expander("⚡ Cache Statistics"):
+        cache_stats = db_handler.get_cache_stats()
+        total = cache_stats["total"]
+        cache_col1, cache_col2, cache_col3, cache_col4 = st.columns(4)
+        cache_col1.metric("Hits", total["hits"] + total["stale_hits"])
+        cache_col2.metric("Misses", total["misses"])
+        cache_col3.metric("Hit Ratio", f"{total['hit_ratio']:.0%}")
+        cache_col4.metric("Entries", f"{total['size']} / {total['max_entries']}")
+        if cache_stats["namespaces"]:
+            import pandas as pd
+            
+            st.dataframe(
+                pd.DataFrame.from_dict(cache_stats["namespaces"], orient="index"),
+                use_container_width=True
+            )
+    
     # Footer with helpful tips
     st.divider()
     st.markdown("""
@@ -1,14 +1,11 @@
 import streamlit as st
 import time
 from datetime import datetime
-import sys
-import os
-
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.auth import check_authentication
-from utils.data_handler import SupabaseHandler
+from utils.metrics import timed_page
+from utils.data_handler import get_data_handler, get_activity_queue
+from utils.write_queue import show_queue_status
 from utils.location import location_handler, gps_location_handler, clear_location
 
 # Page configuration
@@ -18,6 +15,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# How often the running timer is redrawn
+TIMER_TICK_SECONDS = 1
+
 def format_duration(seconds):
     """Format duration in seconds to HH:MM:SS"""
     hours = int(seconds // 3600)
@@ -25,13 +25,19 @@ def format_duration(seconds):
     seconds = int(seconds % 60)
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
+@st.fragment(run_every=TIMER_TICK_SECONDS)
+def running_timer(timer_start):
+    """Show the time elapsed since timer_start, redrawn every tick without rerunning the page"""
+    st.success(f"🟢 **Timer Running**: {format_duration(time.time() - timer_start)}")
+
+@timed_page("Live Update")
 def main():
     # Check authentication
     if not check_authentication():
         return
     
     # Initialize data handler
-    db_handler = SupabaseHandler()
+    db_handler = get_data_handler()
     
     # Initialize session state
     if "timer_start" not in st.session_state:
@@ -46,6 +52,7 @@ def main():
     # Page header
     st.title("⏱️ Live Activity Tracker")
     st.write("Track your activities in real-time with the built-in timer.")
+    show_queue_status(get_activity_queue())
     
     # Timer Section
     st.subheader("⏰ Activity Timer")
@@ -81,18 +88,9 @@ def main():
     
     # Display current timer status
     if st.session_state.timer_running:
-        # Real-time timer display
-        placeholder = st.empty()
-        current_time = time.time()
-        elapsed = current_time - st.session_state.timer_start
-        
-        with placeholder.container():
-            st.success(f"🟢 **Timer Running**: {format_duration(elapsed)}")
-            st.info("⏱️ Timer is actively running. Click 'Stop Timer' when your activity is complete.")
-        
-        # Auto-refresh every second for real-time updates
-        time.sleep(1)
-        st.rerun()
+        # Only the elapsed time ticks; the rest of the page reruns on clicks
+        running_timer(st.session_state.timer_start)
+        st.info("⏱️ Timer is actively running. Click 'Stop Timer' when your activity is complete.")
     
     elif st.session_state.timer_stopped:
         st.success(f"✅ **Activity Completed**: Duration {format_duration(st.session_state.final_duration)}")
@@ -144,10 +142,14 @@ def main():
             
             # Tags
             st.subheader("🏷️ Tags")
-            tags_input = st.text_input(
-                "Add tags (comma-separated)",
-                placeholder="work, meeting, productive, creative, exercise...",
-                help="Add tags to categorize your activity. Separate multiple tags with commas."
+            tags_input = st.multiselect(
+                "Add tags",
+                db_handler.get_tag_options(),
+                placeholder="Choose or type: work, meeting, productive...",
+                accept_new_options=True,
+                filter_mode="prefix",
+                select_all=False,
+                help="Your existing tags are listed most used first; type to narrow them down, or press Enter to add a new one."
             )
             
             # Description
@@ -169,15 +171,14 @@ def main():
                 
                 with st.spinner("💾 Saving your activity..."):
                     try:
-                        # Process tags
-                        tags = []
-                        if tags_input.strip():
-                            tags = [tag.strip() for tag in tags_input.split(",") if tag.strip()]
+                        # Process tags, reusing the spelling of tags already in use
+                        tags = db_handler.canonicalize_tags(tags_input)
                         
                         # Process media uploads
                         media_urls = []
+                        thumbnail_urls = []
                         if uploaded_files:
-                            media_urls = db_handler.process_media_uploads(uploaded_files)
+                            media_urls, thumbnail_urls = db_handler.process_media_uploads(uploaded_files)
                             if len(media_urls) != len(uploaded_files):
                                 st.warning("⚠️ Some media files failed to upload.")
                         
@@ -190,11 +191,12 @@ def main():
                             "tags": tags,
                             "description": description.strip(),
                             "timer_duration": int(st.session_state.final_duration),
-                            "media_urls": media_urls
+                            "media_urls": media_urls,
+                            "thumbnail_urls": thumbnail_urls
                         }
                         
-                        # Save to database
-                        activity_id = db_handler.add_activity(activity_data)
+                        # Save to the local queue; it syncs to the database in the background
+                        activity_id = db_handler.queue_activity(activity_data)
                         
                         if activity_id:
                             st.success("✅ Activity logged successfully!")
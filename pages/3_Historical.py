@@ -1,13 +1,10 @@
 import streamlit as st
-from datetime import datetime, date, time as dt_time
-import sys
-import os
-
-# Add parent directory to path to import utils
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from datetime import datetime, date
 
 from utils.auth import check_authentication
-from utils.data_handler import SupabaseHandler
+from utils.metrics import timed_page
+from utils.data_handler import get_data_handler, get_activity_queue
+from utils.write_queue import show_queue_status
 from utils.location import location_handler, gps_location_handler, clear_location
 
 # Page configuration
@@ -17,17 +14,19 @@ st.set_page_config(
     layout="wide"
 )
 
+@timed_page("Historical")
 def main():
     # Check authentication
     if not check_authentication():
         return
     
     # Initialize data handler
-    db_handler = SupabaseHandler()
+    db_handler = get_data_handler()
     
     # Page header
     st.title("📅 Historical Activity Entry")
     st.write("Add past activities with custom dates and times.")
+    show_queue_status(get_activity_queue())
     
     # Clear location data when page loads (fresh start)
     if "historical_page_loaded" not in st.session_state:
@@ -99,10 +98,14 @@ def main():
         
         # Tags
         st.subheader("🏷️ Tags")
-        tags_input = st.text_input(
-            "Add tags (comma-separated)",
-            placeholder="work, meeting, productive, creative, exercise, family, travel...",
-            help="Add tags to categorize your activity. Separate multiple tags with commas."
+        tags_input = st.multiselect(
+            "Add tags",
+            db_handler.get_tag_options(),
+            placeholder="Choose or type: work, meeting, productive...",
+            accept_new_options=True,
+            filter_mode="prefix",
+            select_all=False,
+            help="Your existing tags are listed most used first; type to narrow them down, or press Enter to add a new one."
         )
         
         # Description
@@ -129,15 +132,14 @@ def main():
             
             with st.spinner("💾 Saving your historical activity..."):
                 try:
-                    # Process tags
-                    tags = []
-                    if tags_input.strip():
-                        tags = [tag.strip() for tag in tags_input.split(",") if tag.strip()]
+                    # Process tags, reusing the spelling of tags already in use
+                    tags = db_handler.canonicalize_tags(tags_input)
                     
                     # Process media uploads
                     media_urls = []
+                    thumbnail_urls = []
                     if uploaded_files:
-                        media_urls = db_handler.process_media_uploads(uploaded_files)
+                        media_urls, thumbnail_urls = db_handler.process_media_uploads(uploaded_files)
                         if len(media_urls) != len(uploaded_files):
                             st.warning("⚠️ Some media files failed to upload.")
                     
@@ -150,11 +152,12 @@ def main():
                         "tags": tags,
                         "description": description.strip(),
                         "timer_duration": None,  # No timer for historical entries
-                        "media_urls": media_urls
+                        "media_urls": media_urls,
+                        "thumbnail_urls": thumbnail_urls
                     }
                     
-                    # Save to database
-                    activity_id = db_handler.add_activity(activity_data)
+                    # Save to the local queue; it syncs to the database in the background
+                    activity_id = db_handler.queue_activity(activity_data)
                     
                     if activity_id:
                         st.success("✅ Historical activity saved successfully!")
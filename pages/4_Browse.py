@@ -0,0 +1,170 @@
+import streamlit as st
+import tempfile
+
+from utils.auth import check_authentication
+from utils.metrics import timed_page
+from utils.data_handler import get_data_handler
+from utils.query import SUMMARY_QUERY
+from utils.exporter import EXPORT_FORMATS, export_activities
+
+# Page configuration
+st.set_page_config(
+    page_title="Browse History - Activity Tracker",
+    page_icon="🗂️",
+    layout="wide"
+)
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+def reset_browser():
+    """Go back to the newest page"""
+    st.session_state.browse_cursor = None
+    st.session_state.browse_direction = "next"
+    st.session_state.browse_page_number = 1
+
+@timed_page("Browse")
+def main():
+    # Check authentication
+    if not check_authentication():
+        return
+    
+    # Initialize data handler
+    db_handler = get_data_handler()
+    
+    # Initialize session state
+    if "browse_cursor" not in st.session_state:
+        reset_browser()
+    
+    # Page header
+    st.title("🗂️ Browse History")
+    st.write("Page through every activity you have logged, newest first.")
+    
+    control_col1, control_col2 = st.columns([1, 3])
+    with control_col1:
+        page_size = st.selectbox(
+            "Activities per page",
+            PAGE_SIZES,
+            index=1,
+            on_change=reset_browser,
+            help="Changing the page size returns to the newest activities"
+        )
+    with control_col2:
+        tag = st.selectbox(
+            "Filter by tag",
+            db_handler.get_tag_options(),
+            index=None,
+            placeholder="All activities",
+            on_change=reset_browser,
+            accept_new_options=True,
+            filter_mode="prefix",
+            help="Show only activities with this tag"
+        )
+    
+    if tag:
+        related = db_handler.get_related_tags(tag, limit=8)
+        if related:
+            st.caption("Often used with: " + ", ".join(f"{row['tag']} ({row['activity_count']})" for row in related))
+    
+    with st.spinner("Loading activities..."):
+        page = db_handler.get_activities_page(
+            page_size=page_size,
+            cursor=st.session_state.browse_cursor,
+            direction=st.session_state.browse_direction,
+            query=SUMMARY_QUERY,
+            tag=tag
+        )
+    
+    activities = page["activities"]
+    
+    if activities:
+        st.dataframe(
+            db_handler.format_activities_for_display(activities, description_length=80),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Score": st.column_config.NumberColumn(
+                    "Score",
+                    help="Perception score (-5 to +5)",
+                    min_value=-5,
+                    max_value=5,
+                    format="%d"
+                )
+            }
+        )
+    else:
+        st.info("📭 No activities to show.")
+    
+    # Pagination controls
+    nav_col1, nav_col2, nav_col3, nav_col4 = st.columns([1, 1, 2, 1])
+    
+    with nav_col1:
+        if st.button("⏮️ Newest", use_container_width=True, disabled=st.session_state.browse_cursor is None):
+            reset_browser()
+            st.rerun()
+    
+    with nav_col2:
+        if st.button("◀️ Previous", use_container_width=True, disabled=page["prev_cursor"] is None):
+            st.session_state.browse_cursor = page["prev_cursor"]
+            st.session_state.browse_direction = "prev"
+            st.session_state.browse_page_number -= 1
+            st.rerun()
+    
+    with nav_col3:
+        st.markdown(f"<div style='text-align: center'>Page {st.session_state.browse_page_number}</div>", unsafe_allow_html=True)
+    
+    with nav_col4:
+        if st.button("Next ▶️", use_container_width=True, disabled=page["next_cursor"] is None):
+            st.session_state.browse_cursor = page["next_cursor"]
+            st.session_state.browse_direction = "next"
+            st.session_state.browse_page_number += 1
+            st.rerun()
+    
+    # Export section
+    st.divider()
+    st.subheader("⬇️ Export")
+    
+    export_col1, export_col2 = st.columns([1, 3])
+    with export_col1:
+        export_format = st.selectbox(
+            "Format",
+            list(EXPORT_FORMATS),
+            format_func=lambda name: name.upper(),
+            help="Parquet keeps tags as a list column and splits location into lat, lng and location_description"
+        )
+    
+    def build_export():
+        # Spools to disk past 32 MB, so large exports never sit fully in memory here
+        file = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
+        export_activities(db_handler, file, export_format)
+        file.seek(0)
+        return file
+    
+    mime_type, extension = EXPORT_FORMATS[export_format]
+    with export_col2:
+        st.write("")
+        st.download_button(
+            f"⬇️ Download all activities ({export_format.upper()})",
+            data=build_export,
+            file_name=f"activities{extension}",
+            mime=mime_type,
+            on_click="ignore"
+        )
+    
+    # Navigation buttons
+    st.divider()
+    link_col1, link_col2, link_col3 = st.columns(3)
+    
+    with link_col1:
+        if st.button("📈 View Dashboard", use_container_width=True):
+            st.switch_page("pages/1_Dashboard.py")
+    
+    with link_col2:
+        if st.button("⏱️ Live Update", use_container_width=True):
+            st.switch_page("pages/2_Live_Update.py")
+    
+    with link_col3:
+        if st.button("🏠 Home", use_container_width=True):
+            st.switch_page("app.py")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
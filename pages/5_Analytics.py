@@ -0,0 +1,168 @@
+import streamlit as st
+import altair as alt
+from datetime import date, timedelta
+
+from utils.auth import check_authentication
+from utils.metrics import timed_page
+from utils.data_handler import get_data_handler
+from utils.analytics import calendar_heatmap
+
+# Page configuration
+st.set_page_config(
+    page_title="Analytics - Activity Tracker",
+    page_icon="📊",
+    layout="wide"
+)
+
+# Preset ranges -> days up to and including today (None = pick dates)
+RANGE_PRESETS = {
+    "Last 30 days": 30,
+    "Last 90 days": 90,
+    "Last year": 365,
+    "Last 3 years": 3 * 365,
+    "Custom": None,
+}
+GRANULARITIES = ["daily", "weekly", "monthly"]
+
+# Weeks shown by the calendar heatmap, ending with the selected end day
+HEATMAP_WEEKS = 53
+
+def perception_chart(summary):
+    """Mean perception per period, with a band one standard deviation either side"""
+    data = summary.reset_index(names="period")
+    data["low"] = data["avg_perception"] - data["perception_stddev"]
+    data["high"] = data["avg_perception"] + data["perception_stddev"]
+    base = alt.Chart(data).encode(x=alt.X("period:T", title=None))
+    band = base.mark_area(opacity=0.25).encode(
+        y=alt.Y("low:Q", title="Perception score", scale=alt.Scale(domain=[-5, 5])),
+        y2="high:Q"
+    )
+    line = base.mark_line(point=True).encode(
+        y="avg_perception:Q",
+        tooltip=[
+            alt.Tooltip("period:T", title="Period"),
+            alt.Tooltip("avg_perception:Q", title="Mean"),
+            alt.Tooltip("perception_stddev:Q", title="Std. dev."),
+            alt.Tooltip("activity_count:Q", title="Activities")
+        ]
+    )
+    return band + line
+
+def calendar_chart(calendar):
+    """GitHub-style grid: one column per week, one row per weekday"""
+    return alt.Chart(calendar).mark_rect(cornerRadius=2).encode(
+        x=alt.X("week:O", title=None, axis=alt.Axis(labels=False, ticks=False)),
+        y=alt.Y(
+            "weekday:O",
+            title=None,
+            axis=alt.Axis(labelExpr="['Mon', '', 'Wed', '', 'Fri', '', 'Sun'][datum.value]")
+        ),
+        color=alt.Color(
+            "activity_count:Q",
+            title="Activities",
+            scale=alt.Scale(scheme="greens", domainMin=0)
+        ),
+        tooltip=[
+            alt.Tooltip("day:T", title="Day"),
+            alt.Tooltip("activity_count:Q", title="Activities")
+        ]
+    ).properties(height=170)
+
+@timed_page("Analytics")
+def main():
+    # Check authentication
+    if not check_authentication():
+        return
+    
+    # Initialize data handler
+    db_handler = get_data_handler()
+    
+    # Page header
+    st.title("📊 Analytics")
+    st.write("How your activities and perception scores have changed over time.")
+    
+    control_col1, control_col2, control_col3 = st.columns([1, 2, 1])
+    today = date.today()
+    with control_col1:
+        preset = st.selectbox("Range", list(RANGE_PRESETS), index=1)
+    with control_col2:
+        if RANGE_PRESETS[preset] is None:
+            picked = st.date_input("Dates", value=(today - timedelta(days=89), today), max_value=today)
+            if len(picked) != 2:
+                st.info("Pick an end date.")
+                return
+            start_day, end_day = picked
+        else:
+            start_day, end_day = today - timedelta(days=RANGE_PRESETS[preset] - 1), today
+            st.date_input("Dates", value=(start_day, end_day), disabled=True)
+    with control_col3:
+        granularity = st.radio("Group by", GRANULARITIES, index=1, horizontal=True, format_func=str.title)
+    
+    # The heatmap always spans a full year; reuse the range's trends when they cover it
+    heatmap_start = end_day - timedelta(days=end_day.weekday() + 7 * (HEATMAP_WEEKS - 1))
+    reads = {"trends": ("get_activity_trends", {"start_day": start_day, "end_day": end_day})}
+    if heatmap_start < start_day:
+        reads["heatmap"] = ("get_activity_trends", {"start_day": heatmap_start, "end_day": end_day})
+    
+    with st.spinner("Loading trends..."):
+        page_data = db_handler.gather_reads(reads)
+    trends = page_data["trends"][granularity]
+    heatmap_daily = page_data.get("heatmap", page_data["trends"])["daily"]
+    
+    if trends is None:
+        st.info("📭 No activities in this range yet.")
+        return
+    
+    summary = trends["summary"]
+    
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    with metric_col1:
+        st.metric("📈 Activities", int(summary["activity_count"].sum()))
+    with metric_col2:
+        daily = page_data["trends"]["daily"]["summary"]
+        active_days = int((daily["activity_count"] > 0).sum())
+        st.metric("📅 Active Days", f"{active_days} / {len(daily)}")
+    with metric_col3:
+        st.metric("⏱️ Hours Tracked", f"{summary['hours'].sum():.1f}")
+    
+    st.divider()
+    
+    # Calendar heatmap
+    st.subheader("🗓️ Activity Calendar")
+    calendar = calendar_heatmap(
+        heatmap_daily["summary"]["activity_count"] if heatmap_daily else None,
+        end_day,
+        weeks=HEATMAP_WEEKS
+    )
+    st.altair_chart(calendar_chart(calendar), use_container_width=True)
+    
+    # Perception trend
+    st.subheader("🎯 Perception Score")
+    st.altair_chart(perception_chart(summary), use_container_width=True)
+    
+    chart_col1, chart_col2 = st.columns(2)
+    with chart_col1:
+        st.subheader("🔢 Activities by Type")
+        st.bar_chart(trends["counts"])
+    with chart_col2:
+        st.subheader("⏱️ Hours Tracked by Type")
+        st.bar_chart(trends["hours"])
+    
+    # Navigation buttons
+    st.divider()
+    link_col1, link_col2, link_col3 = st.columns(3)
+    
+    with link_col1:
+        if st.button("📈 View Dashboard", use_container_width=True):
+            st.switch_page("pages/1_Dashboard.py")
+    
+    with link_col2:
+        if st.button("🗂️ Browse History", use_container_width=True):
+            st.switch_page("pages/4_Browse.py")
+    
+    with link_col3:
+        if st.button("🏠 Home", use_container_width=True):
+            st.switch_page("app.py")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
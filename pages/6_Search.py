@@ -0,0 +1,104 @@
+import streamlit as st
+
+from utils.auth import check_authentication
+from utils.metrics import timed_page
+from utils.data_handler import get_data_handler
+
+# Page configuration
+st.set_page_config(
+    page_title="Search - Activity Tracker",
+    page_icon="🔎",
+    layout="wide"
+)
+
+PAGE_SIZE = 25
+
+def reset_results():
+    """Go back to the first page of results"""
+    st.session_state.search_page = 0
+
+@timed_page("Search")
+def main():
+    # Check authentication
+    if not check_authentication():
+        return
+    
+    # Initialize data handler
+    db_handler = get_data_handler()
+    
+    # Initialize session state
+    if "search_page" not in st.session_state:
+        reset_results()
+    
+    # Page header
+    st.title("🔎 Search")
+    st.write("Find past activities by words in their description, tags or location.")
+    
+    text = st.text_input(
+        "Search",
+        placeholder="coffee with friends, park, work...",
+        on_change=reset_results,
+        help="Every word must match. Tags count most, then descriptions, then locations."
+    )
+    
+    if not text.strip():
+        st.info("⌨️ Type a few words and press Enter.")
+        return
+    
+    with st.spinner("Searching..."):
+        results = db_handler.search_activities(text, page=st.session_state.search_page, page_size=PAGE_SIZE)
+    
+    activities = results["activities"]
+    
+    if activities:
+        st.dataframe(
+            db_handler.format_activities_for_display(activities, description_length=80),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Score": st.column_config.NumberColumn(
+                    "Score",
+                    help="Perception score (-5 to +5)",
+                    min_value=-5,
+                    max_value=5,
+                    format="%d"
+                )
+            }
+        )
+    else:
+        st.info("📭 No activities match your search.")
+    
+    # Pagination controls
+    nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+    
+    with nav_col1:
+        if st.button("◀️ Previous", use_container_width=True, disabled=st.session_state.search_page == 0):
+            st.session_state.search_page -= 1
+            st.rerun()
+    
+    with nav_col2:
+        st.markdown(f"<div style='text-align: center'>Page {st.session_state.search_page + 1}</div>", unsafe_allow_html=True)
+    
+    with nav_col3:
+        if st.button("Next ▶️", use_container_width=True, disabled=not results["has_more"]):
+            st.session_state.search_page += 1
+            st.rerun()
+    
+    # Navigation buttons
+    st.divider()
+    link_col1, link_col2, link_col3 = st.columns(3)
+    
+    with link_col1:
+        if st.button("🗂️ Browse History", use_container_width=True):
+            st.switch_page("pages/4_Browse.py")
+    
+    with link_col2:
+        if st.button("📈 View Dashboard", use_container_width=True):
+            st.switch_page("pages/1_Dashboard.py")
+    
+    with link_col3:
+        if st.button("🏠 Home", use_container_width=True):
+            st.switch_page("app.py")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
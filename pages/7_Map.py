@@ -0,0 +1,123 @@
+import streamlit as st
+
+from utils.auth import check_authentication
+from utils.metrics import timed_page
+from utils.data_handler import get_data_handler
+from utils.geo import KM_PER_DEGREE_LAT, bounding_box, cell_size
+from utils.location import gps_location_handler
+
+# Page configuration
+st.set_page_config(
+    page_title="Map - Activity Tracker",
+    page_icon="🗺️",
+    layout="wide"
+)
+
+RADIUS_OPTIONS_KM = [1, 5, 10, 25, 50, 100, 500]
+
+def clusters_frame(clusters, size):
+    """Map points for clusters: circles scaled by activity count, coloured by mean perception"""
+    import pandas as pd
+    
+    frame = pd.DataFrame(clusters, columns=["lat", "lng", "activity_count", "avg_perception"])
+    # The largest cluster fills about half a grid cell
+    largest = frame["activity_count"].max()
+    frame["radius_m"] = (frame["activity_count"] / largest) ** 0.5 * size * KM_PER_DEGREE_LAT * 500
+    # Red at -5 through green at +5; grey without scores
+    perception = pd.to_numeric(frame["avg_perception"], errors="coerce")
+    share = ((perception + 5) / 10).clip(0, 1)
+    frame["color"] = [
+        "#9e9e9e" if pd.isna(value) else f"#{int(255 * (1 - value)):02x}{int(200 * value):02x}40"
+        for value in share
+    ]
+    return frame
+
+@timed_page("Map")
+def main():
+    # Check authentication
+    if not check_authentication():
+        return
+    
+    # Initialize data handler
+    db_handler = get_data_handler()
+    
+    # Page header
+    st.title("🗺️ Map")
+    st.write("Where your activities happened. Each circle groups nearby activities; bigger means more.")
+    
+    mode = st.radio("Show", ["All activities", "Near a place"], horizontal=True)
+    
+    center = None
+    if mode == "Near a place":
+        # GPS Location Handler fills location_data for the defaults below
+        gps_location_handler()
+        location_data = st.session_state.get("location_data") or {}
+        
+        coord_col1, coord_col2, coord_col3 = st.columns(3)
+        with coord_col1:
+            lat = st.number_input("Latitude", min_value=-90.0, max_value=90.0, value=float(location_data.get("lat") or 0.0), format="%.6f")
+        with coord_col2:
+            lng = st.number_input("Longitude", min_value=-180.0, max_value=180.0, value=float(location_data.get("lng") or 0.0), format="%.6f")
+        with coord_col3:
+            radius_km = st.select_slider("Radius (km)", RADIUS_OPTIONS_KM, value=10)
+        
+        if not lat or not lng:
+            st.info("📍 Get your GPS location or enter coordinates to search around them.")
+            return
+        center = (lat, lng)
+    
+    with st.spinner("Loading map..."):
+        if center:
+            # The nearest activities and the clusters around them, fetched together
+            box = bounding_box(*center, radius_km)
+            size = cell_size(box)
+            page_data = db_handler.gather_reads({
+                "nearby": ("get_activities_near", {"lat": center[0], "lng": center[1], "radius_km": radius_km}),
+                "clusters": ("get_location_clusters", {"box": box, "size": size})
+            })
+            view = {"box": box, "size": size, "clusters": page_data["clusters"]}
+        else:
+            view = db_handler.get_location_clusters()
+    
+    if view["clusters"]:
+        st.map(
+            clusters_frame(view["clusters"], view["size"]),
+            latitude="lat",
+            longitude="lng",
+            size="radius_m",
+            color="color",
+            use_container_width=True
+        )
+        total = sum(cluster["activity_count"] for cluster in view["clusters"])
+        st.caption(f"{total} activities in {len(view['clusters'])} clusters")
+    else:
+        st.info("📭 No activities with coordinates here yet.")
+    
+    if center:
+        st.subheader("📍 Nearest Activities")
+        nearby = page_data["nearby"]
+        if nearby["activities"]:
+            df = db_handler.format_activities_for_display(nearby["activities"], description_length=60)
+            df.insert(0, "Distance", [f"{distance:.2f} km" for distance in nearby["distances_km"]])
+            st.dataframe(df, use_container_width=True, hide_index=True)
+        else:
+            st.info(f"📭 No activities within {radius_km} km.")
+    
+    # Navigation buttons
+    st.divider()
+    link_col1, link_col2, link_col3 = st.columns(3)
+    
+    with link_col1:
+        if st.button("📈 View Dashboard", use_container_width=True):
+            st.switch_page("pages/1_Dashboard.py")
+    
+    with link_col2:
+        if st.button("🗂️ Browse History", use_container_width=True):
+            st.switch_page("pages/4_Browse.py")
+    
+    with link_col3:
+        if st.button("🏠 Home", use_container_width=True):
+            st.switch_page("app.py")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import threading
+
+import pytest
+
+from utils import cache as cache_module
+from utils.cache import ReadCache
+
+TTL = 10
+STALE_TTL = 100
+
+class FakeClock:
+    """Stands in for the time module in utils.cache, moved on by hand"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+class CountingLoader:
+    """Returns value (or the values in turn) and records each call
+
+    With `block` set, a call waits until release() before returning.
+    """
+    
+    def __init__(self, *values, block=False):
+        self.values = list(values)
+        self.calls = 0
+        self.started = threading.Event()
+        self.released = threading.Event()
+        if not block:
+            self.released.set()
+    
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.released.wait(5)
+        return self.values[min(self.calls, len(self.values)) - 1]
+    
+    def release(self):
+        self.released.set()
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+def _cache(**kwargs):
+    # One refresh worker, so _drain() waits for every scheduled refresh
+    return ReadCache(default_ttl=TTL, stale_ttl=STALE_TTL, refresh_workers=1, **kwargs)
+
+def _drain(cache):
+    cache._executor.submit(lambda: None).result(5)
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = _cache(max_entries=2)
+    loaders = {name: CountingLoader(name) for name in "abc"}
+    
+    cache.get(("recent", "a"), loaders["a"])
+    cache.get(("recent", "b"), loaders["b"])
+    # Reading "a" makes "b" the least recently used
+    cache.get(("recent", "a"), loaders["a"])
+    cache.get(("recent", "c"), loaders["c"])
+    
+    assert cache.get(("recent", "a"), loaders["a"]) == "a"
+    assert cache.get(("recent", "c"), loaders["c"]) == "c"
+    assert loaders["a"].calls == loaders["c"].calls == 1
+    cache.get(("recent", "b"), loaders["b"])
+    assert loaders["b"].calls == 2
+    assert cache.stats()["namespaces"]["recent"]["evictions"] == 2
+
+def test_entry_expires_after_stale_window(clock):
+    cache = _cache(ttls={"activity": 5})
+    loader = CountingLoader("old", "new")
+    
+    assert cache.get(("activity", 1), loader) == "old"
+    clock.now += 4.9
+    assert cache.get(("activity", 1), loader) == "old"
+    assert loader.calls == 1
+    
+    # Past both the namespace TTL and the stale window, the read waits for a reload
+    clock.now += 5 + STALE_TTL
+    assert cache.get(("activity", 1), loader) == "new"
+    assert loader.calls == 2
+    assert cache.stats()["namespaces"]["activity"] == {
+        "hits": 1, "stale_hits": 0, "misses": 2, "evictions": 0, "refresh_errors": 0
+    }
+
+def test_stale_hit_refreshes_once_in_background(clock):
+    cache = _cache()
+    key = ("recent", 10)
+    cache.get(key, CountingLoader("old"))
+    clock.now += TTL + 1
+    loader = CountingLoader("new", block=True)
+    
+    # Stale reads are served at once while a single refresh runs
+    assert cache.get(key, loader) == "old"
+    assert loader.started.wait(5)
+    assert cache.get(key, loader) == "old"
+    assert cache.get(key, loader) == "old"
+    loader.release()
+    _drain(cache)
+    
+    assert loader.calls == 1
+    assert cache.get(key, loader) == "new"
+    assert cache.stats()["namespaces"]["recent"]["stale_hits"] == 3
+
+def test_failed_refresh_keeps_stale_value(clock):
+    cache = _cache()
+    key = ("recent", 10)
+    cache.get(key, CountingLoader("old"))
+    clock.now += TTL + 1
+    
+    def failing():
+        raise ConnectionError("offline")
+    
+    assert cache.get(key, failing) == "old"
+    _drain(cache)
+    
+    assert cache.get(key, failing) == "old"
+    _drain(cache)
+    assert cache.stats()["namespaces"]["recent"]["refresh_errors"] == 2
+
+def test_invalidate_during_load_discards_loaded_value(clock):
+    cache = _cache()
+    key = ("recent", 10)
+    
+    def load_then_invalidate():
+        # A write lands while the read is still in flight
+        cache.invalidate("recent")
+        return "old"
+    
+    assert cache.get(key, load_then_invalidate) == "old"
+    
+    loader = CountingLoader("new")
+    assert cache.get(key, loader) == "new"
+    assert loader.calls == 1
+
+def test_invalidate_during_refresh_discards_refreshed_value(clock):
+    cache = _cache()
+    key = ("recent", 10)
+    cache.get(key, CountingLoader("old"))
+    clock.now += TTL + 1
+    loader = CountingLoader("stale", block=True)
+    
+    assert cache.get(key, loader) == "old"
+    assert loader.started.wait(5)
+    cache.invalidate("recent")
+    loader.release()
+    _drain(cache)
+    
+    fresh = CountingLoader("new")
+    assert cache.get(key, fresh) == "new"
+    assert fresh.calls == 1
+
+def test_invalidate_leaves_other_namespaces(clock):
+    cache = _cache()
+    cache.get(("recent", 10), CountingLoader("recent"))
+    cache.get(("activity", 1), CountingLoader("activity"))
+    
+    cache.invalidate("recent")
+    
+    loader = CountingLoader("reloaded")
+    assert cache.get(("recent", 10), loader) == "reloaded"
+    assert cache.get(("activity", 1), loader) == "activity"
+    assert loader.calls == 1
\ No newline at end of file
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from benchmarks.format_table import per_row_table
+from benchmarks.generator import generate_activities
+from utils.formatting import TABLE_COLUMNS, format_activities_table
+from utils.sqlite_handler import SQLiteHandler
+
+GENERATED_ROWS = 20_000
+
+# Rows the generator doesn't produce, each with a location or field shape
+# the formatters handle separately
+EDGE_ROWS = [
+    {"timestamp": "2025-03-01T09:30:00Z", "type": "live", "location": {"lat": 51.5, "lng": -0.12, "description": ""},
+     "perception_score": None, "description": "Coordinates only", "tags": ["walk"]},
+    {"timestamp": "2025-03-01T09:30:00+02:00", "type": "live", "location": {"lat": 0, "lng": 12.5},
+     "perception_score": 2, "description": "Zero latitude", "tags": []},
+    {"timestamp": "yesterday", "type": "historical", "location": "Riverside park",
+     "perception_score": -1, "description": "x" * 80, "tags": None},
+    {"timestamp": "2025-03-01 09:30:00", "type": "historical", "location": None,
+     "perception_score": 0, "description": "", "tags": ["a", "b"]},
+    {"timestamp": "2025-03-01T09:30", "type": "live", "location": {},
+     "perception_score": 5, "description": "Empty location", "tags": "already, joined"}
+]
+
+@pytest.fixture(scope="module")
+def handler():
+    # The formatters need no cache or connection
+    return SQLiteHandler.__new__(SQLiteHandler)
+
+def _per_row(handler, activities):
+    table = per_row_table(handler, [dict(activity) for activity in activities])
+    # The two intended differences (see format_activities_table)
+    table["Score"] = pd.to_numeric(table["Score"]).astype("Int64")
+    table["Tags"] = table["Tags"].map(lambda tags: tags if isinstance(tags, str) else "")
+    return table
+
+def _assert_same_cells(table, expected):
+    assert list(table.columns) == list(TABLE_COLUMNS)
+    for column in TABLE_COLUMNS:
+        assert table[column].tolist() == expected[column].tolist(), column
+
+def test_matches_per_row_formatter_on_generated_rows(handler):
+    activities = list(generate_activities(GENERATED_ROWS, seed=1))
+    
+    table = format_activities_table(activities)
+    
+    _assert_same_cells(table, _per_row(handler, activities))
+    assert table["Score"].dtype == "Int64"
+    assert (table["Tags"] == "").any()
+
+def test_matches_per_row_formatter_on_edge_rows(handler):
+    table = format_activities_table(EDGE_ROWS, description_length=20)
+    
+    _assert_same_cells(table, _per_row(handler, EDGE_ROWS).assign(
+        Description=[row["description"][:20] + ("..." if len(row["description"]) > 20 else "") for row in EDGE_ROWS]
+    ))
+    assert table["Location"].tolist() == [
+        "51.5000, -0.1200", "Not specified", "Riverside park", "Not specified", "Not specified"
+    ]
+    assert table["Score"].isna().tolist() == [True, False, False, False, False]
+
+@pytest.mark.parametrize("shape", ["dicts", "columns", "frame"])
+def test_input_shapes_give_same_table(shape):
+    expected = format_activities_table(EDGE_ROWS)
+    activities = {
+        "dicts": EDGE_ROWS,
+        "columns": {key: [row[key] for row in EDGE_ROWS] for key in EDGE_ROWS[0]},
+        "frame": pd.DataFrame(EDGE_ROWS)
+    }[shape]
+    
+    pd.testing.assert_frame_equal(format_activities_table(activities), expected)
+
+def test_empty_input_has_table_columns():
+    assert list(format_activities_table([]).columns) == list(TABLE_COLUMNS)
\ No newline at end of file
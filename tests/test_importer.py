@@ -0,0 +1,132 @@
+import io
+import json
+
+import pytest
+
+from utils import importer
+from utils.importer import ValidationError, import_activities, iter_valid_activities, validate_activity
+from utils.sqlite_handler import SQLiteHandler
+
+ACTIVITY_ID = "6f1c2a34-3b1e-4d8a-9c55-0e2a7f0b9d11"
+BASE = {"timestamp": "2025-03-01T09:30:00", "type": "live"}
+
+# (row fields on top of BASE, expected fields of the validated activity)
+VALID_ROWS = [
+    ({}, {"location": None, "perception_score": None, "tags": [], "description": "", "timer_duration": None}),
+    ({"type": " Historical "}, {"type": "historical"}),
+    ({"timestamp": "2025-03-01T09:30:00Z"}, {"timestamp": "2025-03-01T09:30:00+00:00"}),
+    ({"perception_score": "3.0", "timer_duration": "120"}, {"perception_score": 3, "timer_duration": 120}),
+    ({"perception_score": -5}, {"perception_score": -5}),
+    ({"perception_score": " "}, {"perception_score": None}),
+    ({"tags": "walk, park,,"}, {"tags": ["walk", "park"]}),
+    ({"tags": '["walk", " park "]'}, {"tags": ["walk", "park"]}),
+    ({"tags": ["walk", ""]}, {"tags": ["walk"]}),
+    ({"description": "  Morning walk  "}, {"description": "Morning walk"}),
+    (
+        {"location": {"lat": "51.5", "lng": -0.12, "description": "London"}},
+        {"location": {"lat": 51.5, "lng": -0.12, "description": "London"}}
+    ),
+    (
+        {"location": '{"lat": 48.85, "lng": 2.35}'},
+        {"location": {"lat": 48.85, "lng": 2.35, "description": "Not specified"}}
+    ),
+    ({"location": "Riverside park"}, {"location": {"lat": None, "lng": None, "description": "Riverside park"}}),
+    ({"location": ""}, {"location": None}),
+    (
+        {"lat": "40.7", "lng": "-74.0", "location_description": "New York"},
+        {"location": {"lat": 40.7, "lng": -74.0, "description": "New York"}}
+    ),
+    ({"lat": "40.7", "lng": "", "location_description": ""}, {"location": {"lat": 40.7, "lng": None, "description": "Not specified"}}),
+    (
+        {"id": ACTIVITY_ID.upper(), "created_at": "2024-12-31T23:00:00+00:00"},
+        {"id": ACTIVITY_ID, "created_at": "2024-12-31T23:00:00+00:00"}
+    ),
+    ({"id": "", "created_at": ""}, {})
+]
+
+# (row fields on top of BASE, start of the error message)
+INVALID_ROWS = [
+    ({"colour": "red"}, "unknown columns: colour"),
+    ({"type": "future"}, "type:"),
+    ({"type": None}, "type:"),
+    ({"timestamp": ""}, "timestamp: is required"),
+    ({"timestamp": "yesterday"}, "timestamp: must be an ISO 8601"),
+    ({"perception_score": "3.5"}, "perception_score: must be an integer"),
+    ({"perception_score": "high"}, "perception_score: must be an integer"),
+    ({"perception_score": True}, "perception_score: must be an integer"),
+    ({"perception_score": 6}, "perception_score: must be between -5 and 5"),
+    ({"timer_duration": -1}, "timer_duration: must not be negative"),
+    ({"description": 12}, "description: must be a string"),
+    ({"tags": "[walk"}, "tags: invalid JSON array"),
+    ({"tags": [1, 2]}, "tags: must be a list of strings"),
+    ({"location": [51.5, -0.12]}, "location: must be a JSON object"),
+    ({"location": {"lat": 91, "lng": 0}}, "location.lat: must be between -90 and 90"),
+    ({"lat": "0", "lng": "east"}, "location.lng: must be a number"),
+    ({"location": {"description": 5}}, "location.description: must be a string"),
+    ({"id": "42"}, "id: must be a UUID"),
+    ({"created_at": "soon"}, "created_at: must be an ISO 8601")
+]
+
+@pytest.fixture
+def handler(tmp_path):
+    return SQLiteHandler(tmp_path / "activities.db", tmp_path / "media")
+
+@pytest.mark.parametrize("fields, expected", VALID_ROWS)
+def test_valid_row(fields, expected):
+    activity = validate_activity({**BASE, **fields})
+    
+    assert {key: activity.get(key) for key in expected} == expected
+    if "id" not in expected:
+        assert "id" not in activity and "created_at" not in activity
+
+@pytest.mark.parametrize("fields, error", INVALID_ROWS)
+def test_invalid_row(fields, error):
+    with pytest.raises(ValidationError) as info:
+        validate_activity({**BASE, **fields})
+    
+    assert str(info.value).startswith(error)
+
+def test_reported_errors_are_capped(monkeypatch):
+    monkeypatch.setattr(importer, "MAX_REPORTED_ERRORS", 3)
+    lines = ["not json", json.dumps([1]), *(json.dumps({**BASE, "type": "bad"}) for _ in range(3)), json.dumps(BASE)]
+    report = {"valid": 0, "invalid": 0, "invalid_rows": []}
+    
+    activities = list(iter_valid_activities(io.StringIO("\n".join(lines)), "jsonl", report))
+    
+    assert len(activities) == report["valid"] == 1
+    assert report["invalid"] == 5
+    assert [invalid["line"] for invalid in report["invalid_rows"]] == [1, 2, 3]
+    assert report["invalid_rows"][0]["error"].startswith("invalid JSON")
+    assert report["invalid_rows"][1]["error"] == "each line must be a JSON object"
+
+def test_import_csv(handler):
+    file = io.StringIO(
+        "timestamp,type,perception_score,tags,description,lat,lng,location_description\n"
+        "2025-03-01T09:30:00,live,3.0,\"walk, park\",Morning walk,51.5,-0.12,London\n"
+        "2025-03-01T10:00:00,live,9,,Too happy,,,\n"
+        "2025-03-02T18:00:00,historical,-2,,Evening,,,\n"
+    )
+    
+    report = import_activities(handler, file, "csv", chunk_size=1)
+    
+    assert (report["valid"], report["invalid"], report["inserted"], report["failed"]) == (2, 1, 2, 0)
+    assert report["invalid_rows"] == [{"line": 3, "error": "perception_score: must be between -5 and 5"}]
+    activities = {activity["description"]: activity for activity in handler.get_recent_activities(10)}
+    assert set(activities) == {"Morning walk", "Evening"}
+    assert activities["Morning walk"]["perception_score"] == 3
+    assert activities["Morning walk"]["tags"] == ["walk", "park"]
+    assert activities["Morning walk"]["location"] == {"lat": 51.5, "lng": -0.12, "description": "London"}
+
+def test_import_jsonl_keeps_ids(handler):
+    rows = [
+        {**BASE, "id": ACTIVITY_ID, "created_at": "2024-12-31T23:00:00+00:00", "tags": ["migrated"]},
+        {**BASE, "description": "New"}
+    ]
+    file = io.StringIO("\n".join(json.dumps(row) for row in rows) + "\n\n")
+    
+    report = import_activities(handler, file, "jsonl")
+    
+    assert (report["valid"], report["invalid"], report["inserted"]) == (2, 0, 2)
+    migrated = handler.get_activity(ACTIVITY_ID)
+    assert migrated["created_at"] == "2024-12-31T23:00:00+00:00"
+    assert migrated["tags"] == ["migrated"]
\ No newline at end of file
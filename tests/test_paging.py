@@ -0,0 +1,99 @@
+import pytest
+
+from utils.query import SUMMARY_QUERY
+from utils.sqlite_handler import SQLiteHandler
+
+# Newest first, as the pages should return them. Three rows share a
+# created_at, so the page boundaries fall inside the tie and only the id
+# keeps the order stable.
+ROWS = [
+    ("2025-03-03T09:00:00+00:00", "07", ["walk"]),
+    ("2025-03-03T09:00:00+00:00", "06", []),
+    ("2025-03-02T09:00:00+00:00", "05", ["walk"]),
+    ("2025-03-02T09:00:00+00:00", "04", []),
+    ("2025-03-02T09:00:00+00:00", "03", ["walk"]),
+    ("2025-03-01T09:00:00+00:00", "02", []),
+    ("2025-03-01T09:00:00+00:00", "01", ["walk"])
+]
+NEWEST_FIRST = [activity_id for _, activity_id, _ in ROWS]
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = SQLiteHandler(tmp_path / "activities.db", tmp_path / "media")
+    report = handler.add_activities_batch([
+        {
+            "id": activity_id, "created_at": created_at, "type": "live",
+            "description": f"Activity {activity_id}", "perception_score": 0, "tags": tags
+        }
+        # Inserted out of order, so the table order can't stand in for the index
+        for created_at, activity_id, tags in sorted(ROWS, key=lambda row: row[1])
+    ])
+    assert report["inserted"] == len(ROWS)
+    return handler
+
+def _ids(page):
+    return [activity["id"] for activity in page["activities"]]
+
+def _walk_forward(handler, page_size, **kwargs):
+    pages = [handler.get_activities_page(page_size, **kwargs)]
+    while pages[-1]["next_cursor"]:
+        pages.append(handler.get_activities_page(page_size, cursor=pages[-1]["next_cursor"], **kwargs))
+    return pages
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 7, 10])
+def test_forward_pages_cover_every_row_once(handler, page_size):
+    pages = _walk_forward(handler, page_size)
+    
+    assert [activity_id for page in pages for activity_id in _ids(page)] == NEWEST_FIRST
+    assert all(len(_ids(page)) == page_size for page in pages[:-1])
+    assert pages[0]["prev_cursor"] is None
+    assert pages[-1]["next_cursor"] is None
+    assert all(page["prev_cursor"] for page in pages[1:])
+    assert all(page["next_cursor"] for page in pages[:-1])
+
+def test_cursor_is_first_and_last_row(handler):
+    first, second = _walk_forward(handler, 2)[:2]
+    
+    assert first["next_cursor"] == {"created_at": ROWS[1][0], "id": "06"}
+    assert second["prev_cursor"] == {"created_at": ROWS[2][0], "id": "05"}
+    assert second["next_cursor"] == {"created_at": ROWS[3][0], "id": "04"}
+
+@pytest.mark.parametrize("page_size", [1, 2, 3])
+def test_backward_pages_return_to_newest(handler, page_size):
+    forward = _walk_forward(handler, page_size)
+    
+    backward = [forward[-1]]
+    while backward[-1]["prev_cursor"]:
+        backward.append(handler.get_activities_page(page_size, cursor=backward[-1]["prev_cursor"], direction="prev"))
+    
+    # Each page going back matches the one seen going forward, still newest first
+    assert [_ids(page) for page in reversed(backward)] == [_ids(page) for page in forward]
+    assert backward[-1]["prev_cursor"] is None
+    assert backward[-1]["next_cursor"] == forward[0]["next_cursor"]
+
+def test_previous_page_short_of_newest_keeps_full_size(handler):
+    # Going back from the second page of three lands on a full first page
+    forward = _walk_forward(handler, 3)
+    
+    page = handler.get_activities_page(3, cursor=forward[1]["prev_cursor"], direction="prev")
+    
+    assert _ids(page) == NEWEST_FIRST[:3]
+    assert page["prev_cursor"] is None
+    assert page["next_cursor"] == forward[0]["next_cursor"]
+
+def test_next_past_oldest_row_is_empty(handler):
+    page = handler.get_activities_page(2, cursor={"created_at": ROWS[-1][0], "id": "01"})
+    
+    assert page == {"activities": [], "next_cursor": None, "prev_cursor": None}
+
+def test_tag_pages_skip_untagged_rows(handler):
+    pages = _walk_forward(handler, 1, tag="walk")
+    
+    assert [activity_id for page in pages for activity_id in _ids(page)] == ["07", "05", "03", "01"]
+    assert pages[-1]["next_cursor"] is None
+
+def test_query_pages_hold_typed_rows(handler):
+    pages = _walk_forward(handler, 4, query=SUMMARY_QUERY)
+    
+    assert [row.id for page in pages for row in page["activities"]] == NEWEST_FIRST
+    assert pages[1]["prev_cursor"] == {"created_at": ROWS[4][0], "id": "03"}
\ No newline at end of file
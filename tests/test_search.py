@@ -0,0 +1,83 @@
+import pytest
+
+from utils.search import SearchIndex, tokenize
+from utils.sqlite_handler import SQLiteHandler
+
+# Numbered oldest first; "river" appears in a different field of each
+DOCUMENTS = [
+    {"id": "description", "tags": ["walk"], "description": "Along the river at dusk", "location": None},
+    {"id": "tag", "tags": ["river", "walk"], "description": "Evening stroll", "location": None},
+    {"id": "location", "tags": [], "description": "Quiet bench", "location": {"description": "River Park"}},
+    {"id": "unrelated", "tags": ["work"], "description": "Meeting notes", "location": {"description": "Office"}}
+]
+
+def _index(documents=DOCUMENTS):
+    index = SearchIndex()
+    index.add(documents)
+    return index
+
+def test_tokenize_drops_stop_words_and_case():
+    assert tokenize("The River, and THE bridge!") == ["river", "bridge"]
+    assert tokenize(None) == []
+
+def test_tag_match_ranks_above_description_and_location():
+    assert _index().search("river", 10) == ["tag", "description", "location"]
+
+def test_repeated_term_outranks_single_mention():
+    index = _index([
+        {"id": "once", "tags": [], "description": "river", "location": None},
+        {"id": "twice", "tags": [], "description": "river river", "location": None}
+    ])
+    
+    assert index.search("river", 10) == ["twice", "once"]
+
+def test_equal_scores_list_newest_first():
+    index = _index([
+        {"id": f"walk-{number}", "tags": [], "description": "walk", "location": None} for number in range(5)
+    ])
+    
+    assert index.search("walk", 3) == ["walk-4", "walk-3", "walk-2"]
+    assert index.search("walk", 3, offset=3) == ["walk-1", "walk-0"]
+
+def test_every_term_must_match():
+    index = _index()
+    
+    assert index.search("river walk", 10) == ["tag", "description"]
+    assert index.search("river office", 10) == []
+    assert index.search("the and", 10) == []
+
+def test_documents_are_indexed_once():
+    index = _index()
+    index.add(DOCUMENTS[:2])
+    
+    assert len(index) == len(DOCUMENTS)
+    assert index.search("river", 10) == ["tag", "description", "location"]
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = SQLiteHandler(tmp_path / "activities.db", tmp_path / "media")
+    for document in DOCUMENTS:
+        handler.add_activity({
+            "id": document["id"], "type": "live", "perception_score": 0, "tags": document["tags"],
+            "description": document["description"], "location": document["location"]
+        })
+    return handler
+
+def _search_ids(handler, text):
+    return [activity.id for activity in handler.search_activities(text)["activities"]]
+
+def test_sqlite_search_ranks_through_index(handler):
+    assert _search_ids(handler, "river") == ["tag", "description", "location"]
+
+def test_sqlite_index_follows_add_activity(handler):
+    # Build the index, and cache the result, before the new activity arrives
+    assert _search_ids(handler, "kayak") == []
+    
+    handler.add_activity({
+        "id": "kayak", "type": "live", "perception_score": 3, "tags": ["kayak", "river"],
+        "description": "Paddling", "location": None
+    })
+    
+    assert _search_ids(handler, "kayak") == ["kayak"]
+    # Tied with the older tag match, the new activity comes first
+    assert _search_ids(handler, "river") == ["kayak", "tag", "description", "location"]
\ No newline at end of file
@@ -0,0 +1,155 @@
+import io
+import os
+
+import httpx
+import pytest
+
+from benchmarks.stand_in import StandInServer
+from utils.tus import TusUploader, TusUploadError, UploadResumeStore
+
+CHUNK_SIZE = 1024
+FILE_SIZE = 5 * CHUNK_SIZE + 100
+METADATA = {"bucketName": "activity-media", "objectName": "videos/test.mp4", "contentType": "video/*"}
+
+class FlakyTransport(httpx.HTTPTransport):
+    """Fails chosen PATCH requests, counted from 1
+
+    A request in `fail_before` never reaches the server; one in `fail_after`
+    is stored by the server but its response is lost.
+    """
+    
+    def __init__(self, fail_before=(), fail_after=()):
+        super().__init__()
+        self.fail_before = set(fail_before)
+        self.fail_after = set(fail_after)
+        self.patch_offsets = []
+    
+    def handle_request(self, request):
+        if request.method != "PATCH":
+            return super().handle_request(request)
+        self.patch_offsets.append(int(request.headers["Upload-Offset"]))
+        if len(self.patch_offsets) in self.fail_before:
+            raise httpx.ConnectError("connection refused", request=request)
+        response = super().handle_request(request)
+        if len(self.patch_offsets) in self.fail_after:
+            response.close()
+            raise httpx.ReadError("connection reset", request=request)
+        return response
+
+@pytest.fixture(scope="module")
+def server():
+    server = StandInServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def endpoint(server):
+    server.database.reset()
+    return f"{server.url}/storage/v1/upload/resumable"
+
+def _uploader(endpoint, transport, max_retries=3):
+    return TusUploader(
+        endpoint,
+        chunk_size=CHUNK_SIZE,
+        max_retries=max_retries,
+        retry_delay=0,
+        http_client=httpx.Client(transport=transport)
+    )
+
+def _stored(server, upload_url):
+    return bytes(server.database.uploads[upload_url.rsplit("/", 1)[-1]]["data"])
+
+def test_upload_sends_file_in_chunks(server, endpoint):
+    content = os.urandom(FILE_SIZE)
+    transport = FlakyTransport()
+    
+    upload_url = _uploader(endpoint, transport).upload(io.BytesIO(content), FILE_SIZE, METADATA)
+    
+    assert _stored(server, upload_url) == content
+    assert transport.patch_offsets == list(range(0, FILE_SIZE, CHUNK_SIZE))
+    assert server.database.objects[METADATA["objectName"]] == FILE_SIZE
+
+def test_interrupted_upload_resumes_at_server_offset(server, endpoint):
+    content = os.urandom(FILE_SIZE)
+    store = UploadResumeStore()
+    key = METADATA["objectName"]
+    
+    # The third chunk fails with no retries left, after two were stored
+    with pytest.raises(httpx.ConnectError):
+        _uploader(endpoint, FlakyTransport(fail_before={3}), max_retries=0).upload(
+            io.BytesIO(content), FILE_SIZE, METADATA,
+            on_created=lambda upload_url: store.set(key, {"upload_url": upload_url})
+        )
+    pending = store.get(key)
+    assert pending is not None
+    
+    transport = FlakyTransport()
+    upload_url = _uploader(endpoint, transport).upload(
+        io.BytesIO(content), FILE_SIZE, METADATA, upload_url=pending["upload_url"]
+    )
+    
+    assert upload_url == pending["upload_url"]
+    assert transport.patch_offsets == list(range(2 * CHUNK_SIZE, FILE_SIZE, CHUNK_SIZE))
+    assert _stored(server, upload_url) == content
+
+def test_failed_chunk_is_retried(server, endpoint):
+    content = os.urandom(FILE_SIZE)
+    transport = FlakyTransport(fail_before={2})
+    
+    upload_url = _uploader(endpoint, transport).upload(io.BytesIO(content), FILE_SIZE, METADATA)
+    
+    # The second chunk never arrived, so it is sent again from the same offset
+    assert transport.patch_offsets[:3] == [0, CHUNK_SIZE, CHUNK_SIZE]
+    assert _stored(server, upload_url) == content
+
+def test_retry_continues_from_head_confirmed_offset(server, endpoint):
+    content = os.urandom(FILE_SIZE)
+    transport = FlakyTransport(fail_after={2})
+    
+    upload_url = _uploader(endpoint, transport).upload(io.BytesIO(content), FILE_SIZE, METADATA)
+    
+    # The server stored the second chunk, so HEAD moves the upload past it
+    assert transport.patch_offsets[:3] == [0, CHUNK_SIZE, 2 * CHUNK_SIZE]
+    assert _stored(server, upload_url) == content
+
+def test_retries_are_limited(endpoint):
+    with pytest.raises(httpx.ConnectError):
+        _uploader(endpoint, FlakyTransport(fail_before={2, 3, 4}), max_retries=2).upload(
+            io.BytesIO(os.urandom(FILE_SIZE)), FILE_SIZE, METADATA
+        )
+
+def test_stale_resume_url_starts_fresh_upload(server, endpoint):
+    content = os.urandom(FILE_SIZE)
+    stale_url = f"{endpoint}/expired"
+    created = []
+    transport = FlakyTransport()
+    
+    upload_url = _uploader(endpoint, transport).upload(
+        io.BytesIO(content), FILE_SIZE, METADATA, upload_url=stale_url, on_created=created.append
+    )
+    
+    assert upload_url != stale_url
+    assert created == [upload_url]
+    assert transport.patch_offsets[0] == 0
+    assert _stored(server, upload_url) == content
+
+def test_upload_expiring_midway_is_an_error(server, endpoint):
+    class ExpiringTransport(FlakyTransport):
+        def handle_request(self, request):
+            if request.method == "HEAD":
+                server.database.uploads.clear()
+            return super().handle_request(request)
+    
+    with pytest.raises(TusUploadError, match="expired"):
+        _uploader(endpoint, ExpiringTransport(fail_before={2})).upload(
+            io.BytesIO(os.urandom(FILE_SIZE)), FILE_SIZE, METADATA
+        )
+
+def test_resume_store_forgets_finished_uploads():
+    store = UploadResumeStore()
+    store.set("videos/a.mp4", {"upload_url": "http://storage/upload/1"})
+    
+    assert store.get("videos/a.mp4") == {"upload_url": "http://storage/upload/1"}
+    store.remove("videos/a.mp4")
+    store.remove("videos/a.mp4")
+    assert store.get("videos/a.mp4") is None
\ No newline at end of file
@@ -0,0 +1,174 @@
+import pytest
+
+from utils import write_queue
+from utils.sqlite_handler import SQLiteHandler
+from utils.write_queue import MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, ActivityQueue
+
+class FakeClock:
+    """Stands in for the time module in utils.write_queue, moved on by hand"""
+    
+    def __init__(self):
+        self.now = 1_000_000.0
+    
+    def time(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+class FlakyHandler:
+    """Wraps a real handler, failing chosen add_activities_batch calls
+
+    `fail_before` calls (counted from 1, or every call with True) write
+    nothing; `fail_after` calls write the rows but report the chunk as
+    failed, like a response lost on the way back. Rows whose description is
+    in `bad_descriptions` always fail their chunk.
+    """
+    
+    def __init__(self, handler, fail_before=(), fail_after=(), bad_descriptions=()):
+        self.handler = handler
+        self.fail_before = fail_before
+        self.fail_after = set(fail_after)
+        self.bad_descriptions = set(bad_descriptions)
+        self.calls = []
+    
+    def add_activities_batch(self, activities, chunk_size=500, ignore_duplicates=False):
+        self.calls.append({"ids": [activity["id"] for activity in activities], "ignore_duplicates": ignore_duplicates})
+        call = len(self.calls)
+        if self.fail_before is True or call in self.fail_before or any(
+            activity.get("description") in self.bad_descriptions for activity in activities
+        ):
+            return self._failed(activities, "connection refused")
+        report = self.handler.add_activities_batch(activities, chunk_size, ignore_duplicates)
+        if call in self.fail_after:
+            return self._failed(activities, "read timed out")
+        return report
+    
+    def _failed(self, activities, error):
+        return {
+            "inserted": 0, "duplicates": 0, "failed": len(activities),
+            "failed_chunks": [{"chunk": 0, "first_row": 0, "rows": len(activities), "error": error}],
+            "rollups_stale": False, "tags_stale": False
+        }
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(write_queue, "time", clock)
+    return clock
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return ActivityQueue(str(tmp_path / "queue.db"))
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteHandler(tmp_path / "activities.db", tmp_path / "media")
+
+def _activity(description):
+    return {"timestamp": "2025-03-01T09:30:00", "type": "live", "perception_score": 1, "description": description}
+
+def _backend_ids(backend):
+    return sorted(row["id"] for row in backend.connection.execute("SELECT id FROM activities"))
+
+def _next_attempt_delays(queue, clock):
+    rows = queue._connection.execute("SELECT next_attempt_at FROM queued_activities ORDER BY enqueued_at").fetchall()
+    return [row[0] - clock.now for row in rows]
+
+def test_flush_writes_batch_and_empties_queue(queue, backend):
+    ids = [queue.enqueue(_activity(f"Activity {number}")) for number in range(3)]
+    handler = FlakyHandler(backend)
+    
+    assert queue.flush(handler) == 3
+    
+    assert handler.calls == [{"ids": ids, "ignore_duplicates": True}]
+    assert _backend_ids(backend) == sorted(ids)
+    assert queue.counts() == {"pending": 0, "failed": 0}
+    assert queue.flush(handler) == 0
+
+def test_failed_flush_keeps_rows_until_backoff_passes(queue, backend, clock):
+    ids = [queue.enqueue(_activity(f"Activity {number}")) for number in range(2)]
+    handler = FlakyHandler(backend, fail_before={1})
+    
+    assert queue.flush(handler) == 0
+    assert queue.counts() == {"pending": 2, "failed": 0}
+    assert _next_attempt_delays(queue, clock) == [RETRY_BASE_DELAY, RETRY_BASE_DELAY]
+    
+    # Not due yet
+    clock.now += RETRY_BASE_DELAY - 1
+    assert queue.flush(handler) == 0
+    assert len(handler.calls) == 1
+    
+    clock.now += 1
+    assert queue.flush(handler) == 2
+    assert _backend_ids(backend) == sorted(ids)
+    assert queue.counts() == {"pending": 0, "failed": 0}
+
+def test_backoff_doubles_up_to_cap_then_dead_letters(queue, backend, clock):
+    queue.enqueue(_activity("Never arrives"))
+    handler = FlakyHandler(backend, fail_before=True)
+    
+    delays = []
+    for _ in range(MAX_ATTEMPTS - 1):
+        assert queue.flush(handler) == 0
+        [delay] = _next_attempt_delays(queue, clock)
+        delays.append(delay)
+        clock.now += delay
+    
+    assert delays == [min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) for attempt in range(MAX_ATTEMPTS - 1)]
+    assert delays[-1] == RETRY_MAX_DELAY
+    assert queue.counts() == {"pending": 1, "failed": 0}
+    
+    # The last attempt moves the row to failed, where flush leaves it alone
+    assert queue.flush(handler) == 0
+    assert queue.counts() == {"pending": 0, "failed": 1}
+    clock.now += RETRY_MAX_DELAY * 10
+    assert queue.flush(handler) == 0
+    assert len(handler.calls) == MAX_ATTEMPTS
+    
+    [failed] = queue.failed_activities()
+    assert failed["activity"]["description"] == "Never arrives"
+    assert (failed["attempts"], failed["error"]) == (MAX_ATTEMPTS, "connection refused")
+
+def test_retry_failed_sends_dead_letters_again(queue, backend, monkeypatch):
+    monkeypatch.setattr(write_queue, "MAX_ATTEMPTS", 1)
+    activity_id = queue.enqueue(_activity("Second chance"))
+    
+    assert queue.flush(FlakyHandler(backend, fail_before=True)) == 0
+    assert queue.counts() == {"pending": 0, "failed": 1}
+    
+    queue.retry_failed()
+    
+    assert queue.flush(FlakyHandler(backend)) == 1
+    assert _backend_ids(backend) == [activity_id]
+    assert queue.failed_activities() == []
+
+def test_lost_response_is_not_duplicated_on_retry(queue, backend, clock):
+    ids = [queue.enqueue(_activity(f"Activity {number}")) for number in range(3)]
+    # The first flush is stored by the backend but its response is lost
+    handler = FlakyHandler(backend, fail_after={1})
+    
+    assert queue.flush(handler) == 0
+    assert queue.counts()["pending"] == 3
+    
+    clock.now += RETRY_BASE_DELAY
+    assert queue.flush(handler) == 3
+    
+    assert all(call["ignore_duplicates"] for call in handler.calls)
+    assert _backend_ids(backend) == sorted(ids)
+    assert queue.counts() == {"pending": 0, "failed": 0}
+
+def test_retried_rows_go_one_at_a_time(queue, backend, clock):
+    good = [queue.enqueue(_activity(f"Activity {number}")) for number in range(2)]
+    bad = queue.enqueue(_activity("Rejected"))
+    handler = FlakyHandler(backend, bad_descriptions={"Rejected"})
+    
+    # The bad row fails the first batch for everyone
+    assert queue.flush(handler) == 0
+    
+    clock.now += RETRY_BASE_DELAY
+    assert queue.flush(handler) == 2
+    
+    assert [call["ids"] for call in handler.calls[1:]] == [[good[0]], [good[1]], [bad]]
+    assert _backend_ids(backend) == sorted(good)
+    assert queue.counts() == {"pending": 1, "failed": 0}
\ No newline at end of file
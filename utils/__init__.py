@@ -0,0 +1,8 @@
+"""Activity Tracker data access, location and formatting helpers
+
+Settings from a .env file are loaded here, once, so they are in the
+environment before any module reads them at import time.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
\ No newline at end of file
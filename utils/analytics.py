@@ -0,0 +1,88 @@
+import pandas as pd
+
+# Additive rollup columns; every trend is derived from these sums
+ROLLUP_SUMS = ("activity_count", "perception_count", "perception_sum", "perception_sum_sq", "timer_duration_total")
+ROLLUP_COLUMNS = ("day", "type") + ROLLUP_SUMS
+
+# Trend granularity -> pandas frequency. Weeks start on Monday and every
+# period is labelled with its first day.
+TREND_FREQUENCIES = {
+    "daily": "D",
+    "weekly": "W-MON",
+    "monthly": "MS",
+}
+
+def rollups_frame(rows):
+    """Build a DataFrame with ROLLUP_COLUMNS from rollup row dicts, one column at a time"""
+    frame = pd.DataFrame({column: [row.get(column) for row in rows] for column in ROLLUP_COLUMNS})
+    frame["day"] = pd.to_datetime(frame["day"])
+    frame["type"] = frame["type"].fillna("unknown").astype(str)
+    for column in ROLLUP_SUMS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(0).astype("int64")
+    return frame
+
+def _perception_stats(sums):
+    # Mean and population standard deviation from the running sums, the same
+    # way summarize_rollups does it for a single group
+    count = sums["perception_count"].where(sums["perception_count"] > 0)
+    mean = sums["perception_sum"] / count
+    variance = (sums["perception_sum_sq"] / count - mean ** 2).clip(lower=0)
+    return mean.round(2), variance.pow(0.5).round(2)
+
+def resample_trends(frame, frequency, start_day=None, end_day=None):
+    """Bin a rollups frame into periods of `frequency` (a TREND_FREQUENCIES value)
+
+    Returns a dict of DataFrames indexed by period start: `summary` with
+    activity_count, avg_perception, perception_stddev and the hours tracked
+    across all types, and `counts` and `hours` with one column per type.
+    Periods without activities are kept, with zero counts and no perception
+    stats. Given start_day and end_day, the range is padded to cover them.
+    """
+    by_type = frame.pivot_table(index="day", columns="type", values=list(ROLLUP_SUMS), aggfunc="sum", fill_value=0)
+    if start_day is not None and end_day is not None:
+        by_type = by_type.reindex(pd.date_range(start_day, end_day, freq="D"), fill_value=0)
+    by_type = by_type.resample(frequency, label="left", closed="left").sum()
+    
+    sums = by_type.T.groupby(level=0).sum().T
+    avg_perception, perception_stddev = _perception_stats(sums)
+    summary = pd.DataFrame({
+        "activity_count": sums["activity_count"],
+        "avg_perception": avg_perception,
+        "perception_stddev": perception_stddev,
+        "hours": (sums["timer_duration_total"] / 3600).round(2)
+    })
+    return {
+        "summary": summary,
+        "counts": by_type["activity_count"],
+        "hours": (by_type["timer_duration_total"] / 3600).round(2)
+    }
+
+def build_trends(rows, start_day=None, end_day=None):
+    """Daily, weekly and monthly trends for rollup rows, keyed like TREND_FREQUENCIES"""
+    if not rows:
+        return {name: None for name in TREND_FREQUENCIES}
+    frame = rollups_frame(rows)
+    return {
+        name: resample_trends(frame, frequency, start_day, end_day)
+        for name, frequency in TREND_FREQUENCIES.items()
+    }
+
+def calendar_heatmap(daily_counts, end_day, weeks=53):
+    """Lay daily activity counts out as a GitHub-style calendar
+
+    `daily_counts` is a Series of counts indexed by day. Returns one row per
+    day of the `weeks` weeks ending with the week of end_day, with `day`,
+    `week` (the week's Monday), `weekday` (0 = Monday) and `activity_count`.
+    """
+    end = pd.Timestamp(end_day).normalize()
+    start = end - pd.Timedelta(days=end.weekday() + 7 * (weeks - 1))
+    days = pd.date_range(start, end, freq="D")
+    
+    counts = daily_counts.reindex(days, fill_value=0) if daily_counts is not None else pd.Series(0, index=days)
+    weekday = days.weekday
+    return pd.DataFrame({
+        "day": days,
+        "week": days - pd.to_timedelta(weekday, unit="D"),
+        "weekday": weekday,
+        "activity_count": counts.to_numpy().astype("int64")
+    })
\ No newline at end of file
@@ -0,0 +1,148 @@
+import streamlit as st
+import asyncio
+import os
+import threading
+from functools import partial
+
+from .supabase_client import create_async_supabase_client
+from .analytics import build_trends
+from .query import SUMMARY_QUERY, handle_preview_error, nearby_page, search_page
+from .metrics import instrument_operations
+from .supabase_requests import (
+    activity_request, box_rows_request, daily_rollups_request, dashboard_count_requests, dashboard_from_counts,
+    dashboard_from_summary, dashboard_summary_request, is_missing_function, location_clusters_request,
+    nearby_rows_request, recent_activities_request, related_tags_request, result_rows, search_request,
+    tag_suggestions_request
+)
+
+# Seconds each read in a gathered batch may take before it is abandoned
+ASYNC_READ_TIMEOUT = float(os.getenv("ASYNC_READ_TIMEOUT", "10"))
+
+class AsyncRunner:
+    """Event loop on a background thread that sync code can hand coroutines to
+
+    Streamlit runs page scripts on plain threads with no event loop, and an
+    async client is bound to the loop it was created on. One long-lived loop
+    per process lets every script run share the same async client and its
+    connection pool.
+    """
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-runner", daemon=True)
+        self._thread.start()
+    
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the loop and block until it returns"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+@st.cache_resource
+def get_async_runner() -> AsyncRunner:
+    """Get the process-wide background event loop"""
+    return AsyncRunner()
+
+@st.cache_resource
+def get_async_supabase_client():
+    """Get the process-wide async Supabase client, bound to the runner's loop"""
+    return get_async_runner().run(create_async_supabase_client())
+
+async def gather_with_timeouts(calls, timeout=ASYNC_READ_TIMEOUT):
+    """Await named coroutines concurrently, each under its own timeout
+
+    Returns {name: result}. A call that failed or timed out maps to its
+    exception instead, without affecting the others.
+    """
+    names = list(calls)
+    results = await asyncio.gather(
+        *(asyncio.wait_for(calls[name], timeout) for name in names),
+        return_exceptions=True
+    )
+    return dict(zip(names, results))
+
+@instrument_operations(prefix="async:")
+class AsyncSupabaseHandler:
+    """Async versions of SupabaseHandler's cached read primitives
+
+    The `_fetch_*` coroutines mirror the sync primitives of the same name and
+    return the same shapes: both build their requests with
+    utils.supabase_requests and only differ in awaiting them. Results go
+    through the same read cache, so sync and async reads share hits. Use
+    SupabaseHandler.gather_reads from page code rather than this class
+    directly.
+    """
+    
+    def __init__(self, cache):
+        self.cache = cache
+        self.client = get_async_supabase_client()
+    
+    async def read_many(self, plans, timeout=ASYNC_READ_TIMEOUT):
+        """Run cached reads concurrently; plans maps a name to (cache key, primitive name, args)"""
+        return await gather_with_timeouts(
+            {
+                name: self.cache.aget(key, partial(getattr(self, fetch), *args))
+                for name, (key, fetch, args) in plans.items()
+            },
+            timeout
+        )
+    
+    async def _select_activities(self, build, *args):
+        try:
+            return await build(self.client, *args).execute()
+        except Exception as e:
+            if not handle_preview_error(e):
+                raise
+            return await build(self.client, *args).execute()
+    
+    async def _fetch_recent_activities(self, limit, query):
+        return [query.trim(row) for row in result_rows(await self._select_activities(recent_activities_request, limit, query))]
+    
+    async def _fetch_recent_rows(self, limit, query):
+        return query.to_rows(await self._fetch_recent_activities(limit, query))
+    
+    async def _fetch_activity(self, activity_id):
+        rows = result_rows(await activity_request(self.client, activity_id).execute())
+        return rows[0] if rows else None
+    
+    async def _fetch_daily_rollups(self, start_day, end_day, activity_type):
+        return result_rows(await daily_rollups_request(self.client, start_day, end_day, activity_type).execute())
+    
+    async def _fetch_activity_trends(self, start_day, end_day):
+        return build_trends(await self._fetch_daily_rollups(start_day, end_day, None), start_day, end_day)
+    
+    async def _fetch_tag_suggestions(self, prefix, limit):
+        return result_rows(await tag_suggestions_request(self.client, prefix, limit).execute())
+    
+    async def _fetch_related_tags(self, tag, limit):
+        return result_rows(await related_tags_request(self.client, tag, limit).execute())
+    
+    async def _fetch_search_page(self, text, page, page_size):
+        # One extra row tells whether another page exists
+        result = await search_request(self.client, text, page_size + 1, page * page_size).execute()
+        return search_page(result_rows(result), page_size)
+    
+    async def _fetch_nearby_page(self, lat, lng, radius_km, limit):
+        return nearby_page(result_rows(await nearby_rows_request(self.client, lat, lng, radius_km, limit).execute()))
+    
+    async def _fetch_box_page(self, box, limit):
+        rows = result_rows(await self._select_activities(box_rows_request, box, limit))
+        return SUMMARY_QUERY.to_rows([SUMMARY_QUERY.trim(row) for row in rows])
+    
+    async def _fetch_location_clusters(self, box, size):
+        return result_rows(await location_clusters_request(self.client, box, size).execute())
+    
+    async def _fetch_dashboard_data(self, today, limit):
+        try:
+            result = await dashboard_summary_request(self.client, today, limit).execute()
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
+            return await self._fetch_dashboard_data_fallback(today, limit)
+        return dashboard_from_summary(result.data)
+    
+    async def _fetch_dashboard_data_fallback(self, today, limit):
+        # Exact-count head requests, issued together with the recent rows
+        requests = dashboard_count_requests(self.client, today)
+        recent = self._fetch_recent_activities(limit, SUMMARY_QUERY) if limit else asyncio.sleep(0, [])
+        *results, recent = await asyncio.gather(*(request.execute() for request in requests.values()), recent)
+        counts = {key: result.count or 0 for key, result in zip(requests, results)}
+        return dashboard_from_counts(counts, recent)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class _CacheEntry:
+    __slots__ = ("value", "stored_at", "ttl")
+    
+    def __init__(self, value, ttl):
+        self.value = value
+        self.stored_at = time.monotonic()
+        self.ttl = ttl
+    
+    def age(self):
+        return time.monotonic() - self.stored_at
+
+class ReadCache:
+    """Bounded LRU read cache with per-query TTLs and stale-while-revalidate
+
+    Keys are tuples whose first element is a namespace (e.g. "recent"), which
+    is what TTLs and invalidation are keyed on. An entry younger than its TTL
+    is served as a hit. An entry past its TTL but within the stale window is
+    served immediately while a background worker reloads it. Anything older,
+    or missing, is loaded synchronously.
+    """
+    
+    def __init__(self, max_entries=128, default_ttl=30, stale_ttl=300, ttls=None, refresh_workers=2):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.ttls = dict(ttls or {})
+        
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_tasks = set()
+        self._generations = {}
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self._stats = {}
+    
+    def get(self, key, loader):
+        """Return the cached value for key, calling loader() when needed"""
+        found, value, generation = self._lookup(key, lambda: self._schedule_refresh(key, loader))
+        if found:
+            return value
+        
+        value = loader()
+        self._store(key, value, self.ttls.get(key[0], self.default_ttl), generation)
+        return value
+    
+    async def aget(self, key, loader):
+        """Async get(): loader is a coroutine function, awaited on a miss
+        
+        Stale entries are refreshed by a task on the running event loop.
+        """
+        found, value, generation = self._lookup(key, lambda: self._schedule_async_refresh(key, loader))
+        if found:
+            return value
+        
+        value = await loader()
+        self._store(key, value, self.ttls.get(key[0], self.default_ttl), generation)
+        return value
+    
+    def _lookup(self, key, schedule_refresh):
+        # Returns (found, value, generation); calls schedule_refresh with the
+        # lock held when serving a stale entry
+        namespace = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = entry.age()
+                if age < entry.ttl:
+                    self._entries.move_to_end(key)
+                    self._count(namespace, "hits")
+                    return True, entry.value, None
+                if age < entry.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._count(namespace, "stale_hits")
+                    schedule_refresh()
+                    return True, entry.value, None
+            self._count(namespace, "misses")
+            return False, None, self._generations.get(namespace, 0)
+    
+    def invalidate(self, *namespaces):
+        """Drop every entry in the given namespaces (all entries if none given)"""
+        with self._lock:
+            if not namespaces:
+                namespaces = set(self._stats) | {key[0] for key in self._entries}
+            for key in list(self._entries):
+                if key[0] in namespaces:
+                    del self._entries[key]
+            # Bump generations so in-flight refreshes don't resurrect old data
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+    
+    def stats(self):
+        """Return hit/miss counters per namespace plus overall size"""
+        with self._lock:
+            per_namespace = {namespace: dict(counts) for namespace, counts in self._stats.items()}
+            totals = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refresh_errors": 0}
+            for counts in per_namespace.values():
+                for name, value in counts.items():
+                    totals[name] = totals.get(name, 0) + value
+            lookups = totals["hits"] + totals["stale_hits"] + totals["misses"]
+            totals["hit_ratio"] = round((totals["hits"] + totals["stale_hits"]) / lookups, 3) if lookups else 0
+            totals["size"] = len(self._entries)
+            totals["max_entries"] = self.max_entries
+            return {"total": totals, "namespaces": per_namespace}
+    
+    def _count(self, namespace, name):
+        counts = self._stats.setdefault(
+            namespace, {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "refresh_errors": 0}
+        )
+        counts[name] += 1
+    
+    def _store(self, key, value, ttl, generation):
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return
+            self._entries[key] = _CacheEntry(value, ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._count(evicted_key[0], "evictions")
+    
+    def _schedule_refresh(self, key, loader):
+        # Called with the lock held
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        generation = self._generations.get(key[0], 0)
+        ttl = self.ttls.get(key[0], self.default_ttl)
+        self._executor.submit(self._refresh, key, loader, ttl, generation)
+    
+    def _schedule_async_refresh(self, key, loader):
+        # Called with the lock held, on the event loop thread
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        generation = self._generations.get(key[0], 0)
+        ttl = self.ttls.get(key[0], self.default_ttl)
+        task = asyncio.get_running_loop().create_task(self._arefresh(key, loader, ttl, generation))
+        # The loop only keeps weak references to tasks
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    async def _arefresh(self, key, loader, ttl, generation):
+        try:
+            value = await loader()
+        except Exception:
+            with self._lock:
+                self._count(key[0], "refresh_errors")
+        else:
+            self._store(key, value, ttl, generation)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+    
+    def _refresh(self, key, loader, ttl, generation):
+        try:
+            value = loader()
+        except Exception:
+            # Keep serving the stale value; the next lookup will retry
+            with self._lock:
+                self._count(key[0], "refresh_errors")
+        else:
+            self._store(key, value, ttl, generation)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
\ No newline at end of file
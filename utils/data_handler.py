@@ -1,12 +1,154 @@
 import streamlit as st
 from datetime import datetime, date
-from .supabase_client import get_supabase_client
+from .supabase_client import get_http_client, get_supabase_client, health_check_request
+from .cache import ReadCache
+from .rollups import rollup_row_from_activity
+from .tags import TAG_SUGGESTION_LIMIT, parse_tags, tag_row_from_activity
+from .write_queue import ActivityQueue, DEFAULT_QUEUE_PATH
+from .query import FULL_QUERY, SUMMARY_QUERY, ActivityQuery, handle_preview_error, nearby_page, search_page
+from .geo import GRID_CELLS_ACROSS, WORLD, cell_size, clusters_extent
+from .metrics import instrument_operations
+from .supabase_requests import (
+    activity_request, box_rows_request, daily_rollups_request, dashboard_count_requests, dashboard_from_counts,
+    dashboard_from_summary, dashboard_summary_request, is_missing_function, location_clusters_request,
+    nearby_rows_request, page_rows_request, recent_activities_request, related_tags_request, result_rows,
+    search_request, tag_suggestions_request
+)
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+import abc
+import os
+import threading
 import uuid
 import io
+import hashlib
 
-class SupabaseHandler:
+# Seconds a cached read is served as fresh, per query namespace. Past its TTL
+# an entry is still served for CACHE_STALE_TTL seconds while it refreshes in
+# the background.
+CACHE_TTLS = {
+    "recent": 30,
+    "dashboard": 30,
+    "rollups": 60,
+    "trends": 60,
+    "tags": 60,
+    "search": 30,
+    "geo": 60,
+    "activity": 60,
+}
+CACHE_STALE_TTL = 300
+CACHE_MAX_ENTRIES = 128
+
+# Media files uploaded at the same time by process_media_uploads
+MEDIA_UPLOAD_CONCURRENCY = int(os.getenv("MEDIA_UPLOAD_CONCURRENCY", "4"))
+
+# Files above this size are streamed in chunks with a resumable upload
+# instead of being read into memory whole
+MEDIA_RESUMABLE_THRESHOLD = int(os.getenv("MEDIA_RESUMABLE_THRESHOLD", str(20 * 1024 * 1024)))
+
+@st.cache_resource
+def get_read_cache() -> ReadCache:
+    """Get the process-wide read cache shared by all sessions"""
+    return ReadCache(
+        max_entries=CACHE_MAX_ENTRIES,
+        stale_ttl=CACHE_STALE_TTL,
+        ttls=CACHE_TTLS
+    )
+
+@st.cache_resource
+def get_activity_queue() -> ActivityQueue:
+    """Get the process-wide local write queue and start its flush worker"""
+    queue = ActivityQueue(
+        path=os.getenv("ACTIVITY_QUEUE_PATH", DEFAULT_QUEUE_PATH),
+        handler_factory=get_handler_class()
+    )
+    queue.start_worker()
+    return queue
+
+@st.cache_resource
+def get_image_pool():
+    """Get the process-wide pool that recompresses images before upload"""
+    from .media import create_image_pool
+    
+    return create_image_pool()
+
+@st.cache_resource
+def get_media_index() -> "MediaIndex":
+    """Get the process-wide index from uploaded content hashes to stored URLs"""
+    from .media import MediaIndex
+    
+    return MediaIndex()
+
+@st.cache_resource
+def get_upload_resume_store() -> "UploadResumeStore":
+    """Get the process-wide record of unfinished resumable uploads"""
+    from .tus import UploadResumeStore
+    
+    return UploadResumeStore()
+
+def _file_size(file):
+    size = getattr(file, "size", None)
+    if size is None:
+        position = file.tell()
+        size = file.seek(0, io.SEEK_END)
+        file.seek(position)
+    return size
+
+def _media_type(filename):
+    """Return 'image' or 'video' for a supported upload, otherwise None"""
+    file_extension = filename.lower().split('.')[-1]
+    if file_extension in ['jpg', 'jpeg', 'png']:
+        return 'image'
+    elif file_extension in ['mp4', 'mov']:
+        return 'video'
+    return None
+
+def _empty_dashboard_data():
+    return {
+        "stats": {
+            "total_today": 0,
+            "avg_perception": 0,
+            "total_all_time": 0
+        },
+        "recent": []
+    }
+
+def get_handler_class():
+    """Get the data handler class selected by the DATA_BACKEND environment variable"""
+    backend = os.getenv("DATA_BACKEND", "supabase").strip().lower()
+    if backend == "supabase":
+        return SupabaseHandler
+    if backend == "sqlite":
+        from .sqlite_handler import SQLiteHandler
+        return SQLiteHandler
+    raise ValueError(f"Unknown DATA_BACKEND '{backend}'. Use 'supabase' or 'sqlite'.")
+
+@st.cache_resource
+def get_data_handler():
+    """Get the process-wide data handler for the configured storage backend
+    
+    Handlers keep no per-session state, only shared clients and caches, so
+    one instance serves every session and rerun. Creating it starts warming
+    the backend's connections.
+    """
+    handler = get_handler_class()()
+    handler.warm_up()
+    return handler
+
+class DataHandler(abc.ABC):
+    """Storage-independent activity operations
+    
+    Caching, batching, pagination, media naming and display formatting live
+    here. Subclasses supply the storage primitives (the abstract underscore
+    methods below) for one backend, and can't be created until they do.
+    """
+    
     def __init__(self):
-        self.client = get_supabase_client()
+        self.cache = get_read_cache()
+    
+    def warm_up(self):
+        """Get connections ready before the first read; backends without any need do nothing"""
     
     def add_activity(self, activity_data):
         """Add new activity to database"""
@@ -14,110 +156,505 @@ class SupabaseHandler:
             # Ensure required fields are present
             if not activity_data.get('timestamp'):
                 activity_data['timestamp'] = datetime.now().isoformat()
+            activity_data.setdefault('id', str(uuid.uuid4()))
+            activity_data['tags'] = parse_tags(activity_data.get('tags'))
             
-            result = self.client.table("activities").insert(activity_data).execute()
+            inserted, rollups_updated, tags_updated = self._write_activities([activity_data], ignore_duplicates=False)
             
-            if result.data:
-                return result.data[0]['id']
+            if inserted:
+                if not rollups_updated:
+                    st.warning("Activity saved, but statistics could not be updated.")
+                if not tags_updated:
+                    st.warning("Activity saved, but tag suggestions could not be updated.")
+                # Cached reads no longer reflect the table
+                self.cache.invalidate(*CACHE_TTLS)
+                return inserted[0]['id']
             else:
                 raise Exception("Failed to insert activity")
-                
+        
         except Exception as e:
             st.error(f"Error adding activity: {str(e)}")
             return None
     
-    def get_recent_activities(self, limit=10):
-        """Get recent activities ordered by created_at DESC"""
+    def queue_activity(self, activity_data):
+        """Save an activity to the local write queue and return its id
+        
+        Returns as soon as the activity is on local disk; the queue worker
+        writes it to the database in the background, retrying on failure.
+        """
         try:
-            result = self.client.table("activities").select("*").order("created_at", desc=True).limit(limit).execute()
-            return result.data if result.data else []
+            if not activity_data.get('timestamp'):
+                activity_data['timestamp'] = datetime.now().isoformat()
+            return get_activity_queue().enqueue(activity_data)
         except Exception as e:
-            st.error(f"Error fetching activities: {str(e)}")
-            return []
+            st.error(f"Error saving activity: {str(e)}")
+            return None
     
-    def upload_media_file(self, file_bytes, filename, file_type):
-        """Upload media file to Supabase storage"""
-        try:
-            # Create path structure: {file_type}s/{date}/{filename}
-            today = date.today().strftime("%Y-%m-%d")
-            file_path = f"{file_type}s/{today}/{filename}"
+    def add_activities_batch(self, activities, chunk_size=500, ignore_duplicates=False):
+        """Insert activities in chunks, one request per chunk
+        
+        `activities` may be any iterable, including a generator, so callers can
+        stream rows without holding them all in memory. A failed chunk is
+        recorded and skipped; later chunks are still sent. With
+        `ignore_duplicates`, rows carrying an existing `id` are skipped, which
+        makes retrying a chunk safe.
+        
+        Returns a report dict with `inserted`, `duplicates`, `failed` and `failed_chunks`
+        (one entry per failed chunk with its index, first row offset, size
+        and error message), and `rollups_stale` / `tags_stale` if the daily
+        rollups / tag index need a rebuild.
+        """
+        report = {
+            "inserted": 0, "duplicates": 0, "failed": 0, "failed_chunks": [],
+            "rollups_stale": False, "tags_stale": False
+        }
+        iterator = iter(activities)
+        chunk_index = 0
+        offset = 0
+        
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
             
-            # Upload to storage bucket
-            result = self.client.storage.from_("activity-media").upload(
-                file_path, 
-                file_bytes,
-                {"content-type": f"{file_type}/*"}
-            )
+            for activity in chunk:
+                if not activity.get('timestamp'):
+                    activity['timestamp'] = datetime.now().isoformat()
+                activity.setdefault('id', str(uuid.uuid4()))
+                activity['tags'] = parse_tags(activity.get('tags'))
             
-            if result:
-                # Get public URL
-                public_url = self.client.storage.from_("activity-media").get_public_url(file_path)
-                return public_url
+            try:
+                inserted, rollups_updated, tags_updated = self._write_activities(chunk, ignore_duplicates)
+            except Exception as e:
+                report["failed"] += len(chunk)
+                report["failed_chunks"].append({
+                    "chunk": chunk_index,
+                    "first_row": offset,
+                    "rows": len(chunk),
+                    "error": str(e)
+                })
             else:
-                raise Exception("Upload failed")
-                
+                report["inserted"] += len(inserted)
+                report["duplicates"] += len(chunk) - len(inserted)
+                if not rollups_updated:
+                    report["rollups_stale"] = True
+                if not tags_updated:
+                    report["tags_stale"] = True
+            
+            chunk_index += 1
+            offset += len(chunk)
+        
+        if report["inserted"]:
+            self.cache.invalidate(*CACHE_TTLS)
+        return report
+    
+    def get_recent_activities(self, limit=10, query=None):
+        """Get recent activities ordered by created_at DESC
+        
+        With an ActivityQuery only its columns are fetched, and rows come back
+        as its typed rows; otherwise whole rows come back as dicts.
+        """
+        return self._cached_read("get_recent_activities", limit=limit, query=query)
+    
+    def get_activity(self, activity_id):
+        """Get one whole activity by id, or None if it doesn't exist"""
+        return self._cached_read("get_activity", activity_id=activity_id)
+    
+    def gather_reads(self, reads, timeout=None):
+        """Run several independent cached reads for one page render
+        
+        `reads` maps a result name to `(method name, kwargs)` for one of
+        get_recent_activities, get_activity, get_daily_rollups,
+        get_activity_trends, suggest_tags, get_related_tags,
+        search_activities, get_activities_near, get_activities_in_box,
+        get_location_clusters or get_dashboard_data, e.g.
+        `{"summary": ("get_dashboard_data", {"limit": 10})}`. Returns
+        `{name: result}`; a failed read shows an error and yields that
+        method's empty result. Backends with an async client run the reads
+        concurrently, each limited to `timeout` seconds; this default runs
+        them in turn.
+        """
+        return {name: self._cached_read(read, **kwargs) for name, (read, kwargs) in reads.items()}
+    
+    def _read_plan(self, read, **kwargs):
+        # (cache key, fetch primitive name, primitive args, empty result, error label)
+        # for each cached read, shared by the sync and async paths
+        if read == "get_recent_activities":
+            limit, query = kwargs.get("limit", 10), kwargs.get("query")
+            if query is None:
+                return ("recent", limit, None), "_fetch_recent_activities", (limit, FULL_QUERY), [], "Error fetching activities"
+            return ("recent", limit, query.key), "_fetch_recent_rows", (limit, query), [], "Error fetching activities"
+        if read == "get_activity":
+            activity_id = kwargs["activity_id"]
+            return ("activity", activity_id), "_fetch_activity", (activity_id,), None, "Error fetching activity"
+        if read == "get_daily_rollups":
+            start_day, end_day, activity_type = (
+                kwargs.get("start_day"), kwargs.get("end_day"), kwargs.get("activity_type")
+            )
+            key = ("rollups", str(start_day) if start_day else None, str(end_day) if end_day else None, activity_type)
+            return key, "_fetch_daily_rollups", (start_day, end_day, activity_type), [], "Error fetching statistics"
+        if read == "get_activity_trends":
+            from .analytics import build_trends
+            
+            start_day, end_day = kwargs["start_day"], kwargs["end_day"]
+            key = ("trends", str(start_day), str(end_day))
+            return key, "_fetch_activity_trends", (start_day, end_day), build_trends([]), "Error fetching trends"
+        if read == "suggest_tags":
+            prefix, limit = kwargs.get("prefix", "").strip().lower(), kwargs.get("limit", 10)
+            return ("tags", "suggest", prefix, limit), "_fetch_tag_suggestions", (prefix, limit), [], "Error fetching tags"
+        if read == "get_related_tags":
+            tag, limit = kwargs["tag"], kwargs.get("limit", 10)
+            return ("tags", "related", tag, limit), "_fetch_related_tags", (tag, limit), [], "Error fetching tags"
+        if read == "search_activities":
+            text, page, page_size = " ".join(kwargs["text"].split()), kwargs.get("page", 0), kwargs.get("page_size", 25)
+            key = ("search", text.lower(), page, page_size)
+            return key, "_fetch_search_page", (text, page, page_size), {"activities": [], "has_more": False}, "Error searching"
+        if read == "get_activities_near":
+            lat, lng, radius_km, limit = kwargs["lat"], kwargs["lng"], kwargs["radius_km"], kwargs.get("limit", 50)
+            key = ("geo", "near", round(lat, 6), round(lng, 6), radius_km, limit)
+            return key, "_fetch_nearby_page", (lat, lng, radius_km, limit), {"activities": [], "distances_km": []}, "Error fetching nearby activities"
+        if read == "get_activities_in_box":
+            box, limit = kwargs["box"], kwargs.get("limit", 500)
+            key = ("geo", "box", *(round(box[edge], 6) for edge in WORLD), limit)
+            return key, "_fetch_box_page", (box, limit), [], "Error fetching activities"
+        if read == "get_location_clusters":
+            box, size = kwargs["box"], kwargs["size"]
+            key = ("geo", "clusters", *(round(box[edge], 6) for edge in WORLD), size)
+            return key, "_fetch_location_clusters", (box, size), [], "Error fetching the map"
+        if read == "get_dashboard_data":
+            limit = kwargs.get("limit", 10)
+            today = date.today().isoformat()
+            return ("dashboard", today, limit), "_fetch_dashboard_data", (today, limit), _empty_dashboard_data(), "Error fetching stats"
+        raise ValueError(f"Unknown read: {read}")
+    
+    def _cached_read(self, read, **kwargs):
+        key, fetch, args, empty, error = self._read_plan(read, **kwargs)
+        try:
+            return self.cache.get(key, lambda: getattr(self, fetch)(*args))
+        except Exception as e:
+            st.error(f"{error}: {str(e)}")
+            return empty
+    
+    def _fetch_recent_rows(self, limit, query):
+        return query.to_rows(self._fetch_recent_activities(limit, query))
+    
+    def search_activities(self, text, page=0, page_size=25):
+        """Search descriptions, tags and location descriptions, best matches first
+        
+        Every word must match. Returns a dict with `activities` (SUMMARY_QUERY
+        rows for the zero-based `page`) and `has_more`. Cached per query and
+        page.
+        """
+        return self._cached_read("search_activities", text=text, page=page, page_size=page_size)
+    
+    def _fetch_search_page(self, text, page, page_size):
+        # One extra row tells whether another page exists
+        return search_page(self._search_activities(text, page_size + 1, page * page_size), page_size)
+    
+    def get_activities_near(self, lat, lng, radius_km, limit=50):
+        """Get up to `limit` activities within radius_km of a point, nearest first
+        
+        Returns a dict with `activities` (SUMMARY_QUERY rows) and the matching
+        `distances_km`. Only a lat/lng box around the circle is read, through
+        the coordinate index.
+        """
+        return self._cached_read("get_activities_near", lat=lat, lng=lng, radius_km=radius_km, limit=limit)
+    
+    def _fetch_nearby_page(self, lat, lng, radius_km, limit):
+        return nearby_page(self._fetch_nearby_rows(lat, lng, radius_km, limit))
+    
+    def get_activities_in_box(self, box, limit=500):
+        """Get up to `limit` activities inside a `{min_lat, max_lat, min_lng, max_lng}` box, newest first"""
+        return self._cached_read("get_activities_in_box", box=box, limit=limit)
+    
+    def _fetch_box_page(self, box, limit):
+        return SUMMARY_QUERY.to_rows(self._fetch_box_rows(box, limit))
+    
+    def get_location_clusters(self, box=None, cells_across=GRID_CELLS_ACROSS):
+        """Cluster located activities on a grid for the map
+        
+        The box is split into cells about `cells_across` to a side and the
+        database returns one cluster per occupied cell (mean lat/lng,
+        `activity_count`, `avg_perception`), so the map gets a few hundred
+        summaries however many activities there are. Without a box, a coarse
+        world grid finds where the activities are and that area is
+        clustered. Returns a dict with the `box`, the cell `size` in degrees
+        and the `clusters`.
+        """
+        if box is None:
+            world_size = cell_size(WORLD, cells_across)
+            coarse = self._cached_read("get_location_clusters", box=WORLD, size=world_size)
+            if not coarse:
+                return {"box": WORLD, "size": world_size, "clusters": []}
+            box = clusters_extent(coarse, world_size)
+        size = cell_size(box, cells_across)
+        return {"box": box, "size": size, "clusters": self._cached_read("get_location_clusters", box=box, size=size)}
+    
+    def get_activities_page(self, page_size=25, cursor=None, direction="next", query=None, tag=None):
+        """Get one page of activities, newest first, using keyset pagination
+        
+        `cursor` is the `{"created_at", "id"}` of the row to page away from:
+        the last row of the current page for "next", the first row for "prev".
+        The query seeks on the (created_at, id) index, so every page costs the
+        same no matter how deep into the history it is.
+        
+        Returns a dict with `activities`, `next_cursor` and `prev_cursor`; a
+        cursor is None when there is nothing further in that direction. With
+        an ActivityQuery (which must include `created_at` and `id`) only its
+        columns are fetched and `activities` holds its typed rows. With a
+        `tag`, only activities carrying exactly that tag are paged through.
+        """
+        try:
+            page = self._fetch_activities_page(page_size, cursor, direction, query or FULL_QUERY, tag)
+            if query is not None:
+                page["activities"] = query.to_rows(page["activities"])
+            return page
+        except Exception as e:
+            st.error(f"Error fetching activities: {str(e)}")
+            return {"activities": [], "next_cursor": None, "prev_cursor": None}
+    
+    def _fetch_activities_page(self, page_size, cursor, direction, columns="*", tag=None):
+        backwards = direction == "prev"
+        query = columns if isinstance(columns, ActivityQuery) else ActivityQuery.parse(columns)
+        
+        # Fetch one extra row to learn whether another page exists
+        rows = self._fetch_page_rows(page_size + 1, cursor, backwards, query, tag)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+        
+        if not rows:
+            return {"activities": [], "next_cursor": None, "prev_cursor": None}
+        
+        first = {"created_at": rows[0]["created_at"], "id": rows[0]["id"]}
+        last = {"created_at": rows[-1]["created_at"], "id": rows[-1]["id"]}
+        return {
+            "activities": rows,
+            "next_cursor": last if (has_more or backwards) else None,
+            "prev_cursor": first if (has_more or not backwards) and cursor else None
+        }
+    
+    def iter_activity_pages(self, page_size=500, columns="*"):
+        """Yield every activity as lists of up to page_size rows, newest first
+        
+        Only one page is held in memory. A custom `columns` selection must
+        include `created_at` and `id`. Errors are raised to the caller.
+        """
+        cursor = None
+        while True:
+            page = self._fetch_activities_page(page_size, cursor, "next", columns=columns)
+            if page["activities"]:
+                yield page["activities"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+    
+    def iter_activities(self, page_size=500, columns="*"):
+        """Yield every activity, newest first, one keyset page at a time"""
+        for page in self.iter_activity_pages(page_size, columns):
+            yield from page
+    
+    def get_daily_rollups(self, start_day=None, end_day=None, activity_type=None):
+        """Get (day, type) rollup rows, optionally limited to a day range and type"""
+        return self._cached_read("get_daily_rollups", start_day=start_day, end_day=end_day, activity_type=activity_type)
+    
+    def get_activity_trends(self, start_day, end_day):
+        """Get daily, weekly and monthly trends between two days, inclusive
+        
+        Binned from the daily rollups, so the cost depends on the number of
+        days rather than activities; see utils.analytics.build_trends for the
+        result. Cached per date range.
+        """
+        return self._cached_read("get_activity_trends", start_day=start_day, end_day=end_day)
+    
+    def _fetch_activity_trends(self, start_day, end_day):
+        from .analytics import build_trends
+        
+        return build_trends(self._fetch_daily_rollups(start_day, end_day, None), start_day, end_day)
+    
+    def suggest_tags(self, prefix="", limit=10):
+        """Get up to `limit` tags starting with `prefix` (any case), most used first
+        
+        Each is a dict with `tag`, `activity_count` and `last_used_at`. An
+        empty prefix gives the most used tags overall.
+        """
+        return self._cached_read("suggest_tags", prefix=prefix, limit=limit)
+    
+    def get_related_tags(self, tag, limit=10):
+        """Get the tags most often used together with `tag`, as `tag` and `activity_count` dicts"""
+        return self._cached_read("get_related_tags", tag=tag, limit=limit)
+    
+    def get_tag_options(self):
+        """Known tags for the entry forms' tag picker, most used first"""
+        return [row["tag"] for row in self.suggest_tags(limit=TAG_SUGGESTION_LIMIT)]
+    
+    def canonicalize_tags(self, tags):
+        """Clean tags with parse_tags and respell any that match a known tag but for case
+
+        Keeps "Work" and "work" from becoming two tags. Tags outside the
+        picker's options are looked up by prefix in the tag index.
+        """
+        # Most used spelling wins where the index already holds several
+        known = {tag.lower(): tag for tag in reversed(self.get_tag_options())}
+        canonical = []
+        for tag in parse_tags(tags):
+            if tag.lower() not in known:
+                matches = self.suggest_tags(prefix=tag, limit=TAG_SUGGESTION_LIMIT)
+                known[tag.lower()] = next((row["tag"] for row in matches if row["tag"].lower() == tag.lower()), tag)
+            canonical.append(known[tag.lower()])
+        return parse_tags(canonical)
+    
+    def rebuild_tag_index(self):
+        """Recompute the tag counts and co-occurrences from the activities table, returning the tag count
+        
+        Raises on failure, since it is meant to be run from the command line.
+        """
+        tag_count = self._rebuild_tag_index()
+        self.cache.invalidate("tags")
+        return tag_count
+    
+    def rebuild_rollups(self):
+        """Recompute every daily rollup from the activities table, returning the row count
+        
+        Raises on failure, since it is meant to be run from the command line.
+        """
+        row_count = self._rebuild_rollups()
+        self.cache.invalidate("rollups", "trends", "dashboard")
+        return row_count
+    
+    def get_cache_stats(self):
+        """Get read cache hit/miss counters for tuning CACHE_TTLS"""
+        return self.cache.stats()
+    
+    def upload_media_file(self, file_bytes, filename, file_type):
+        """Upload media file to storage and return its public URL"""
+        try:
+            return self._upload_media(file_bytes, filename, file_type)
         except Exception as e:
             st.error(f"Error uploading file: {str(e)}")
             return None
     
+    def _upload_media(self, file_bytes, filename, file_type, content_type=None, digest=None):
+        from .media import content_path
+        
+        # Content-addressed path: {file_type}s/{ab}/{sha256}.{ext}, so the
+        # same bytes always land on the same object
+        digest = digest or hashlib.sha256(file_bytes).hexdigest()
+        file_path = content_path(file_type, digest, filename.rsplit(".", 1)[-1])
+        
+        public_url = self._existing_media_url(file_path) or self._store_media(file_path, file_bytes, content_type or f"{file_type}/*")
+        
+        if public_url:
+            return public_url
+        else:
+            raise Exception("Upload failed")
+    
     def get_activity_stats(self):
         """Get activity statistics"""
+        return self.get_dashboard_data(limit=0)["stats"]
+    
+    def get_dashboard_data(self, limit=10):
+        """Get activity statistics and the `limit` most recent activities together"""
+        return self._cached_read("get_dashboard_data", limit=limit)
+    
+    def _upload_media_stream(self, file, size, filename, file_type, digest):
+        from .media import content_path
+        
+        # Same path layout as _upload_media, with the digest the caller
+        # computed in chunks rather than by reading the file whole
+        file_path = content_path(file_type, digest, filename.rsplit(".", 1)[-1])
+        
+        public_url = self._existing_media_url(file_path) or self._store_media_stream(file_path, file, size, f"{file_type}/*")
+        
+        if public_url:
+            return public_url
+        else:
+            raise Exception("Upload failed")
+    
+    def upload_media_files(self, uploaded_files, max_workers=None):
+        """Upload files concurrently and return one result per file, in order
+        
+        Each result is a dict with `name`, `url`, `thumbnail_url` and `error`;
+        a failed or unsupported file gets an error and doesn't stop the
+        others. Images are recompressed in the image process pool first, and
+        only their web rendition and thumbnail are stored. Objects are named
+        by content hash, so content that is already stored is never sent
+        again. At most
+        `max_workers` (default MEDIA_UPLOAD_CONCURRENCY) uploads run at once.
+        """
+        uploaded_files = list(uploaded_files or [])
+        if not uploaded_files:
+            return []
+        
+        media_index = get_media_index()
+        max_workers = max_workers or MEDIA_UPLOAD_CONCURRENCY
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(uploaded_files)), thread_name_prefix="media-upload") as executor:
+            # map() yields results in submission order
+            return list(executor.map(partial(self._upload_uploaded_file, media_index=media_index), uploaded_files))
+    
+    def _upload_uploaded_file(self, uploaded_file, media_index):
+        from .media import hash_file, preprocess_image
+        
+        # Runs on a worker thread, so errors are returned rather than shown
+        result = {"name": uploaded_file.name, "url": None, "thumbnail_url": None, "error": None}
+        
+        file_type = _media_type(uploaded_file.name)
+        if file_type is None:
+            result["error"] = "Unsupported file type"
+            return result
+        
         try:
-            # Total activities today
-            today = date.today().isoformat()
-            today_result = self.client.table("activities").select("id").gte("created_at", today).execute()
-            total_today = len(today_result.data) if today_result.data else 0
+            # Hashed here, once per file and alongside the other workers; the
+            # same digest names the stored object
+            digest = hash_file(uploaded_file)
             
-            # Average perception score (all time)
-            perception_result = self.client.table("activities").select("perception_score").execute()
-            perception_scores = [row['perception_score'] for row in perception_result.data if row['perception_score'] is not None] if perception_result.data else []
-            avg_perception = sum(perception_scores) / len(perception_scores) if perception_scores else 0
-            
-            # Total activities all time
-            total_result = self.client.table("activities").select("id").execute()
-            total_all_time = len(total_result.data) if total_result.data else 0
-            
-            return {
-                "total_today": total_today,
-                "avg_perception": round(avg_perception, 2),
-                "total_all_time": total_all_time
-            }
+            # Files seen before (a resubmitted form, the same photo on another
+            # activity) reuse their stored URLs without any processing
+            known = media_index.get(digest)
+            if known is not None:
+                result.update(known)
+                return result
             
+            if file_type == "image":
+                try:
+                    processed = get_image_pool().submit(preprocess_image, uploaded_file.getvalue()).result()
+                except Exception as e:
+                    raise Exception(f"Could not process image: {e}")
+                web, thumbnail = processed["web"], processed["thumbnail"]
+                result["url"] = self._upload_media(
+                    web["bytes"], f"web.{web['extension']}", file_type, web["content_type"]
+                )
+                result["thumbnail_url"] = self._upload_media(
+                    thumbnail["bytes"], f"thumbnail.{thumbnail['extension']}", "thumbnail", thumbnail["content_type"]
+                )
+            else:
+                size = _file_size(uploaded_file)
+                if size > MEDIA_RESUMABLE_THRESHOLD:
+                    result["url"] = self._upload_media_stream(uploaded_file, size, uploaded_file.name, file_type, digest)
+                else:
+                    result["url"] = self._upload_media(uploaded_file.read(), uploaded_file.name, file_type, digest=digest)
         except Exception as e:
-            st.error(f"Error fetching stats: {str(e)}")
-            return {
-                "total_today": 0,
-                "avg_perception": 0,
-                "total_all_time": 0
-            }
+            result["error"] = str(e)
+            return result
+        
+        media_index.set(digest, {"url": result["url"], "thumbnail_url": result["thumbnail_url"]})
+        return result
     
     def process_media_uploads(self, uploaded_files):
-        """Process multiple uploaded files and return their URLs"""
+        """Process multiple uploaded files and return their URLs and image thumbnail URLs"""
         media_urls = []
+        thumbnail_urls = []
         
-        if uploaded_files:
-            for uploaded_file in uploaded_files:
-                # Read file bytes
-                file_bytes = uploaded_file.read()
-                
-                # Determine file type
-                file_extension = uploaded_file.name.lower().split('.')[-1]
-                if file_extension in ['jpg', 'jpeg', 'png']:
-                    file_type = 'image'
-                elif file_extension in ['mp4', 'mov']:
-                    file_type = 'video'
-                else:
-                    continue  # Skip unsupported files
-                
-                # Generate unique filename
-                unique_filename = f"{uuid.uuid4().hex}_{uploaded_file.name}"
-                
-                # Upload file
-                public_url = self.upload_media_file(file_bytes, unique_filename, file_type)
-                if public_url:
-                    media_urls.append(public_url)
-        
-        return media_urls
+        for result in self.upload_media_files(uploaded_files):
+            if result["url"]:
+                media_urls.append(result["url"])
+                if result["thumbnail_url"]:
+                    thumbnail_urls.append(result["thumbnail_url"])
+            else:
+                st.error(f"Error uploading {result['name']}: {result['error']}")
+        
+        return media_urls, thumbnail_urls
     
     def format_activity_for_display(self, activity):
         """Format activity data for display in tables"""
@@ -151,4 +688,343 @@ class SupabaseHandler:
             if isinstance(formatted_activity['tags'], list):
                 formatted_activity['tags'] = ", ".join(formatted_activity['tags'])
         
-        return formatted_activity
\ No newline at end of file
+        return formatted_activity
+    
+    def format_activities_for_display(self, activities, description_length=50):
+        """Format many activities at once as a display table
+        
+        Column-at-a-time equivalent of format_activity_for_display; returns a
+        DataFrame with Time, Type, Location, Score, Description and Tags
+        columns, ready for st.dataframe.
+        """
+        from .formatting import format_activities_table
+        
+        return format_activities_table(activities, description_length)
+    
+    # Storage primitives. These raise on failure; the public methods above
+    # turn errors into Streamlit messages.
+    
+    @abc.abstractmethod
+    def _insert_activities(self, activities, ignore_duplicates):
+        """Insert rows (each with an id) and return the ones actually inserted"""
+    
+    def _write_activities(self, activities, ignore_duplicates):
+        """Insert rows and fold the inserted ones into the rollups and tag index
+        
+        Returns (inserted rows, rollups updated, tag index updated). Backends
+        that can write all three atomically override this; here they are
+        separate writes, so a failure after the insert leaves the rollups or
+        tag index stale and is reported as such.
+        """
+        inserted = self._insert_activities(activities, ignore_duplicates)
+        if not inserted:
+            return inserted, True, True
+        return inserted, self._update_rollups_batch(inserted), self._update_tag_index_batch(inserted)
+    
+    @abc.abstractmethod
+    def _fetch_recent_activities(self, limit, query):
+        """Return the `limit` newest activities by created_at, with the query's columns"""
+    
+    @abc.abstractmethod
+    def _fetch_activity(self, activity_id):
+        """Return one whole activity row, or None"""
+    
+    @abc.abstractmethod
+    def _fetch_page_rows(self, limit, cursor, backwards, query, tag=None):
+        """Return up to `limit` rows past `cursor` in (created_at, id) order
+        
+        Newest first, or oldest first when `backwards`. Rows hold the query's
+        columns, truncated as it asks. With a `tag`, only rows whose tags
+        include it.
+        """
+    
+    @abc.abstractmethod
+    def _search_activities(self, text, limit, offset):
+        """Return up to `limit` SUMMARY_QUERY row dicts matching every word of text, ranked, from `offset`"""
+    
+    @abc.abstractmethod
+    def _fetch_nearby_rows(self, lat, lng, radius_km, limit):
+        """Return up to `limit` SUMMARY_QUERY row dicts within radius_km, nearest first, each with `distance_km`"""
+    
+    @abc.abstractmethod
+    def _fetch_box_rows(self, box, limit):
+        """Return up to `limit` SUMMARY_QUERY row dicts with coordinates inside box, newest first"""
+    
+    @abc.abstractmethod
+    def _fetch_location_clusters(self, box, size):
+        """Return one {lat, lng, activity_count, avg_perception} dict per occupied grid cell of box"""
+    
+    @abc.abstractmethod
+    def _update_rollups_batch(self, activities):
+        """Fold inserted activities into the daily rollups, returning success"""
+    
+    @abc.abstractmethod
+    def _rebuild_rollups(self):
+        """Recompute all rollups from the activities, returning the rollup row count"""
+    
+    @abc.abstractmethod
+    def _fetch_daily_rollups(self, start_day, end_day, activity_type):
+        """Return rollup rows ordered by day"""
+    
+    @abc.abstractmethod
+    def _fetch_dashboard_data(self, today, limit):
+        """Return {"stats": {...}, "recent": [...]} for the Dashboard"""
+    
+    @abc.abstractmethod
+    def _update_tag_index_batch(self, activities):
+        """Fold inserted activities' tags into the tag counts and co-occurrences, returning success"""
+    
+    @abc.abstractmethod
+    def _rebuild_tag_index(self):
+        """Recompute the tag index from the activities, returning the tag count"""
+    
+    @abc.abstractmethod
+    def _fetch_tag_suggestions(self, prefix, limit):
+        """Return tag rows whose lowercased tag starts with `prefix`, by descending count"""
+    
+    @abc.abstractmethod
+    def _fetch_related_tags(self, tag, limit):
+        """Return {"tag", "activity_count"} rows for tags co-occurring with `tag`, by descending count"""
+    
+    @abc.abstractmethod
+    def _existing_media_url(self, file_path):
+        """Return the public URL of an already stored media file, or None if it isn't stored"""
+    
+    @abc.abstractmethod
+    def _store_media(self, file_path, file_bytes, content_type):
+        """Store a media file and return its public URL"""
+    
+    def _store_media_stream(self, file_path, file, size, content_type):
+        """Store a large media file from a seekable file object and return its public URL
+        
+        Backends without a streaming path fall back to a whole-file upload.
+        """
+        file.seek(0)
+        return self._store_media(file_path, file.read(), content_type)
+
+@instrument_operations
+class SupabaseHandler(DataHandler):
+    """Activities in a Supabase Postgres table, media in Supabase Storage"""
+    
+    def __init__(self):
+        super().__init__()
+        self.client = get_supabase_client()
+    
+    def warm_up(self):
+        # Connect (DNS, TCP, TLS and HTTP/2 setup) on both clients in the
+        # background, so the first page read finds open connections
+        threading.Thread(target=self._warm_up, name="supabase-warm-up", daemon=True).start()
+    
+    def _warm_up(self):
+        from .async_handler import get_async_runner, get_async_supabase_client
+        
+        try:
+            health_check_request(self.client).execute()
+            get_async_runner().run(health_check_request(get_async_supabase_client()).execute())
+        except Exception:
+            # The first real read reports the problem on the page
+            pass
+    
+    def gather_reads(self, reads, timeout=None):
+        # Cache misses go out together on the async client, so the page waits
+        # for the slowest read rather than the sum of them
+        from .async_handler import ASYNC_READ_TIMEOUT, AsyncSupabaseHandler, get_async_runner
+        
+        plans = {name: self._read_plan(read, **kwargs) for name, (read, kwargs) in reads.items()}
+        try:
+            async_handler = AsyncSupabaseHandler(self.cache)
+            results = get_async_runner().run(async_handler.read_many(
+                {name: (key, fetch, args) for name, (key, fetch, args, _, _) in plans.items()},
+                timeout or ASYNC_READ_TIMEOUT
+            ))
+        except Exception:
+            # Async client unavailable; read one at a time on the sync client
+            return super().gather_reads(reads, timeout)
+        
+        for name, (_, _, _, empty, error) in plans.items():
+            if isinstance(results[name], Exception):
+                st.error(f"{error}: {str(results[name]) or type(results[name]).__name__}")
+                results[name] = empty
+        return results
+    
+    def _insert_activities(self, activities, ignore_duplicates):
+        if ignore_duplicates:
+            # Rows whose id already exists are skipped, and only the
+            # rows actually inserted come back for the rollups
+            result = self.client.table("activities").upsert(
+                activities,
+                ignore_duplicates=True,
+                on_conflict="id",
+                default_to_null=False
+            ).select("id,timestamp,type,perception_score,timer_duration,tags").execute()
+            return result.data or []
+        
+        from postgrest import ReturnMethod
+        
+        # Skip echoing the rows back; missing columns take their defaults
+        self.client.table("activities").insert(
+            activities,
+            returning=ReturnMethod.minimal,
+            default_to_null=False
+        ).execute()
+        return activities
+    
+    def _write_activities(self, activities, ignore_duplicates):
+        # One transaction in Postgres through the `insert_activities` function
+        # (see README), so the rollups and tag index can't fall out of step
+        # with the table
+        try:
+            result = self.client.rpc(
+                "insert_activities",
+                {"activities": activities, "ignore_duplicates": ignore_duplicates}
+            ).execute()
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
+            return super()._write_activities(activities, ignore_duplicates)
+        
+        inserted_ids = {row["id"] for row in result.data or []}
+        return [activity for activity in activities if activity["id"] in inserted_ids], True, True
+    
+    def _select_activities(self, build, *args):
+        # Activity selects drop to full descriptions, truncated here, when the
+        # `description_preview` computed column doesn't exist
+        try:
+            return build(self.client, *args).execute()
+        except Exception as e:
+            if not handle_preview_error(e):
+                raise
+            return build(self.client, *args).execute()
+    
+    def _fetch_recent_activities(self, limit, query):
+        return [query.trim(row) for row in result_rows(self._select_activities(recent_activities_request, limit, query))]
+    
+    def _fetch_activity(self, activity_id):
+        rows = result_rows(activity_request(self.client, activity_id).execute())
+        return rows[0] if rows else None
+    
+    def _fetch_page_rows(self, limit, cursor, backwards, query, tag=None):
+        result = self._select_activities(page_rows_request, limit, cursor, backwards, query, tag)
+        return [query.trim(row) for row in result_rows(result)]
+    
+    def _search_activities(self, text, limit, offset):
+        return result_rows(search_request(self.client, text, limit, offset).execute())
+    
+    def _fetch_nearby_rows(self, lat, lng, radius_km, limit):
+        return result_rows(nearby_rows_request(self.client, lat, lng, radius_km, limit).execute())
+    
+    def _fetch_box_rows(self, box, limit):
+        return [SUMMARY_QUERY.trim(row) for row in result_rows(self._select_activities(box_rows_request, box, limit))]
+    
+    def _fetch_location_clusters(self, box, size):
+        return result_rows(location_clusters_request(self.client, box, size).execute())
+    
+    def _update_rollups_batch(self, activities):
+        try:
+            self.client.rpc(
+                "increment_activity_rollups",
+                {"activities": [rollup_row_from_activity(activity) for activity in activities]}
+            ).execute()
+            return True
+        except Exception:
+            # Inserted rows are kept; `python -m utils.rollups rebuild` repairs the rollups
+            return False
+    
+    def _rebuild_rollups(self):
+        result = self.client.rpc("rebuild_activity_rollups", {}).execute()
+        return result.data or 0
+    
+    def _update_tag_index_batch(self, activities):
+        rows = [tag_row_from_activity(activity) for activity in activities if activity.get("tags")]
+        if not rows:
+            return True
+        try:
+            self.client.rpc("increment_activity_tags", {"activities": rows}).execute()
+            return True
+        except Exception:
+            # Inserted rows are kept; `python -m utils.tags rebuild` repairs the index
+            return False
+    
+    def _rebuild_tag_index(self):
+        result = self.client.rpc("rebuild_activity_tags", {}).execute()
+        return result.data or 0
+    
+    def _fetch_tag_suggestions(self, prefix, limit):
+        return result_rows(tag_suggestions_request(self.client, prefix, limit).execute())
+    
+    def _fetch_related_tags(self, tag, limit):
+        return result_rows(related_tags_request(self.client, tag, limit).execute())
+    
+    def _fetch_daily_rollups(self, start_day, end_day, activity_type):
+        return result_rows(daily_rollups_request(self.client, start_day, end_day, activity_type).execute())
+    
+    def _fetch_dashboard_data(self, today, limit):
+        # Counting and averaging run inside Postgres through the
+        # `get_dashboard_summary` function (see README), so only the numbers
+        # and the `limit` most recent rows cross the network
+        try:
+            result = dashboard_summary_request(self.client, today, limit).execute()
+        except Exception as e:
+            # Only a database without the RPC installed falls back; timeouts,
+            # auth and SQL errors are real failures and are reported
+            if not is_missing_function(e):
+                raise
+            return self._fetch_dashboard_data_fallback(today, limit)
+        return dashboard_from_summary(result.data)
+    
+    def _fetch_dashboard_data_fallback(self, today, limit):
+        # The count requests go out together on the async client, so the
+        # fallback costs one round trip rather than one per count
+        from .async_handler import AsyncSupabaseHandler, get_async_runner
+        
+        try:
+            async_handler = AsyncSupabaseHandler(self.cache)
+            return get_async_runner().run(async_handler._fetch_dashboard_data_fallback(today, limit))
+        except Exception:
+            # Async client unavailable; send the exact-count head requests in turn
+            pass
+        counts = {
+            key: request.execute().count or 0
+            for key, request in dashboard_count_requests(self.client, today).items()
+        }
+        return dashboard_from_counts(counts, self._fetch_recent_activities(limit, SUMMARY_QUERY) if limit else [])
+    
+    def _existing_media_url(self, file_path):
+        bucket = self.client.storage.from_("activity-media")
+        return bucket.get_public_url(file_path) if bucket.exists(file_path) else None
+    
+    def _store_media(self, file_path, file_bytes, content_type):
+        bucket = self.client.storage.from_("activity-media")
+        # Paths are content hashes, so overwriting after a lost race is harmless
+        if not bucket.upload(file_path, file_bytes, {"content-type": content_type, "upsert": "true"}):
+            return None
+        return bucket.get_public_url(file_path)
+    
+    def _store_media_stream(self, file_path, file, size, content_type):
+        from .tus import TusUploader
+        
+        # Resumable (tus) upload in fixed-size chunks
+        key = self.client.supabase_key
+        uploader = TusUploader(
+            f"{str(self.client.storage_url).rstrip('/')}/upload/resumable",
+            headers={"apikey": key, "Authorization": f"Bearer {key}", "x-upsert": "true"},
+            http_client=get_http_client()
+        )
+        
+        # A resubmit of the same file lands on the same path and continues the unfinished upload
+        resume_store = get_upload_resume_store()
+        pending = resume_store.get(file_path)
+        
+        uploader.upload(
+            file,
+            size,
+            metadata={
+                "bucketName": "activity-media",
+                "objectName": file_path,
+                "contentType": content_type
+            },
+            upload_url=pending["upload_url"] if pending else None,
+            on_created=lambda upload_url: resume_store.set(file_path, {"upload_url": upload_url})
+        )
+        resume_store.remove(file_path)
+        return self.client.storage.from_("activity-media").get_public_url(file_path)
\ No newline at end of file
@@ -0,0 +1,185 @@
+import argparse
+import csv
+import io
+import json
+from datetime import datetime
+
+# format -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "jsonl": ("application/x-ndjson", ".jsonl"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+# Flat layout shared by CSV and Parquet; `python -m utils.importer` reads CSV back in
+FLAT_COLUMNS = (
+    "id", "created_at", "timestamp", "type", "lat", "lng", "location_description",
+    "perception_score", "tags", "description", "timer_duration", "media_urls", "thumbnail_urls"
+)
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain
+
+    Lets the Parquet writer stream row groups out without keeping the whole
+    file in memory. tell() keeps counting across drains so the footer offsets
+    stay correct.
+    """
+    
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+def flatten_activity(activity):
+    """Lift location JSON into lat, lng and location_description columns"""
+    location = activity.get("location") if isinstance(activity.get("location"), dict) else {}
+    return {
+        "id": activity.get("id"),
+        "created_at": activity.get("created_at"),
+        "timestamp": activity.get("timestamp"),
+        "type": activity.get("type"),
+        "lat": location.get("lat"),
+        "lng": location.get("lng"),
+        "location_description": location.get("description"),
+        "perception_score": activity.get("perception_score"),
+        "tags": activity.get("tags") or [],
+        "description": activity.get("description"),
+        "timer_duration": activity.get("timer_duration"),
+        "media_urls": activity.get("media_urls") or [],
+        "thumbnail_urls": activity.get("thumbnail_urls") or []
+    }
+
+def _encode_csv(pages):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FLAT_COLUMNS)
+    writer.writeheader()
+    for page in pages:
+        for activity in page:
+            row = flatten_activity(activity)
+            # Arrays as JSON so commas inside tags survive a round trip
+            row["tags"] = json.dumps(row["tags"])
+            row["media_urls"] = json.dumps(row["media_urls"])
+            row["thumbnail_urls"] = json.dumps(row["thumbnail_urls"])
+            writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def _encode_jsonl(pages):
+    for page in pages:
+        yield "".join(json.dumps(activity) + "\n" for activity in page).encode("utf-8")
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ("id", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("type", pa.string()),
+        ("lat", pa.float64()),
+        ("lng", pa.float64()),
+        ("location_description", pa.string()),
+        ("perception_score", pa.int8()),
+        ("tags", pa.list_(pa.string())),
+        ("description", pa.string()),
+        ("timer_duration", pa.int32()),
+        ("media_urls", pa.list_(pa.string())),
+        ("thumbnail_urls", pa.list_(pa.string())),
+    ])
+
+def _encode_parquet(pages):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+    
+    schema = _parquet_schema(pa)
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        # One row group per page keeps memory bounded by the page size
+        for page in pages:
+            rows = [flatten_activity(activity) for activity in page]
+            for row in rows:
+                row["created_at"] = _parse_timestamp(row["created_at"])
+                row["timestamp"] = _parse_timestamp(row["timestamp"])
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+_ENCODERS = {
+    "csv": _encode_csv,
+    "jsonl": _encode_jsonl,
+    "parquet": _encode_parquet,
+}
+
+def iter_export(db_handler, export_format, chunk_size=1000):
+    """Yield the encoded export as byte chunks, one per page of activities
+
+    Pages are fetched with keyset pagination, so peak memory is bounded by
+    chunk_size rows regardless of the table size.
+    """
+    if export_format not in _ENCODERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    pages = db_handler.iter_activity_pages(page_size=chunk_size)
+    for data in _ENCODERS[export_format](pages):
+        if data:
+            yield data
+
+def export_activities(db_handler, file, export_format, chunk_size=1000):
+    """Write a full export to an open binary file, returning the bytes written"""
+    written = 0
+    for data in iter_export(db_handler, export_format, chunk_size):
+        file.write(data)
+        written += len(data)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Export all activities to CSV, JSONL or Parquet")
+    parser.add_argument("path", help="Output file")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), help="Defaults to the output file extension")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows fetched and encoded per page (default: 1000)")
+    args = parser.parse_args()
+    
+    export_format = args.format
+    if not export_format:
+        export_format = next(
+            (name for name, (_, extension) in EXPORT_FORMATS.items() if args.path.lower().endswith(extension)),
+            None
+        )
+        if not export_format:
+            parser.error("Cannot infer the format from the file name; pass --format")
+    
+    from .data_handler import get_data_handler
+    
+    with open(args.path, "wb") as file:
+        written = export_activities(get_data_handler(), file, export_format, chunk_size=args.chunk_size)
+    print(f"Wrote {written} bytes to {args.path}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+# Display columns of the activity tables, in order
+TABLE_COLUMNS = ("Time", "Type", "Location", "Score", "Description", "Tags")
+
+# "YYYY-MM-DDTHH:MM..." prefix of an ISO 8601 timestamp
+_ISO_MINUTES = r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}"
+
+# Source columns the table is built from
+SOURCE_COLUMNS = ("timestamp", "type", "location", "perception_score", "description", "tags")
+
+def _to_columns(activities):
+    # Pull just the source columns out of the supported input shapes, without
+    # building a DataFrame of every field first
+    if isinstance(activities, pd.DataFrame):
+        frame = activities.reset_index(drop=True)
+        return {name: frame[name] if name in frame else None for name in SOURCE_COLUMNS}, len(frame)
+    if isinstance(activities, dict):
+        count = len(next(iter(activities.values()), []))
+        return {name: activities.get(name) for name in SOURCE_COLUMNS}, count
+    
+    activities = list(activities)
+    if not activities:
+        return {}, 0
+    if hasattr(activities[0], "_fields"):
+        # Typed rows: transpose the tuples in one go
+        fields = activities[0]._fields
+        transposed = dict(zip(fields, zip(*activities)))
+        return {name: transposed.get(name) for name in SOURCE_COLUMNS}, len(activities)
+    return {name: [row.get(name) for row in activities] for name in SOURCE_COLUMNS}, len(activities)
+
+def _series(values, count):
+    if values is None:
+        return pd.Series([None] * count, dtype=object)
+    return pd.Series(values, dtype=object).reset_index(drop=True)
+
+def _format_times(timestamps):
+    # Same result as parsing and strftime("%Y-%m-%d %H:%M"): the wall-clock
+    # minutes as written, offset ignored. Unparseable values pass through.
+    text = timestamps.astype("string")
+    parsed = text.str.match(_ISO_MINUTES).fillna(False).astype(bool)
+    formatted = text.str.slice(0, 16).str.replace("T", " ", regex=False)
+    return formatted.where(parsed, text).fillna("N/A").astype(object)
+
+def _format_locations(locations):
+    # Split the location JSON into one column per field; the DataFrame
+    # constructor unpacks the dicts in one call, and other rows get NaN
+    is_dict = locations.map(type).eq(dict)
+    fields = pd.DataFrame(
+        locations[is_dict].tolist(), columns=["lat", "lng", "description"], index=locations.index[is_dict]
+    ).reindex(locations.index)
+    descriptions = fields["description"].astype(object)
+    lat = pd.to_numeric(fields["lat"], errors="coerce")
+    lng = pd.to_numeric(fields["lng"], errors="coerce")
+    
+    labels = pd.Series("Not specified", index=locations.index, dtype=object)
+    
+    # A description wins; otherwise coordinates, where zero counts as missing
+    # as in the per-row formatter
+    has_description = descriptions.astype("string").str.len().gt(0).fillna(False).astype(bool)
+    labels[has_description] = descriptions[has_description]
+    
+    has_coordinates = is_dict & ~has_description & lat.fillna(0).ne(0) & lng.fillna(0).ne(0)
+    if has_coordinates.any():
+        labels[has_coordinates] = np.char.add(
+            np.char.mod("%.4f, ", lat[has_coordinates].to_numpy()),
+            np.char.mod("%.4f", lng[has_coordinates].to_numpy())
+        )
+    
+    # Plain strings (or anything else) are shown as text
+    is_other = ~is_dict & locations.notna() & locations.astype(bool)
+    labels[is_other] = locations[is_other].astype(str)
+    return labels
+
+def _format_tags(tags):
+    is_list = tags.map(type).eq(list)
+    joined = tags.where(is_list).str.join(", ")
+    return joined.where(is_list, tags.where(tags.notna(), "")).fillna("")
+
+def _truncate(descriptions, length):
+    text = descriptions.fillna("").astype(str)
+    cut = text.str.slice(0, length)
+    return cut.where(text.str.len() <= length, cut + "...")
+
+def format_activities_table(activities, description_length=50):
+    """Build the display table for a set of activities in one pass per column
+
+    `activities` may be a list of row dicts, a list of typed rows from
+    ActivityQuery.to_rows, a dict of columns or a DataFrame. Returns a
+    DataFrame with TABLE_COLUMNS, ready for st.dataframe; the result matches
+    format_activity_for_display row by row, with descriptions cut to
+    `description_length` characters plus "...". Two cells differ on
+    purpose: Score is a nullable integer column, where the per-row table
+    falls back to floats once any score is missing, and an activity without
+    tags shows an empty cell rather than [] or None.
+    """
+    columns, count = _to_columns(activities)
+    if not count:
+        return pd.DataFrame(columns=TABLE_COLUMNS)
+    column = {name: _series(columns.get(name), count) for name in SOURCE_COLUMNS}
+    
+    return pd.DataFrame({
+        "Time": _format_times(column["timestamp"]),
+        "Type": column["type"].astype("string").str.title().fillna("N/A").astype(object),
+        "Location": _format_locations(column["location"]),
+        "Score": pd.to_numeric(column["perception_score"], errors="coerce").astype("Int64"),
+        "Description": _truncate(column["description"], description_length),
+        "Tags": _format_tags(column["tags"]),
+    })
\ No newline at end of file
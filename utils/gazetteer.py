@@ -0,0 +1,224 @@
+import argparse
+import csv
+import math
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from .geo import EARTH_RADIUS_KM
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv")
+GAZETTEER_FIELDS = ["name", "region", "country", "lat", "lng"]
+
+# Coordinates further than this from every place resolve to nothing, so a
+# point at sea isn't named after the nearest coast town
+MAX_PLACE_DISTANCE_KM = 150
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def unit_vectors(lats, lngs):
+    """Points on the unit sphere for coordinates in degrees
+
+    Straight-line distance between these orders points the same way as
+    great-circle distance, without the antimeridian seam of raw lat/lng.
+    """
+    lats, lngs = np.radians(lats), np.radians(lngs)
+    return np.column_stack((np.cos(lats) * np.cos(lngs), np.cos(lats) * np.sin(lngs), np.sin(lats)))
+
+class KDTree:
+    """Static k-d tree for nearest-neighbour lookups
+
+    Nodes split on the widest axis at the median and leaves hold up to
+    leaf_size points, which are compared with numpy. A query descends to the
+    nearest leaf first and only visits the far side of a split when it could
+    hold something closer, so it touches a handful of leaves however many
+    points there are.
+    """
+    
+    def __init__(self, points, leaf_size=16):
+        self.points = np.asarray(points, dtype=float)
+        self.leaf_size = leaf_size
+        # Point numbers, reordered so every node covers a contiguous slice
+        self._order = np.arange(len(self.points))
+        # One (start, end, axis, split, left, right) per node; leaves have axis -1
+        self._nodes = []
+        if len(self.points):
+            self._build(0, len(self.points))
+    
+    def __len__(self):
+        return len(self.points)
+    
+    def _build(self, start, end):
+        node = len(self._nodes)
+        self._nodes.append(None)
+        if end - start <= self.leaf_size:
+            self._nodes[node] = (start, end, -1, 0.0, -1, -1)
+            return node
+        
+        members = self._order[start:end]
+        coordinates = self.points[members]
+        axis = int(np.argmax(coordinates.max(axis=0) - coordinates.min(axis=0)))
+        middle = (end - start) // 2
+        self._order[start:end] = members[np.argpartition(coordinates[:, axis], middle)]
+        split = self.points[self._order[start + middle], axis]
+        left = self._build(start, start + middle)
+        right = self._build(start + middle, end)
+        self._nodes[node] = (start, end, axis, split, left, right)
+        return node
+    
+    def query(self, point):
+        """Return (distance, point number) of the point nearest to point, or (inf, -1) when empty"""
+        if not self._nodes:
+            return math.inf, -1
+        point = np.asarray(point, dtype=float)
+        best_squared, best = math.inf, -1
+        # (node, squared distance from point to the node's side of its parent's split)
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_squared:
+                continue
+            start, end, axis, split, left, right = self._nodes[node]
+            if axis < 0:
+                members = self._order[start:end]
+                squared = ((self.points[members] - point) ** 2).sum(axis=1)
+                nearest = int(np.argmin(squared))
+                if squared[nearest] < best_squared:
+                    best_squared, best = float(squared[nearest]), int(members[nearest])
+                continue
+            offset = point[axis] - split
+            near, far = (left, right) if offset < 0 else (right, left)
+            # Pushed first, so visited after the near side has tightened the bound
+            stack.append((far, max(bound, offset * offset)))
+            stack.append((near, bound))
+        return math.sqrt(best_squared), best
+
+class Gazetteer:
+    """Offline reverse geocoder over a table of places
+
+    Places are (name, region, country, lat, lng) rows; lookups find the
+    nearest one with a KDTree over their unit-sphere positions.
+    """
+    
+    def __init__(self, places):
+        self.places = list(places)
+        lats = [float(place["lat"]) for place in self.places]
+        lngs = [float(place["lng"]) for place in self.places]
+        self._tree = KDTree(unit_vectors(lats, lngs))
+    
+    def __len__(self):
+        return len(self.places)
+    
+    def nearest(self, lat, lng):
+        """Return (place, distance_km) for the place nearest to (lat, lng), or (None, inf) when empty"""
+        chord, number = self._tree.query(unit_vectors([lat], [lng])[0])
+        if number < 0:
+            return None, math.inf
+        return self.places[number], 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+    
+    def describe(self, lat, lng, max_distance_km=MAX_PLACE_DISTANCE_KM):
+        """Return "city, region, country" for the place nearest to (lat, lng)
+
+        Returns None when no place lies within max_distance_km. The region is
+        left out when it just repeats the city's name.
+        """
+        place, distance = self.nearest(lat, lng)
+        if place is None or distance > max_distance_km:
+            return None
+        parts = [place["name"]]
+        if place["region"] and place["region"] != place["name"]:
+            parts.append(place["region"])
+        if place["country"] and place["country"] != parts[-1]:
+            parts.append(place["country"])
+        return ", ".join(parts)
+
+def read_places(path=GAZETTEER_PATH):
+    """Read the rows of a gazetteer CSV with GAZETTEER_FIELDS columns"""
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.DictReader(file))
+
+def get_gazetteer():
+    """Return the bundled gazetteer, loading it on first use"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer(read_places())
+    return _gazetteer
+
+@lru_cache(maxsize=1024)
+def _describe_rounded(lat, lng):
+    return get_gazetteer().describe(lat, lng)
+
+def reverse_geocode(lat, lng):
+    """Return "city, region, country" near (lat, lng) from the bundled gazetteer, or None
+
+    Works without a network. Results are cached per coordinate rounded to
+    about 10 metres.
+    """
+    return _describe_rounded(round(float(lat), 4), round(float(lng), 4))
+
+def build_from_geonames(cities_path, admin1_path, countries_path, output_path=GAZETTEER_PATH):
+    """Write a gazetteer CSV from GeoNames dumps and return its row count
+
+    cities_path is a citiesN.txt dump (e.g. cities15000.txt), admin1_path is
+    admin1CodesASCII.txt and countries_path is countryInfo.txt, all from
+    https://download.geonames.org/export/dump/.
+    """
+    countries = {}
+    with open(countries_path, encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            countries[fields[0]] = fields[4]
+    
+    regions = {}
+    with open(admin1_path, encoding="utf-8") as file:
+        for line in file:
+            fields = line.rstrip("\n").split("\t")
+            regions[fields[0]] = fields[1]
+    
+    count = 0
+    with open(cities_path, encoding="utf-8") as source, open(output_path, "w", newline="", encoding="utf-8") as target:
+        writer = csv.writer(target)
+        writer.writerow(GAZETTEER_FIELDS)
+        for line in source:
+            fields = line.rstrip("\n").split("\t")
+            country_code = fields[8]
+            writer.writerow([
+                fields[1],
+                regions.get(f"{country_code}.{fields[10]}", ""),
+                countries.get(country_code, country_code),
+                round(float(fields[4]), 4),
+                round(float(fields[5]), 4)
+            ])
+            count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up or rebuild the offline place gazetteer")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    
+    lookup = subcommands.add_parser("lookup", help="name the place nearest to coordinates")
+    lookup.add_argument("lat", type=float)
+    lookup.add_argument("lng", type=float)
+    
+    build = subcommands.add_parser("build", help="replace the bundled gazetteer with one built from GeoNames dumps")
+    build.add_argument("cities", help="citiesN.txt, e.g. cities15000.txt")
+    build.add_argument("admin1", help="admin1CodesASCII.txt")
+    build.add_argument("countries", help="countryInfo.txt")
+    build.add_argument("--output", default=GAZETTEER_PATH, help="CSV to write (default: the bundled gazetteer)")
+    args = parser.parse_args()
+    
+    if args.command == "lookup":
+        print(reverse_geocode(args.lat, args.lng) or "No place nearby")
+    elif args.command == "build":
+        count = build_from_geonames(args.cities, args.admin1, args.countries, args.output)
+        print(f"Wrote {count} places to {args.output}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
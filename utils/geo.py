@@ -0,0 +1,88 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+# Grid cells across the width of a map view; clusters are one per occupied cell
+GRID_CELLS_ACROSS = 48
+
+WORLD = {"min_lat": -90.0, "max_lat": 90.0, "min_lng": -180.0, "max_lng": 180.0}
+
+def coordinates(location):
+    """Return (lat, lng) of a location dict, or None without usable coordinates
+
+    Zero counts as missing, as it does when locations are displayed: the
+    entry form's coordinate inputs default to 0.
+    """
+    if not isinstance(location, dict):
+        return None
+    try:
+        lat, lng = float(location.get("lat") or 0), float(location.get("lng") or 0)
+    except (TypeError, ValueError):
+        return None
+    if not lat or not lng or not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        return None
+    return lat, lng
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def bounding_box(lat, lng, radius_km):
+    """Smallest lat/lng box holding every point within radius_km of (lat, lng)
+
+    Near a pole, or where the box would cross the antimeridian, it widens to
+    every longitude, which stays correct at the cost of a looser prefilter.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return {"min_lat": max(min_lat, -90.0), "max_lat": min(max_lat, 90.0), "min_lng": -180.0, "max_lng": 180.0}
+    delta_lng = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    if lng - delta_lng < -180 or lng + delta_lng > 180:
+        return {"min_lat": min_lat, "max_lat": max_lat, "min_lng": -180.0, "max_lng": 180.0}
+    return {"min_lat": min_lat, "max_lat": max_lat, "min_lng": lng - delta_lng, "max_lng": lng + delta_lng}
+
+def cell_size(box, cells_across=GRID_CELLS_ACROSS):
+    """Grid cell size in degrees for clustering the points of a box"""
+    span = max(box["max_lng"] - box["min_lng"], box["max_lat"] - box["min_lat"])
+    return max(span / cells_across, 1e-5)
+
+def clusters_extent(clusters, padding):
+    """Box around cluster centres, padded by `padding` degrees and kept on the globe"""
+    lats = [cluster["lat"] for cluster in clusters]
+    lngs = [cluster["lng"] for cluster in clusters]
+    return {
+        "min_lat": max(min(lats) - padding, -90.0),
+        "max_lat": min(max(lats) + padding, 90.0),
+        "min_lng": max(min(lngs) - padding, -180.0),
+        "max_lng": min(max(lngs) + padding, 180.0),
+    }
+
+def cluster_points(points, size):
+    """Group (lat, lng, perception_score) points into grid cells of `size` degrees
+
+    Returns one dict per occupied cell with the mean `lat` and `lng` of its
+    points, `activity_count` and `avg_perception` (None when no point has a
+    score), like the get_location_clusters function on Supabase.
+    """
+    if not points:
+        return []
+    import pandas as pd
+    
+    frame = pd.DataFrame(points, columns=["lat", "lng", "perception_score"])
+    frame["perception_score"] = pd.to_numeric(frame["perception_score"], errors="coerce")
+    cells = frame.groupby([(frame["lat"] // size), (frame["lng"] // size)])
+    clusters = cells.agg(
+        lat=("lat", "mean"),
+        lng=("lng", "mean"),
+        activity_count=("lat", "size"),
+        avg_perception=("perception_score", "mean")
+    )
+    clusters["avg_perception"] = clusters["avg_perception"].round(2).astype(object).where(clusters["avg_perception"].notna(), None)
+    return clusters.reset_index(drop=True).to_dict("records")
\ No newline at end of file
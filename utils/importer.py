@@ -0,0 +1,256 @@
+import argparse
+import csv
+import json
+import os
+import uuid
+from datetime import datetime
+
+from .query import ACTIVITY_FIELDS
+
+# Mirrors the CHECK constraints on the activities table
+ACTIVITY_TYPES = ("live", "historical")
+PERCEPTION_SCORE_MIN = -5
+PERCEPTION_SCORE_MAX = 5
+
+ACTIVITY_COLUMNS = tuple(ACTIVITY_FIELDS)
+
+# Cap on invalid rows kept in the report, so a bad file can't exhaust memory
+MAX_REPORTED_ERRORS = 1000
+
+class ValidationError(ValueError):
+    """Raised when an import row does not fit the activities schema"""
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def _parse_text_array(value, field):
+    """Parse a TEXT[] field given as a list, a JSON array or a comma-separated string"""
+    if _blank(value):
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith("["):
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError:
+                raise ValidationError(f"{field}: invalid JSON array")
+        else:
+            return [item.strip() for item in text.split(",") if item.strip()]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValidationError(f"{field}: must be a list of strings")
+    return [item.strip() for item in value if item.strip()]
+
+def _parse_int(value, field):
+    if _blank(value):
+        return None
+    if isinstance(value, bool):
+        raise ValidationError(f"{field}: must be an integer")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{field}: must be an integer")
+    if not number.is_integer():
+        raise ValidationError(f"{field}: must be an integer")
+    return int(number)
+
+def _parse_coordinate(value, field, limit):
+    if _blank(value):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"location.{field}: must be a number")
+    if not -limit <= number <= limit:
+        raise ValidationError(f"location.{field}: must be between -{limit} and {limit}")
+    return number
+
+def _parse_location(row):
+    location = row.get("location")
+    if isinstance(location, str):
+        if _blank(location):
+            location = None
+        else:
+            try:
+                location = json.loads(location)
+            except json.JSONDecodeError:
+                # A bare string is taken as the location description
+                location = {"description": location}
+    
+    # Flat CSV columns are accepted as an alternative to a JSON location
+    if location is None and any(not _blank(row.get(key)) for key in ("lat", "lng", "location_description")):
+        location = {
+            "lat": row.get("lat"),
+            "lng": row.get("lng"),
+            "description": row.get("location_description")
+        }
+    
+    if location is None:
+        return None
+    if not isinstance(location, dict):
+        raise ValidationError("location: must be a JSON object with lat, lng and description")
+    
+    description = location.get("description")
+    if description is not None and not isinstance(description, str):
+        raise ValidationError("location.description: must be a string")
+    
+    return {
+        "lat": _parse_coordinate(location.get("lat"), "lat", 90),
+        "lng": _parse_coordinate(location.get("lng"), "lng", 180),
+        "description": description.strip() if description and description.strip() else "Not specified"
+    }
+
+def _parse_timestamp(value, field, required):
+    if _blank(value):
+        if required:
+            raise ValidationError(f"{field}: is required")
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip().replace('Z', '+00:00')).isoformat()
+    except ValueError:
+        raise ValidationError(f"{field}: must be an ISO 8601 date/time")
+
+def validate_activity(row):
+    """Validate one raw import row and return it as an activities insert payload
+
+    Raises ValidationError describing the first problem found.
+    """
+    unknown = set(row) - set(ACTIVITY_COLUMNS) - {"lat", "lng", "location_description"}
+    if unknown:
+        raise ValidationError(f"unknown columns: {', '.join(sorted(unknown))}")
+    
+    activity_type = row.get("type")
+    if isinstance(activity_type, str):
+        activity_type = activity_type.strip().lower()
+    if activity_type not in ACTIVITY_TYPES:
+        raise ValidationError(f"type: must be one of {', '.join(ACTIVITY_TYPES)}")
+    
+    perception_score = _parse_int(row.get("perception_score"), "perception_score")
+    if perception_score is not None and not PERCEPTION_SCORE_MIN <= perception_score <= PERCEPTION_SCORE_MAX:
+        raise ValidationError(f"perception_score: must be between {PERCEPTION_SCORE_MIN} and {PERCEPTION_SCORE_MAX}")
+    
+    timer_duration = _parse_int(row.get("timer_duration"), "timer_duration")
+    if timer_duration is not None and timer_duration < 0:
+        raise ValidationError("timer_duration: must not be negative")
+    
+    description = row.get("description")
+    if description is not None and not isinstance(description, str):
+        raise ValidationError("description: must be a string")
+    
+    activity = {
+        "timestamp": _parse_timestamp(row.get("timestamp"), "timestamp", required=True),
+        "type": activity_type,
+        "location": _parse_location(row),
+        "perception_score": perception_score,
+        "tags": _parse_text_array(row.get("tags"), "tags"),
+        "description": description.strip() if description else "",
+        "timer_duration": timer_duration,
+        "media_urls": _parse_text_array(row.get("media_urls"), "media_urls"),
+        "thumbnail_urls": _parse_text_array(row.get("thumbnail_urls"), "thumbnail_urls")
+    }
+    
+    # Keep original identity and creation time when migrating from another store
+    if not _blank(row.get("id")):
+        try:
+            activity["id"] = str(uuid.UUID(str(row["id"]).strip()))
+        except ValueError:
+            raise ValidationError("id: must be a UUID")
+    created_at = _parse_timestamp(row.get("created_at"), "created_at", required=False)
+    if created_at:
+        activity["created_at"] = created_at
+    
+    return activity
+
+def detect_format(path):
+    """Guess the import format from a file name"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported import file type: {extension or path}")
+
+def iter_raw_rows(file, file_format):
+    """Yield (line_number, row dict) from an open text file, one row at a time"""
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            # Cells beyond the header row are collected under a None key
+            yield reader.line_num, {key: value for key, value in row.items() if key is not None}
+    elif file_format == "jsonl":
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ValidationError(f"invalid JSON: {e.msg}")
+                continue
+            yield line_number, row if isinstance(row, dict) else ValidationError("each line must be a JSON object")
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+def iter_valid_activities(file, file_format, report):
+    """Yield validated activities, recording invalid rows in report["invalid_rows"]"""
+    for line_number, row in iter_raw_rows(file, file_format):
+        try:
+            if isinstance(row, ValidationError):
+                raise row
+            activity = validate_activity(row)
+        except ValidationError as e:
+            report["invalid"] += 1
+            if len(report["invalid_rows"]) < MAX_REPORTED_ERRORS:
+                report["invalid_rows"].append({"line": line_number, "error": str(e)})
+            continue
+        report["valid"] += 1
+        yield activity
+
+def import_activities(db_handler, file, file_format, chunk_size=500):
+    """Stream, validate and batch-insert activities from an open CSV or JSONL file
+
+    Returns the batch insert report extended with `valid`, `invalid` and
+    `invalid_rows` (line number and reason, capped at MAX_REPORTED_ERRORS).
+    """
+    report = {"valid": 0, "invalid": 0, "invalid_rows": []}
+    insert_report = db_handler.add_activities_batch(
+        iter_valid_activities(file, file_format, report),
+        chunk_size=chunk_size
+    )
+    report.update(insert_report)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Import activities from CSV or JSONL files")
+    parser.add_argument("paths", nargs="+", help="CSV (.csv) or JSON Lines (.jsonl, .ndjson) files")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Override format detection")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows per insert request (default: 500)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only, insert nothing")
+    args = parser.parse_args()
+    
+    if not args.dry_run:
+        from .data_handler import get_data_handler
+        db_handler = get_data_handler()
+    
+    for path in args.paths:
+        file_format = args.format or detect_format(path)
+        with open(path, newline="", encoding="utf-8") as file:
+            if args.dry_run:
+                report = {"valid": 0, "invalid": 0, "invalid_rows": []}
+                for _ in iter_valid_activities(file, file_format, report):
+                    pass
+            else:
+                report = import_activities(db_handler, file, file_format, chunk_size=args.chunk_size)
+        
+        print(f"{path}: {report['valid']} valid, {report['invalid']} invalid rows")
+        for invalid in report["invalid_rows"]:
+            print(f"  line {invalid['line']}: {invalid['error']}")
+        if not args.dry_run:
+            print(f"  inserted {report['inserted']}, failed {report['failed']}")
+            for failed in report["failed_chunks"]:
+                print(f"  chunk {failed['chunk']} (rows {failed['first_row']}-{failed['first_row'] + failed['rows'] - 1}): {failed['error']}")
+            if report["rollups_stale"]:
+                print("  daily rollups are out of date; run `python -m utils.rollups rebuild`")
+            if report["tags_stale"]:
+                print("  tag index is out of date; run `python -m utils.tags rebuild`")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,47 +1,115 @@
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
 import streamlit as st
-import geocoder
-from streamlit_geolocation import streamlit_geolocation
+
+from .cache import ReadCache
+
+# How long an IP address's location is trusted, and how long a form waits for it
+IP_LOCATION_TTL = 3600
+IP_LOOKUP_TIMEOUT = 5
+
+# Shared by every session: an address is looked up once per TTL, and a stale
+# location is served while it is refreshed in the background
+_lookups = ReadCache(max_entries=256, default_ttl=IP_LOCATION_TTL, stale_ttl=IP_LOCATION_TTL)
+_lookup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="location-lookup")
+_pending = {}
+_pending_lock = threading.Lock()
+
+def client_address():
+    """Public IP address of the browser for this session, or None
+
+    None means the browser is on the same machine or private network as the
+    server, where the server's own public address is the user's too.
+    """
+    try:
+        address = ipaddress.ip_address(st.context.ip_address or "")
+    except ValueError:
+        return None
+    return str(address) if address.is_global else None
+
+def describe_coordinates(lat, lng):
+    """Name coordinates after the nearest place in the offline gazetteer, or None"""
+    # Imported here: the gazetteer needs numpy, which pages without coordinates don't
+    from .gazetteer import reverse_geocode
+    
+    return reverse_geocode(lat, lng)
+
+def _load_gazetteer():
+    from .gazetteer import get_gazetteer
+    
+    get_gazetteer()
+
+def _lookup_ip_location(address):
+    import geocoder
+    
+    # Raises instead of returning nothing, so failures are retried rather than cached
+    g = geocoder.ip(address or "me", timeout=IP_LOOKUP_TIMEOUT)
+    if not g.ok or not g.latlng or len(g.latlng) != 2:
+        raise LookupError("Could not determine location from IP address")
+    lat, lng = g.latlng
+    description = ", ".join(part for part in (g.city, g.state, g.country) if part)
+    return {"lat": lat, "lng": lng, "description": description or describe_coordinates(lat, lng) or "Unknown Location"}
+
+def ip_location_future(address):
+    """Start looking up the location of an IP address (None for the server's own) in the background
+
+    Returns a future for a {"lat", "lng", "description"} dict, shared with
+    any lookup of the same address still in flight. Cached locations resolve
+    immediately.
+    """
+    with _pending_lock:
+        future = _pending.get(address)
+        if future is not None:
+            return future
+        future = _pending[address] = _lookup_executor.submit(
+            _lookups.get, ("ip", address), lambda: _lookup_ip_location(address)
+        )
+    
+    def forget(done):
+        with _pending_lock:
+            if _pending.get(address) is done:
+                del _pending[address]
+    
+    future.add_done_callback(forget)
+    return future
+
+def prefetch_location_lookups():
+    """Warm the IP location of this session and the offline gazetteer without waiting for either"""
+    ip_location_future(client_address())
+    _lookup_executor.submit(_load_gazetteer)
 
 def gps_location_handler():
     """Handle location detection using IP geolocation and GPS fallback"""
     st.subheader("📍 Auto Location Detection")
     st.write("Get your current location automatically (use this before filling the form)")
     
+    # Start the lookups now, so the buttons below rarely have to wait
+    prefetch_location_lookups()
+    
     col1, col2 = st.columns(2)
     
     with col1:
         if st.button("🌐 Get IP Location", help="Get location based on your IP address (fast & reliable)"):
             try:
                 with st.spinner("🔄 Getting your location..."):
-                    g = geocoder.ip('me')
-                    
-                if g.latlng and len(g.latlng) == 2:
-                    # Successfully got IP-based location
-                    if "location_data" not in st.session_state:
-                        st.session_state.location_data = {"lat": None, "lng": None, "description": ""}
-                    
-                    st.session_state.location_data["lat"] = g.latlng[0]
-                    st.session_state.location_data["lng"] = g.latlng[1]
-                    
-                    # Create a descriptive location string
-                    location_desc = []
-                    if g.city:
-                        location_desc.append(g.city)
-                    if g.state:
-                        location_desc.append(g.state)
-                    if g.country:
-                        location_desc.append(g.country)
-                    
-                    description = ", ".join(location_desc) if location_desc else "Unknown Location"
-                    st.session_state.location_data["description"] = description
-                    
-                    st.success(f"📍 Location detected: {description}")
-                    st.success(f"🌍 Coordinates: {g.latlng[0]:.4f}, {g.latlng[1]:.4f}")
-                    st.info("✅ Now you can proceed to fill the activity form below.")
-                else:
-                    st.error("❌ Could not determine location from IP address")
-                    st.info("This might happen if you're using a VPN or proxy.")
-                    
+                    location = ip_location_future(client_address()).result(timeout=IP_LOOKUP_TIMEOUT)
+                
+                if "location_data" not in st.session_state:
+                    st.session_state.location_data = {"lat": None, "lng": None, "description": ""}
+                st.session_state.location_data.update(location)
+                
+                st.success(f"📍 Location detected: {location['description']}")
+                st.success(f"🌍 Coordinates: {location['lat']:.4f}, {location['lng']:.4f}")
+                st.info("✅ Now you can proceed to fill the activity form below.")
+            
+            except LookupError:
+                st.error("❌ Could not determine location from IP address")
+                st.info("This might happen if you're using a VPN or proxy.")
+            except TimeoutError:
+                st.warning("⏳ The location service is slow to answer.")
+                st.info("The lookup carries on in the background; press the button again in a moment.")
             except Exception as e:
                 st.error(f"❌ IP location error: {str(e)}")
                 st.info("Please use manual location entry or try GPS method.")
@@ -49,6 +117,8 @@ def gps_location_handler():
     with col2:
         if st.button("📡 Get GPS Location", help="Get precise GPS coordinates (requires permission)"):
             try:
+                from streamlit_geolocation import streamlit_geolocation
+                
                 location = streamlit_geolocation()
                 
                 # Handle the different states of the geolocation component
@@ -62,6 +132,12 @@ def gps_location_handler():
                     st.session_state.location_data["lat"] = location["latitude"]
                     st.session_state.location_data["lng"] = location["longitude"]
                     st.success(f"📍 GPS location captured: {location['latitude']:.6f}, {location['longitude']:.6f}")
+                    
+                    place = describe_coordinates(location["latitude"], location["longitude"])
+                    if place:
+                        if not st.session_state.location_data["description"]:
+                            st.session_state.location_data["description"] = place
+                        st.success(f"🏙️ Near {place}")
                     st.info("✅ Now you can proceed to fill the activity form below.")
                     
                     # Show accuracy info if available
@@ -73,7 +149,7 @@ def gps_location_handler():
                 else:
                     st.warning("⚠️ GPS not available")
                     st.info("💡 Use IP Location instead!")
-                    
+            
             except Exception as e:
                 st.error(f"❌ GPS error: {str(e)}")
                 st.info("💡 Try the IP Location button instead!")
@@ -120,7 +196,9 @@ def location_handler():
     
     # Display current location status
     if st.session_state.location_data["lat"] and st.session_state.location_data["lng"]:
-        st.info(f"🌍 GPS: {st.session_state.location_data['lat']:.4f}, {st.session_state.location_data['lng']:.4f}")
+        place = describe_coordinates(st.session_state.location_data["lat"], st.session_state.location_data["lng"])
+        near = f" (near {place})" if place else ""
+        st.info(f"🌍 GPS: {st.session_state.location_data['lat']:.4f}, {st.session_state.location_data['lng']:.4f}{near}")
     
     if st.session_state.location_data["description"]:
         st.info(f"📝 Description: {st.session_state.location_data['description']}")
@@ -131,13 +209,21 @@ def location_handler():
     return get_location_data()
 
 def get_location_data():
-    """Get formatted location data for database storage"""
+    """Get formatted location data for database storage
+
+    Coordinates without a description are described by the nearest place in
+    the offline gazetteer.
+    """
     location_data = st.session_state.get("location_data", {"lat": None, "lng": None, "description": ""})
     
+    description = location_data["description"]
+    if not description and location_data["lat"] and location_data["lng"]:
+        description = describe_coordinates(location_data["lat"], location_data["lng"])
+    
     return {
         "lat": location_data["lat"],
         "lng": location_data["lng"], 
-        "description": location_data["description"] if location_data["description"] else "Not specified"
+        "description": description if description else "Not specified"
     }
 
 def clear_location():
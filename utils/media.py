@@ -0,0 +1,104 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from PIL import Image, ImageOps
+
+# Longest edge, in pixels, of each stored rendition
+WEB_MAX_SIZE = 1920
+THUMBNAIL_MAX_SIZE = 320
+JPEG_QUALITY = 82
+THUMBNAIL_JPEG_QUALITY = 75
+
+IMAGE_PROCESS_WORKERS = int(os.getenv("IMAGE_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MEDIA_INDEX_MAX_ENTRIES = 4096
+
+def hash_file(file, chunk_size=HASH_CHUNK_SIZE):
+    """SHA-256 hex digest of a seekable binary file, read in chunks
+
+    Restores the file position, so the same file object can be uploaded next.
+    """
+    position = file.tell()
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(chunk_size), b""):
+        digest.update(chunk)
+    file.seek(position)
+    return digest.hexdigest()
+
+def content_path(file_type, digest, extension):
+    """Storage path for content with this digest: {file_type}s/{ab}/{digest}.{extension}"""
+    return f"{file_type}s/{digest[:2]}/{digest}.{extension.lower()}"
+
+class MediaIndex:
+    """Bounded map from an uploaded file's content hash to its stored URLs
+
+    Lets a repeated upload of the same file, such as a resubmitted form,
+    skip recompression and storage round trips entirely. Lives for the
+    life of the process; after a restart the storage existence check
+    still prevents duplicate objects.
+    """
+    
+    def __init__(self, max_entries=MEDIA_INDEX_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+            return entry
+    
+    def set(self, digest, entry):
+        with self._lock:
+            self._entries[digest] = entry
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def create_image_pool():
+    """Create the process pool that image preprocessing runs in
+
+    Uses spawn rather than fork, since forking the multi-threaded Streamlit
+    server process is unsafe.
+    """
+    return ProcessPoolExecutor(max_workers=IMAGE_PROCESS_WORKERS, mp_context=get_context("spawn"))
+
+def _has_transparency(image):
+    return image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+
+def _encode(image, max_size, quality):
+    rendition = image.copy()
+    rendition.thumbnail((max_size, max_size), Image.LANCZOS)
+    output = io.BytesIO()
+    # Saving without exif/icc arguments drops all metadata, GPS included
+    if _has_transparency(rendition):
+        rendition.save(output, format="PNG", optimize=True)
+        return {"bytes": output.getvalue(), "extension": "png", "content_type": "image/png"}
+    if rendition.mode != "RGB":
+        rendition = rendition.convert("RGB")
+    rendition.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return {"bytes": output.getvalue(), "extension": "jpg", "content_type": "image/jpeg"}
+
+def preprocess_image(file_bytes):
+    """Build a size-capped web rendition and a thumbnail, both without metadata
+
+    Runs in a worker process. Returns {"web": rendition, "thumbnail": rendition}
+    where each rendition has `bytes`, `extension` and `content_type`.
+    """
+    with Image.open(io.BytesIO(file_bytes)) as image:
+        # Apply the camera's orientation before the EXIF tag is dropped
+        image = ImageOps.exif_transpose(image)
+        image.load()
+        return {
+            "web": _encode(image, WEB_MAX_SIZE, JPEG_QUALITY),
+            "thumbnail": _encode(image, THUMBNAIL_MAX_SIZE, THUMBNAIL_JPEG_QUALITY)
+        }
\ No newline at end of file
@@ -0,0 +1,372 @@
+import streamlit as st
+import inspect
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from functools import partial, wraps
+
+# Upper bounds in seconds of the exported histogram buckets, from a local
+# cache hit to a slow upload
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Percentiles are over each operation's most recent timings, so they follow
+# changes instead of averaging over the life of the process
+ROLLING_WINDOW = 1000
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Show the sidebar performance panel on every page
+PERFORMANCE_PANEL = os.getenv("PERFORMANCE_PANEL", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Prometheus text export: a file rewritten every METRICS_FILE_INTERVAL seconds
+# (for node_exporter's textfile collector), and/or a /metrics endpoint
+METRICS_FILE = os.getenv("METRICS_FILE")
+METRICS_FILE_INTERVAL = float(os.getenv("METRICS_FILE_INTERVAL", "15"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+METRIC_PREFIX = "activity_tracker"
+SESSION_METRICS_KEY = "_metrics"
+
+# Methods left untimed: planning and bookkeeping around the timed operations,
+# and the per-row formatter, where a few microseconds of timing per call would
+# add half again to its cost (format_activities_for_display is timed instead)
+UNTIMED_METHODS = {"_read_plan", "_cached_read", "format_activity_for_display"}
+
+class LatencyHistogram:
+    """Timings of one operation: lifetime bucket counts plus a rolling window
+
+    Bucket counts, sum and counts only grow, as Prometheus histograms
+    expect. Percentiles come from the last `window` timings.
+    """
+    
+    def __init__(self, window=ROLLING_WINDOW, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds, error=False):
+        with self._lock:
+            self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total_seconds += seconds
+            if error:
+                self.errors += 1
+            self.recent.append(seconds)
+    
+    def quantiles(self):
+        """Nearest-rank p50, p95 and p99 of the rolling window, in seconds ({} before any timing)"""
+        with self._lock:
+            recent = sorted(self.recent)
+        if not recent:
+            return {}
+        return {quantile: recent[min(len(recent) - 1, int(quantile * len(recent)))] for quantile in QUANTILES}
+    
+    def summary(self):
+        """Count, errors, mean and p50/p95/p99 in milliseconds"""
+        with self._lock:
+            count, errors, total = self.count, self.errors, self.total_seconds
+        quantiles = self.quantiles()
+        return {
+            "count": count,
+            "errors": errors,
+            "mean_ms": round(total / count * 1000, 2) if count else None,
+            **{
+                f"p{round(quantile * 100)}_ms": round(quantiles[quantile] * 1000, 2) if quantiles else None
+                for quantile in QUANTILES
+            }
+        }
+    
+    def export(self):
+        """(cumulative bucket counts including +Inf, sum, count, errors)"""
+        with self._lock:
+            counts, total, count, errors = list(self.bucket_counts), self.total_seconds, self.count, self.errors
+        cumulative, running = [], 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        return cumulative, total, count, errors
+
+class MetricsRegistry:
+    """Latency histograms keyed by operation name"""
+    
+    def __init__(self, window=ROLLING_WINDOW):
+        self.window = window
+        self._histograms = {}
+        self._lock = threading.Lock()
+    
+    def histogram(self, operation):
+        histogram = self._histograms.get(operation)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(operation, LatencyHistogram(self.window))
+        return histogram
+    
+    def observe(self, operation, seconds, error=False):
+        self.histogram(operation).observe(seconds, error)
+    
+    def operations(self):
+        with self._lock:
+            return sorted(self._histograms)
+    
+    def snapshot(self):
+        """One summary row per operation, slowest p95 first"""
+        rows = [{"operation": operation, **self._histograms[operation].summary()} for operation in self.operations()]
+        return sorted(rows, key=lambda row: row["p95_ms"] or 0, reverse=True)
+    
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+# Timings from every session and background thread in this process
+process_metrics = MetricsRegistry()
+
+# The running script's session registry, set by timed_page. Coroutines handed
+# to the async runner inherit it; plain worker threads do not.
+_session_metrics = ContextVar("session_metrics", default=None)
+
+def record(operation, seconds, error=False):
+    """Add one timing to the process metrics and, inside a page run, the session's"""
+    process_metrics.observe(operation, seconds, error)
+    session = _session_metrics.get()
+    if session is not None:
+        session.observe(operation, seconds, error)
+
+def timed(function, operation=None):
+    """Wrap a function or coroutine function so every call is recorded under operation
+
+    Calls that raise are counted as errors. Streamlit's stop and rerun
+    signals are not exceptions, so they count as ordinary calls.
+    """
+    operation = operation or function.__name__
+    
+    if inspect.iscoroutinefunction(function):
+        @wraps(function)
+        async def timed_coroutine(*args, **kwargs):
+            started = time.perf_counter()
+            error = False
+            try:
+                return await function(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                record(operation, time.perf_counter() - started, error)
+        return timed_coroutine
+    
+    @wraps(function)
+    def timed_function(*args, **kwargs):
+        started = time.perf_counter()
+        error = False
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            record(operation, time.perf_counter() - started, error)
+    return timed_function
+
+def instrument_operations(cls=None, *, prefix=""):
+    """Class decorator that times every method, including inherited ones
+
+    Each method is recorded under `prefix` plus its name, so a public read
+    and the storage primitive behind it show up separately. Dunder methods,
+    generators (timed through the calls they make) and UNTIMED_METHODS are
+    left alone.
+    """
+    if cls is None:
+        return partial(instrument_operations, prefix=prefix)
+    
+    for klass in reversed(cls.__mro__[:-1]):
+        for name, value in vars(klass).items():
+            if name.startswith("__") or name in UNTIMED_METHODS:
+                continue
+            if not inspect.isfunction(value) or inspect.isgeneratorfunction(value):
+                continue
+            # The most derived definition, wrapped once
+            method = getattr(cls, name)
+            if getattr(method, "__wrapped__", None) is None:
+                setattr(cls, name, timed(method, f"{prefix}{name}"))
+    return cls
+
+def get_session_metrics():
+    """Get the current session's registry, creating it on first use"""
+    if SESSION_METRICS_KEY not in st.session_state:
+        st.session_state[SESSION_METRICS_KEY] = MetricsRegistry()
+    return st.session_state[SESSION_METRICS_KEY]
+
+def timed_page(name):
+    """Decorator for a page's main(): times each script run as `page:<name>`
+
+    Operations the run performs on its own thread (and in coroutines it
+    hands to the async runner) also go to the session's metrics. Starts the
+    Prometheus export, and shows the performance panel when
+    PERFORMANCE_PANEL is set.
+    """
+    def decorate(main):
+        @wraps(main)
+        def run_page(*args, **kwargs):
+            start_metrics_export()
+            token = _session_metrics.set(get_session_metrics())
+            started = time.perf_counter()
+            error = False
+            try:
+                result = main(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                record(f"page:{name}", time.perf_counter() - started, error)
+                _session_metrics.reset(token)
+            
+            if PERFORMANCE_PANEL and st.session_state.get("authenticated"):
+                performance_panel()
+            return result
+        return run_page
+    return decorate
+
+def performance_panel():
+    """Sidebar expander with p50/p95/p99, counts and errors per operation"""
+    with st.sidebar.expander("⏱️ Performance"):
+        scope = st.radio("Timings from", ["This session", "All sessions"], horizontal=True, key="performance_scope")
+        registry = get_session_metrics() if scope == "This session" else process_metrics
+        rows = registry.snapshot()
+        if not rows:
+            st.caption("No timings yet.")
+            return
+        
+        st.dataframe(
+            rows,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "operation": st.column_config.TextColumn("Operation"),
+                "count": st.column_config.NumberColumn("Calls"),
+                "errors": st.column_config.NumberColumn("Errors"),
+                "mean_ms": st.column_config.NumberColumn("Mean ms", format="%.1f"),
+                "p50_ms": st.column_config.NumberColumn("p50 ms", format="%.1f"),
+                "p95_ms": st.column_config.NumberColumn("p95 ms", format="%.1f"),
+                "p99_ms": st.column_config.NumberColumn("p99 ms", format="%.1f")
+            }
+        )
+        st.caption(
+            f"Percentiles over the last {ROLLING_WINDOW} calls of each operation. "
+            "page:… rows are whole script runs; _-prefixed rows are backend round trips."
+        )
+        if st.button("Reset", key="performance_reset"):
+            registry.reset()
+            st.rerun()
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_number(value):
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+def prometheus_text(registry=None):
+    """The registry's metrics in the Prometheus text exposition format"""
+    registry = registry or process_metrics
+    duration = f"{METRIC_PREFIX}_operation_duration_seconds"
+    recent = f"{METRIC_PREFIX}_operation_recent_duration_seconds"
+    errors = f"{METRIC_PREFIX}_operation_errors_total"
+    
+    histogram_lines = [
+        f"# HELP {duration} Time spent in data handler operations and page script runs.",
+        f"# TYPE {duration} histogram"
+    ]
+    recent_lines = [
+        f"# HELP {recent} Percentiles of the last {ROLLING_WINDOW} timings of each operation.",
+        f"# TYPE {recent} gauge"
+    ]
+    error_lines = [
+        f"# HELP {errors} Operation calls that raised an exception.",
+        f"# TYPE {errors} counter"
+    ]
+    
+    for operation in registry.operations():
+        histogram = registry.histogram(operation)
+        label = f'operation="{_escape_label(operation)}"'
+        cumulative, total, count, error_count = histogram.export()
+        for bound, bucket_count in zip((*histogram.buckets, float("inf")), cumulative):
+            histogram_lines.append(f'{duration}_bucket{{{label},le="{_format_number(bound)}"}} {bucket_count}')
+        histogram_lines.append(f"{duration}_sum{{{label}}} {_format_number(total)}")
+        histogram_lines.append(f"{duration}_count{{{label}}} {count}")
+        
+        for quantile, seconds in histogram.quantiles().items():
+            recent_lines.append(f'{recent}{{{label},quantile="{quantile}"}} {_format_number(seconds)}')
+        error_lines.append(f"{errors}{{{label}}} {error_count}")
+    
+    return "\n".join(histogram_lines + recent_lines + error_lines) + "\n"
+
+def write_prometheus_file(path, registry=None):
+    """Write prometheus_text() to path atomically, so scrapers never see half a file"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(prometheus_text(registry))
+    os.replace(temporary, path)
+
+def _write_periodically(path, interval):
+    while True:
+        try:
+            write_prometheus_file(path)
+        except OSError:
+            # Unwritable for now (e.g. the directory is being rotated); try again next time
+            pass
+        time.sleep(interval)
+
+def serve_metrics(host=METRICS_HOST, port=METRICS_PORT):
+    """Serve prometheus_text() at http://host:port/metrics on a background thread and return the server"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+    return server
+
+@st.cache_resource
+def start_metrics_export():
+    """Start the configured Prometheus exports once per process
+
+    Returns {"file": path or None, "port": bound port or None}. The port is
+    None too when the endpoint couldn't bind; that is logged as a warning.
+    """
+    exports = {"file": None, "port": None}
+    if METRICS_FILE:
+        threading.Thread(
+            target=_write_periodically, args=(METRICS_FILE, METRICS_FILE_INTERVAL), name="metrics-file", daemon=True
+        ).start()
+        exports["file"] = METRICS_FILE
+    if METRICS_PORT:
+        try:
+            exports["port"] = serve_metrics().server_address[1]
+        except OSError as e:
+            # Port taken (e.g. by another app process) or not allowed; the app
+            # runs on without the endpoint, and the failure is cached with the
+            # rest so it isn't retried on every page run
+            logging.getLogger(__name__).warning(
+                "Metrics endpoint not started on %s:%s: %s", METRICS_HOST, METRICS_PORT, e
+            )
+    return exports
\ No newline at end of file
@@ -0,0 +1,138 @@
+from typing import NamedTuple, Optional
+
+# Column -> Python type of the values the backends return
+ACTIVITY_FIELDS = {
+    "id": str,
+    "created_at": str,
+    "timestamp": str,
+    "type": str,
+    "location": dict,
+    "perception_score": int,
+    "tags": list,
+    "description": str,
+    "timer_duration": int,
+    "media_urls": list,
+    "thumbnail_urls": list,
+}
+
+# Prefix length of the `description_preview` computed column (see README).
+# Truncations up to this length are done by the server.
+DESCRIPTION_PREVIEW_LENGTH = 100
+
+_row_types = {}
+_preview_available = True
+
+class ActivityQuery:
+    """Which activity columns a read needs, and how much of the text
+
+    Build one with ActivityQuery.select(...).truncate(...); every method
+    returns a new query, so module-level queries can be shared. Backends
+    fetch only the selected columns and trim truncated text server-side
+    where they can. to_rows() turns the raw rows into NamedTuples with one
+    typed field per selected column.
+    """
+    
+    def __init__(self, columns=None, truncations=None):
+        self.columns = tuple(columns or ACTIVITY_FIELDS)
+        unknown = [column for column in self.columns if column not in ACTIVITY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        self.truncations = dict(truncations or {})
+    
+    @classmethod
+    def select(cls, *columns):
+        """Query for just these columns, in this order"""
+        return cls(columns)
+    
+    @classmethod
+    def parse(cls, columns):
+        """Query from a select string such as "*" or "id,created_at,type" """
+        if columns == "*":
+            return cls()
+        return cls([name.strip() for name in columns.split(",")])
+    
+    def truncate(self, column, length):
+        """Return a copy that cuts a text column to at most length characters"""
+        if column not in self.columns or ACTIVITY_FIELDS[column] is not str:
+            raise ValueError(f"Cannot truncate {column}")
+        return ActivityQuery(self.columns, {**self.truncations, column: length})
+    
+    @property
+    def key(self):
+        """Hashable identity for cache keys"""
+        return self.columns, tuple(sorted(self.truncations.items()))
+    
+    @property
+    def is_full(self):
+        """True for every column, untruncated"""
+        return set(self.columns) == set(ACTIVITY_FIELDS) and not self.truncations
+    
+    @property
+    def row_type(self):
+        if self.columns not in _row_types:
+            _row_types[self.columns] = NamedTuple(
+                "ActivityRow",
+                [(column, Optional[ACTIVITY_FIELDS[column]]) for column in self.columns]
+            )
+        return _row_types[self.columns]
+    
+    def trim(self, row):
+        """Apply the truncations to a raw row dict, for backends that fetched full text"""
+        for column, length in self.truncations.items():
+            if isinstance(row.get(column), str) and len(row[column]) > length:
+                row[column] = row[column][:length]
+        return row
+    
+    def to_rows(self, rows):
+        """Convert raw row dicts into typed rows holding only the selected columns"""
+        row_type = self.row_type
+        typed_rows = []
+        for row in rows:
+            row = self.trim(dict(row))
+            typed_rows.append(row_type(*(row.get(column) for column in self.columns)))
+        return typed_rows
+
+def postgrest_select(query):
+    """PostgREST select clause for a query, using description_preview when it covers the truncation"""
+    if query.is_full:
+        # Named rather than "*", so generated columns such as search_vector
+        # stay on the server
+        return ",".join(ACTIVITY_FIELDS)
+    fields = []
+    for column in query.columns:
+        length = query.truncations.get(column)
+        if column == "description" and length is not None and length <= DESCRIPTION_PREVIEW_LENGTH and _preview_available:
+            fields.append("description:description_preview")
+        else:
+            fields.append(column)
+    return ",".join(fields)
+
+def handle_preview_error(error):
+    """Return True if error means the description_preview column is missing
+
+    Later selects then fetch full descriptions and truncate them locally.
+    """
+    global _preview_available
+    if "description_preview" in str(error):
+        _preview_available = False
+        return True
+    return False
+
+# Whole rows, as the detail views need them
+FULL_QUERY = ActivityQuery()
+
+# Columns the activity tables show, with descriptions cut to a preview
+SUMMARY_QUERY = ActivityQuery.select(
+    "id", "created_at", "timestamp", "type", "location", "perception_score", "tags", "description"
+).truncate("description", DESCRIPTION_PREVIEW_LENGTH)
+
+def search_page(rows, page_size):
+    """Search results page from up to page_size + 1 SUMMARY_QUERY row dicts
+
+    The extra row only tells whether another page exists.
+    """
+    return {"activities": SUMMARY_QUERY.to_rows(rows[:page_size]), "has_more": len(rows) > page_size}
+
+def nearby_page(rows):
+    """Nearby results from SUMMARY_QUERY row dicts that each carry `distance_km`"""
+    return {"activities": SUMMARY_QUERY.to_rows(rows), "distances_km": [row["distance_km"] for row in rows]}
\ No newline at end of file
@@ -0,0 +1,59 @@
+import argparse
+import math
+from collections import defaultdict
+
+ROLLUP_TABLE = "activity_daily_rollups"
+
+def rollup_row_from_activity(activity):
+    """Get the RPC arguments that fold one inserted activity into its (day, type) rollup"""
+    return {
+        "activity_timestamp": activity.get("timestamp"),
+        "activity_type": activity.get("type"),
+        "score": activity.get("perception_score"),
+        "duration": activity.get("timer_duration")
+    }
+
+def summarize_rollups(rows, group_by=None):
+    """Combine rollup rows into count, mean, standard deviation and total duration
+
+    Rows carry sums and sums of squares, so any set of days can be merged
+    without touching the raw activities. With group_by (e.g. "type" or "day")
+    a dict of summaries keyed by that column is returned instead of one summary.
+    """
+    if group_by:
+        groups = defaultdict(list)
+        for row in rows:
+            groups[row[group_by]].append(row)
+        return {key: summarize_rollups(group) for key, group in groups.items()}
+    
+    activity_count = sum(row.get("activity_count") or 0 for row in rows)
+    perception_count = sum(row.get("perception_count") or 0 for row in rows)
+    perception_sum = sum(row.get("perception_sum") or 0 for row in rows)
+    perception_sum_sq = sum(row.get("perception_sum_sq") or 0 for row in rows)
+    timer_duration_total = sum(row.get("timer_duration_total") or 0 for row in rows)
+    
+    mean = perception_sum / perception_count if perception_count else 0
+    # Population variance from the running sums, clamped against float error
+    variance = max(perception_sum_sq / perception_count - mean ** 2, 0) if perception_count else 0
+    
+    return {
+        "activity_count": activity_count,
+        "perception_count": perception_count,
+        "avg_perception": round(mean, 2),
+        "perception_stddev": round(math.sqrt(variance), 2),
+        "timer_duration_total": timer_duration_total
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the activity_daily_rollups table")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: recompute every rollup from the activities table")
+    args = parser.parse_args()
+    
+    from .data_handler import get_data_handler
+    
+    if args.command == "rebuild":
+        day_count = get_data_handler().rebuild_rollups()
+        print(f"Rebuilt {day_count} rollup rows")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,125 @@
+import math
+import re
+import threading
+from array import array
+
+import numpy as np
+
+# Weight of a term by the field it appears in, matching the A/B/C weights of
+# the Supabase search_vector column and ts_rank's defaults for them
+FIELD_WEIGHTS = {
+    "tags": 1.0,
+    "description": 0.4,
+    "location": 0.2,
+}
+
+# Dropped from documents and queries, like Postgres' english configuration
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can did do does doing down during each few for from further had has have having he her here
+hers herself him himself his how i if in into is it its itself just me more most my myself no nor not now
+of off on once only or other our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we
+were what when where which while who whom why will with you your yours yourself yourselves
+""".split())
+
+_TOKEN = re.compile(r"\w+")
+
+def tokenize(text):
+    """Lowercased word tokens of text, without stop words"""
+    if not text:
+        return []
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+def search_fields(activity):
+    """The searchable text of an activity, by FIELD_WEIGHTS field"""
+    location = activity.get("location")
+    return {
+        "tags": " ".join(activity.get("tags") or []),
+        "description": activity.get("description") or "",
+        "location": (location.get("description") or "") if isinstance(location, dict) else ""
+    }
+
+class SearchIndex:
+    """Append-only in-process inverted index over activity text
+
+    Stands in for the Supabase tsvector column on backends without one.
+    Each term maps to a posting list of document numbers (in insertion
+    order, so ascending) and field-weighted term frequencies, held in
+    compact arrays. A search intersects the posting lists of its terms and
+    ranks the matches by weighted tf-idf with numpy, newest first among
+    equal scores, so the cost follows the number of matches rather than the
+    size of the table. Activities are never edited or deleted in this app,
+    so documents are only ever added.
+    """
+    
+    def __init__(self):
+        self._ids = []
+        self._positions = {}
+        self._postings = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def add(self, activities):
+        """Index activities (dicts with id, tags, description and location) not seen before"""
+        with self._lock:
+            for activity in activities:
+                activity_id = activity["id"]
+                if activity_id in self._positions:
+                    continue
+                document = len(self._ids)
+                self._ids.append(activity_id)
+                self._positions[activity_id] = document
+                
+                weights = {}
+                for field, text in search_fields(activity).items():
+                    for term in tokenize(text):
+                        weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS[field]
+                for term, weight in weights.items():
+                    posting = self._postings.get(term)
+                    if posting is None:
+                        posting = self._postings[term] = (array("I"), array("f"))
+                    posting[0].append(document)
+                    posting[1].append(weight)
+    
+    def search(self, text, limit, offset=0):
+        """Return the ids of the matches for text ranked offset .. offset + limit
+
+        Every term must match. Returns an empty list for a query of only stop
+        words.
+        """
+        terms = sorted(set(tokenize(text)))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if any(posting is None for posting in postings):
+                return []
+            total = len(self._ids)
+            # Copies, so appends can carry on while this ranks
+            lists = [(np.array(docs, dtype=np.uint32), np.array(weights, dtype=np.float32)) for docs, weights in postings]
+        
+        # Walk from the rarest term, keeping the documents every other term's
+        # (sorted) posting list also holds
+        lists.sort(key=lambda posting: len(posting[0]))
+        documents, weights = lists[0]
+        scores = weights * math.log(1 + total / len(documents))
+        for docs, weights in lists[1:]:
+            positions = np.minimum(np.searchsorted(docs, documents), len(docs) - 1)
+            found = docs[positions] == documents
+            documents, positions = documents[found], positions[found]
+            scores = scores[found] + weights[positions] * math.log(1 + total / len(docs))
+            if not len(documents):
+                return []
+        
+        wanted = offset + limit
+        if wanted < len(documents):
+            # Everything scoring at least the wanted-th best, ties included
+            threshold = np.partition(scores, len(scores) - wanted)[len(scores) - wanted]
+            keep = scores >= threshold
+            documents, scores = documents[keep], scores[keep]
+        order = np.lexsort((-documents.astype(np.int64), -scores))[offset:wanted]
+        with self._lock:
+            return [self._ids[document] for document in documents[order]]
\ No newline at end of file
@@ -0,0 +1,460 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .data_handler import DataHandler
+from .rollups import ROLLUP_TABLE
+from .tags import TAG_PAIR_TABLE, TAG_TABLE, tag_pairs
+from .query import ACTIVITY_FIELDS, SUMMARY_QUERY
+from .geo import bounding_box, cluster_points, coordinates, haversine_km
+from .metrics import instrument_operations
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SQLITE_PATH = os.path.join(PROJECT_ROOT, "activity_tracker.db")
+DEFAULT_MEDIA_ROOT = os.path.join(PROJECT_ROOT, "media")
+
+ACTIVITY_COLUMNS = tuple(ACTIVITY_FIELDS)
+JSON_COLUMNS = ("location", "tags", "media_urls", "thumbnail_urls")
+
+# Coordinate expressions; queries must spell them exactly like this to use
+# activities_lat_lng_idx
+LAT = "json_extract(location, '$.lat')"
+LNG = "json_extract(location, '$.lng')"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS activities (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    type TEXT CHECK (type IN ('live', 'historical')),
+    location TEXT CHECK (location IS NULL OR json_valid(location)),
+    perception_score INTEGER CHECK (perception_score BETWEEN -5 AND 5),
+    tags TEXT NOT NULL DEFAULT '[]',
+    description TEXT,
+    timer_duration INTEGER,
+    media_urls TEXT NOT NULL DEFAULT '[]',
+    thumbnail_urls TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS activities_created_at_idx ON activities (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS activities_timestamp_idx ON activities (timestamp);
+CREATE INDEX IF NOT EXISTS activities_lat_lng_idx ON activities ({LAT}, {LNG});
+
+CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+    day TEXT NOT NULL,
+    type TEXT NOT NULL,
+    activity_count INTEGER NOT NULL DEFAULT 0,
+    perception_count INTEGER NOT NULL DEFAULT 0,
+    perception_sum INTEGER NOT NULL DEFAULT 0,
+    perception_sum_sq INTEGER NOT NULL DEFAULT 0,
+    timer_duration_total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, type)
+);
+
+CREATE TABLE IF NOT EXISTS {TAG_TABLE} (
+    tag TEXT PRIMARY KEY,
+    activity_count INTEGER NOT NULL DEFAULT 0,
+    last_used_at TEXT
+);
+CREATE INDEX IF NOT EXISTS {TAG_TABLE}_prefix_idx ON {TAG_TABLE} (lower(tag));
+
+CREATE TABLE IF NOT EXISTS {TAG_PAIR_TABLE} (
+    tag TEXT NOT NULL,
+    other_tag TEXT NOT NULL,
+    activity_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tag, other_tag)
+);
+"""
+
+# date() converts offset timestamps to UTC and reads naive ones as UTC,
+# matching `(timestamp AT TIME ZONE 'UTC')::DATE` on the Supabase side
+ROLLUP_UPSERT = f"""
+INSERT INTO {ROLLUP_TABLE} AS r
+    (day, type, activity_count, perception_count, perception_sum, perception_sum_sq, timer_duration_total)
+SELECT date(:timestamp), COALESCE(:type, 'unknown'), 1,
+    :score IS NOT NULL, COALESCE(:score, 0), COALESCE(:score * :score, 0), COALESCE(:duration, 0)
+WHERE true
+ON CONFLICT (day, type) DO UPDATE SET
+    activity_count = r.activity_count + excluded.activity_count,
+    perception_count = r.perception_count + excluded.perception_count,
+    perception_sum = r.perception_sum + excluded.perception_sum,
+    perception_sum_sq = r.perception_sum_sq + excluded.perception_sum_sq,
+    timer_duration_total = r.timer_duration_total + excluded.timer_duration_total
+"""
+
+# Last-used times are normalized to UTC by datetime() so they compare as text
+TAG_UPSERT = f"""
+INSERT INTO {TAG_TABLE} AS t (tag, activity_count, last_used_at)
+VALUES (:tag, 1, datetime(:timestamp))
+ON CONFLICT (tag) DO UPDATE SET
+    activity_count = t.activity_count + 1,
+    last_used_at = max(COALESCE(t.last_used_at, ''), COALESCE(excluded.last_used_at, ''))
+"""
+
+TAG_PAIR_UPSERT = f"""
+INSERT INTO {TAG_PAIR_TABLE} AS p (tag, other_tag, activity_count)
+VALUES (?, ?, 1)
+ON CONFLICT (tag, other_tag) DO UPDATE SET activity_count = p.activity_count + 1
+"""
+
+# Columns added after the first release, created on databases that predate them
+ADDED_COLUMNS = {
+    "thumbnail_urls": "TEXT NOT NULL DEFAULT '[]'",
+}
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_initialized_paths = set()
+_search_indexes = {}
+_search_index_lock = threading.Lock()
+
+def _utc_now():
+    # Fixed-width ISO format so created_at sorts correctly as text
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+def get_connection(path):
+    """Get this thread's connection to the SQLite database, creating the schema once"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    if path not in connections:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with _schema_lock:
+            if path not in _initialized_paths:
+                connection.executescript(SCHEMA)
+                existing = {row["name"] for row in connection.execute("PRAGMA table_info(activities)")}
+                for column, definition in ADDED_COLUMNS.items():
+                    if column not in existing:
+                        connection.execute(f"ALTER TABLE activities ADD COLUMN {column} {definition}")
+                _initialized_paths.add(path)
+        connections[path] = connection
+    return connections[path]
+
+def get_search_index(path):
+    """Get the process-wide search index for the SQLite database, built from the table on first use"""
+    from .search import SearchIndex
+    
+    with _search_index_lock:
+        index = _search_indexes.get(path)
+        if index is None:
+            index = SearchIndex()
+            cursor = get_connection(path).execute(
+                "SELECT id, tags, description, location FROM activities ORDER BY created_at, id"
+            )
+            while rows := cursor.fetchmany(5000):
+                index.add([
+                    {
+                        "id": row["id"],
+                        "tags": json.loads(row["tags"]),
+                        "description": row["description"],
+                        "location": json.loads(row["location"]) if row["location"] else None
+                    }
+                    for row in rows
+                ])
+            _search_indexes[path] = index
+    return index
+
+def _index_inserted(path, activities):
+    # Waits out a build in progress, which may or may not have seen these
+    # rows; the index skips ids it already holds
+    with _search_index_lock:
+        index = _search_indexes.get(path)
+    if index is not None:
+        index.add(activities)
+
+@instrument_operations
+class SQLiteHandler(DataHandler):
+    """Activities in a local SQLite file, media in a local directory
+
+    Needs no network, so it serves as an offline development mode and a
+    stand-in backend for benchmarks. Selected with DATA_BACKEND=sqlite;
+    SQLITE_PATH and MEDIA_ROOT override the file locations.
+    """
+    
+    def __init__(self, path=None, media_root=None):
+        super().__init__()
+        self.path = path or os.getenv("SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        self.media_root = Path(media_root or os.getenv("MEDIA_ROOT", DEFAULT_MEDIA_ROOT))
+    
+    @property
+    def connection(self):
+        return get_connection(self.path)
+    
+    def _encode(self, activity):
+        row = {column: activity.get(column) for column in ACTIVITY_COLUMNS}
+        row["created_at"] = row["created_at"] or _utc_now()
+        row["location"] = json.dumps(row["location"]) if row["location"] is not None else None
+        row["tags"] = json.dumps(row["tags"] or [])
+        row["media_urls"] = json.dumps(row["media_urls"] or [])
+        row["thumbnail_urls"] = json.dumps(row["thumbnail_urls"] or [])
+        return row
+    
+    def _decode(self, row):
+        activity = dict(row)
+        for column in JSON_COLUMNS:
+            if activity.get(column) is not None:
+                activity[column] = json.loads(activity[column])
+        return activity
+    
+    def _select_columns(self, query):
+        if query.is_full:
+            return "*"
+        # Column names come from ActivityQuery, which only allows known columns
+        return ", ".join(
+            f"substr({column}, 1, {int(query.truncations[column])}) AS {column}" if column in query.truncations else column
+            for column in query.columns
+        )
+    
+    def _insert_rows(self, activities, ignore_duplicates):
+        # Runs inside the caller's transaction
+        placeholders = ", ".join(f":{column}" for column in ACTIVITY_COLUMNS)
+        verb = "INSERT OR IGNORE" if ignore_duplicates else "INSERT"
+        inserted = []
+        for activity in activities:
+            cursor = self.connection.execute(
+                f"{verb} INTO activities ({', '.join(ACTIVITY_COLUMNS)}) VALUES ({placeholders})",
+                self._encode(activity)
+            )
+            if cursor.rowcount:
+                inserted.append(activity)
+        return inserted
+    
+    def _insert_activities(self, activities, ignore_duplicates):
+        with self.connection:
+            inserted = self._insert_rows(activities, ignore_duplicates)
+        _index_inserted(self.path, inserted)
+        return inserted
+    
+    def _write_activities(self, activities, ignore_duplicates):
+        # Insert, rollups and tag index in one transaction, so the dashboard
+        # totals can't drift from the table; any error rolls back all three
+        with self.connection:
+            inserted = self._insert_rows(activities, ignore_duplicates)
+            self._upsert_rollups(inserted)
+            self._upsert_tags(inserted)
+        _index_inserted(self.path, inserted)
+        return inserted, True, True
+    
+    def _fetch_recent_activities(self, limit, query):
+        rows = self.connection.execute(
+            f"SELECT {self._select_columns(query)} FROM activities ORDER BY created_at DESC, id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._decode(row) for row in rows]
+    
+    def _fetch_activity(self, activity_id):
+        row = self.connection.execute("SELECT * FROM activities WHERE id = ?", (activity_id,)).fetchone()
+        return self._decode(row) if row else None
+    
+    def _fetch_page_rows(self, limit, cursor, backwards, query, tag=None):
+        order = "ASC" if backwards else "DESC"
+        sql = f"SELECT {self._select_columns(query)} FROM activities WHERE 1 = 1"
+        params = []
+        if cursor:
+            sql += f" AND (created_at, id) {'>' if backwards else '<'} (?, ?)"
+            params += [cursor["created_at"], cursor["id"]]
+        if tag:
+            # No GIN here: the tags are checked row by row as the index walks
+            sql += " AND EXISTS (SELECT 1 FROM json_each(activities.tags) WHERE value = ?)"
+            params.append(tag)
+        sql += f" ORDER BY created_at {order}, id {order} LIMIT ?"
+        params.append(limit)
+        return [self._decode(row) for row in self.connection.execute(sql, params).fetchall()]
+    
+    def _search_activities(self, text, limit, offset):
+        ids = get_search_index(self.path).search(text, limit, offset)
+        if not ids:
+            return []
+        rows = self.connection.execute(
+            f"SELECT {self._select_columns(SUMMARY_QUERY)} FROM activities "
+            f"WHERE id IN ({', '.join('?' * len(ids))})",
+            ids
+        ).fetchall()
+        by_id = {row["id"]: self._decode(row) for row in rows}
+        return [by_id[activity_id] for activity_id in ids if activity_id in by_id]
+    
+    def _box_rows(self, columns, box, order="", limit=None):
+        # Zero coordinates count as missing, as everywhere else
+        sql = (
+            f"SELECT {columns} FROM activities "
+            f"WHERE {LAT} BETWEEN :min_lat AND :max_lat AND {LNG} BETWEEN :min_lng AND :max_lng "
+            f"AND {LAT} != 0 AND {LNG} != 0 {order}"
+        )
+        params = dict(box)
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params["limit"] = limit
+        return self.connection.execute(sql, params).fetchall()
+    
+    def _fetch_nearby_rows(self, lat, lng, radius_km, limit):
+        rows = []
+        for row in self._box_rows(self._select_columns(SUMMARY_QUERY), bounding_box(lat, lng, radius_km)):
+            activity = self._decode(row)
+            point = coordinates(activity["location"])
+            if point:
+                activity["distance_km"] = haversine_km(lat, lng, *point)
+                if activity["distance_km"] <= radius_km:
+                    rows.append(activity)
+        rows.sort(key=lambda activity: activity["distance_km"])
+        return rows[:limit]
+    
+    def _fetch_box_rows(self, box, limit):
+        rows = self._box_rows(self._select_columns(SUMMARY_QUERY), box, "ORDER BY created_at DESC, id DESC", limit)
+        return [self._decode(row) for row in rows]
+    
+    def _fetch_location_clusters(self, box, size):
+        # No GROUP BY on floor() without SQLite's optional math functions, so
+        # the points are binned here
+        points = self._box_rows(f"{LAT}, {LNG}, perception_score", box)
+        return cluster_points([tuple(point) for point in points], size)
+    
+    def _upsert_rollups(self, activities):
+        # Runs inside the caller's transaction
+        self.connection.executemany(ROLLUP_UPSERT, [
+            {
+                "timestamp": activity.get("timestamp"),
+                "type": activity.get("type"),
+                "score": activity.get("perception_score"),
+                "duration": activity.get("timer_duration")
+            }
+            for activity in activities
+        ])
+    
+    def _update_rollups_batch(self, activities):
+        try:
+            with self.connection:
+                self._upsert_rollups(activities)
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _rebuild_rollups(self):
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {ROLLUP_TABLE}")
+            cursor = self.connection.execute(f"""
+                INSERT INTO {ROLLUP_TABLE}
+                    (day, type, activity_count, perception_count, perception_sum, perception_sum_sq, timer_duration_total)
+                SELECT date(timestamp), COALESCE(type, 'unknown'), COUNT(*),
+                    COUNT(perception_score), COALESCE(SUM(perception_score), 0),
+                    COALESCE(SUM(perception_score * perception_score), 0), COALESCE(SUM(timer_duration), 0)
+                FROM activities
+                GROUP BY 1, 2
+            """)
+        return cursor.rowcount
+    
+    def _upsert_tags(self, activities):
+        # Runs inside the caller's transaction
+        tagged = [activity for activity in activities if activity.get("tags")]
+        self.connection.executemany(TAG_UPSERT, [
+            {"tag": tag, "timestamp": activity.get("timestamp")}
+            for activity in tagged
+            for tag in set(activity["tags"])
+        ])
+        self.connection.executemany(TAG_PAIR_UPSERT, [
+            pair for activity in tagged for pair in tag_pairs(activity["tags"])
+        ])
+    
+    def _update_tag_index_batch(self, activities):
+        try:
+            with self.connection:
+                self._upsert_tags(activities)
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _rebuild_tag_index(self):
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {TAG_PAIR_TABLE}")
+            self.connection.execute(f"DELETE FROM {TAG_TABLE}")
+            self.connection.execute(f"""
+                INSERT INTO {TAG_PAIR_TABLE} (tag, other_tag, activity_count)
+                SELECT x.value, y.value, COUNT(DISTINCT a.id)
+                FROM activities a, json_each(a.tags) x, json_each(a.tags) y
+                WHERE x.value <> y.value
+                GROUP BY 1, 2
+            """)
+            cursor = self.connection.execute(f"""
+                INSERT INTO {TAG_TABLE} (tag, activity_count, last_used_at)
+                SELECT t.value, COUNT(DISTINCT a.id), MAX(datetime(a.timestamp))
+                FROM activities a, json_each(a.tags) t
+                GROUP BY 1
+            """)
+        return cursor.rowcount
+    
+    def _fetch_tag_suggestions(self, prefix, limit):
+        sql = f"SELECT tag, activity_count, last_used_at FROM {TAG_TABLE}"
+        params = []
+        if prefix:
+            # Range scan on the lower(tag) index
+            sql += " WHERE lower(tag) >= ? AND lower(tag) < ?"
+            params += [prefix, prefix + "\U0010ffff"]
+        sql += " ORDER BY activity_count DESC, tag LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.connection.execute(sql, params).fetchall()]
+    
+    def _fetch_related_tags(self, tag, limit):
+        rows = self.connection.execute(
+            f"SELECT other_tag AS tag, activity_count FROM {TAG_PAIR_TABLE} "
+            "WHERE tag = ? ORDER BY activity_count DESC LIMIT ?",
+            (tag, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def _fetch_daily_rollups(self, start_day, end_day, activity_type):
+        sql = f"SELECT * FROM {ROLLUP_TABLE} WHERE 1 = 1"
+        params = []
+        if start_day:
+            sql += " AND day >= ?"
+            params.append(str(start_day))
+        if end_day:
+            sql += " AND day <= ?"
+            params.append(str(end_day))
+        if activity_type:
+            sql += " AND type = ?"
+            params.append(activity_type)
+        sql += " ORDER BY day"
+        return [dict(row) for row in self.connection.execute(sql, params).fetchall()]
+    
+    def _fetch_dashboard_data(self, today, limit):
+        # created_at is stored in UTC; compare against local midnight in UTC
+        today_start = datetime.fromisoformat(today).astimezone(timezone.utc).isoformat(timespec="microseconds")
+        total_today = self.connection.execute(
+            "SELECT COUNT(*) FROM activities WHERE created_at >= ?", (today_start,)
+        ).fetchone()[0]
+        totals = self.connection.execute(
+            f"SELECT COALESCE(SUM(activity_count), 0), COALESCE(SUM(perception_sum), 0), "
+            f"COALESCE(SUM(perception_count), 0) FROM {ROLLUP_TABLE}"
+        ).fetchone()
+        total_all_time, perception_sum, perception_count = totals
+        return {
+            "stats": {
+                "total_today": total_today,
+                "avg_perception": round(perception_sum / perception_count, 2) if perception_count else 0,
+                "total_all_time": total_all_time
+            },
+            "recent": self._fetch_recent_activities(limit, SUMMARY_QUERY) if limit else []
+        }
+    
+    def _existing_media_url(self, file_path):
+        destination = self.media_root / file_path
+        return destination.resolve().as_uri() if destination.is_file() else None
+    
+    def _store_media(self, file_path, file_bytes, content_type):
+        destination = self.media_root / file_path
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(file_bytes)
+        return destination.resolve().as_uri()
+    
+    def _store_media_stream(self, file_path, file, size, content_type):
+        destination = self.media_root / file_path
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        file.seek(0)
+        with open(destination, "wb") as target:
+            shutil.copyfileobj(file, target, length=1024 * 1024)
+        return destination.resolve().as_uri()
\ No newline at end of file
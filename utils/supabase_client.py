@@ -1,27 +1,97 @@
 import streamlit as st
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
 
-load_dotenv()
+# The supabase package takes about half a second to import, so it is only
+# imported once a client is actually needed
+if TYPE_CHECKING:
+    from supabase import Client, AsyncClient
+
+# Transport shared by every session's requests: connecting (including the TLS
+# handshake) should fail fast, while reads and uploads may legitimately be slow
+HTTP_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "30"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("SUPABASE_WRITE_TIMEOUT", "60"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+# Idle connections kept open for reuse, and for how many seconds
+HTTP_KEEPALIVE_CONNECTIONS = 10
+HTTP_KEEPALIVE_EXPIRY = 120
+
+def http_client_settings():
+    """Keyword arguments for the httpx clients that carry Supabase requests
+
+    HTTP/2 is used when the h2 package is installed, so concurrent requests
+    share one connection instead of queueing for a free one.
+    """
+    import httpx
+    
+    return {
+        "timeout": httpx.Timeout(
+            connect=HTTP_CONNECT_TIMEOUT,
+            read=HTTP_READ_TIMEOUT,
+            write=HTTP_WRITE_TIMEOUT,
+            pool=HTTP_CONNECT_TIMEOUT
+        ),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        "http2": find_spec("h2") is not None,
+        "follow_redirects": True
+    }
 
 @st.cache_resource
-def get_supabase_client() -> Client:
-    """Get cached Supabase client instance"""
+def get_http_client():
+    """Get the process-wide HTTP client (and connection pool) for sync Supabase requests"""
+    import httpx
+    
+    return httpx.Client(**http_client_settings())
+
+def _credentials():
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_ANON_KEY")
     
     if not url or not key:
         raise ValueError("Missing Supabase environment variables. Check your .env file.")
+    return url, key
+
+@st.cache_resource
+def get_supabase_client() -> "Client":
+    """Get cached Supabase client instance
+
+    Database, storage and auth requests all go through get_http_client(), so
+    they share one pool of warm connections.
+    """
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+    
+    url, key = _credentials()
+    return create_client(url, key, options=SyncClientOptions(httpx_client=get_http_client()))
+
+async def create_async_supabase_client() -> "AsyncClient":
+    """Create a Supabase client for asyncio code, bound to the running event loop"""
+    import httpx
+    from supabase import create_async_client
+    from supabase.lib.client_options import AsyncClientOptions
     
-    return create_client(url, key)
+    url, key = _credentials()
+    options = AsyncClientOptions(httpx_client=httpx.AsyncClient(**http_client_settings()))
+    return await create_async_client(url, key, options=options)
+
+def health_check_request(client):
+    """A HEAD request against the activities table: proves the API, key and table work but returns no rows
+
+    Works with both the sync and the async client; call execute() (or await
+    it) on the result.
+    """
+    return client.table("activities").select("id", head=True).limit(1)
 
 def test_connection() -> bool:
     """Test connection to Supabase"""
     try:
-        client = get_supabase_client()
-        # Try a simple query to test connection
-        result = client.table("activities").select("count").execute()
+        health_check_request(get_supabase_client()).execute()
         return True
     except Exception as e:
         st.error(f"Connection failed: {str(e)}")
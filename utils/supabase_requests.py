@@ -0,0 +1,146 @@
+from .query import FULL_QUERY, SUMMARY_QUERY, postgrest_select
+from .rollups import ROLLUP_TABLE
+from .tags import TAG_PAIR_TABLE, TAG_TABLE, escape_like
+
+# PostgREST's error code for an RPC whose function doesn't exist
+MISSING_FUNCTION_CODE = "PGRST202"
+
+# Every perception score the activities table allows
+PERCEPTION_SCORES = range(-5, 6)
+
+# PostgREST request builders shared by SupabaseHandler and AsyncSupabaseHandler.
+# Each takes either client and returns an unexecuted request; call execute()
+# on it, or await it with the async client. Builders that select activity
+# columns go through postgrest_select, so build them again after
+# handle_preview_error to retry without description_preview.
+
+def is_missing_function(error):
+    """Return True if error is PostgREST reporting that the called function doesn't exist"""
+    from postgrest.exceptions import APIError
+    
+    return isinstance(error, APIError) and error.code == MISSING_FUNCTION_CODE
+
+def result_rows(result):
+    """Rows of an executed request, or [] when there are none"""
+    return result.data if result.data else []
+
+def activities_request(client, query):
+    return client.table("activities").select(postgrest_select(query))
+
+def recent_activities_request(client, limit, query):
+    return activities_request(client, query).order("created_at", desc=True).limit(limit)
+
+def activity_request(client, activity_id):
+    return activities_request(client, FULL_QUERY).eq("id", activity_id).limit(1)
+
+def page_rows_request(client, limit, cursor, backwards, query, tag=None):
+    request = activities_request(client, query)
+    if tag:
+        # tags @> {tag}, served by the GIN index on tags
+        request = request.contains("tags", [tag])
+    if cursor:
+        # Row-value comparison (created_at, id) < (cursor) spelled out for PostgREST
+        op = "gt" if backwards else "lt"
+        created_at = f'"{cursor["created_at"]}"'
+        request = request.or_(
+            f"created_at.{op}.{created_at},and(created_at.eq.{created_at},id.{op}.{cursor['id']})"
+        )
+    return (
+        request.order("created_at", desc=not backwards)
+        .order("id", desc=not backwards)
+        .limit(limit)
+    )
+
+def box_rows_request(client, box, limit):
+    return (
+        activities_request(client, SUMMARY_QUERY)
+        .gte("lat", box["min_lat"]).lte("lat", box["max_lat"])
+        .gte("lng", box["min_lng"]).lte("lng", box["max_lng"])
+        .order("created_at", desc=True).limit(limit)
+    )
+
+def search_request(client, text, limit, offset):
+    # Ranked in Postgres over the GIN-indexed search_vector column by the
+    # `search_activities` function (see README)
+    return client.rpc(
+        "search_activities",
+        {"search_query": text, "result_limit": limit, "result_offset": offset}
+    )
+
+def nearby_rows_request(client, lat, lng, radius_km, limit):
+    # Box prefilter on the (lat, lng) index and exact distances in
+    # Postgres, through the `activities_near` function (see README)
+    return client.rpc(
+        "activities_near",
+        {"center_lat": lat, "center_lng": lng, "radius_km": radius_km, "result_limit": limit}
+    )
+
+def location_clusters_request(client, box, size):
+    return client.rpc("get_location_clusters", {**box, "cell_size": size})
+
+def daily_rollups_request(client, start_day, end_day, activity_type):
+    request = client.table(ROLLUP_TABLE).select("*")
+    if start_day:
+        request = request.gte("day", str(start_day))
+    if end_day:
+        request = request.lte("day", str(end_day))
+    if activity_type:
+        request = request.eq("type", activity_type)
+    return request.order("day")
+
+def tag_suggestions_request(client, prefix, limit):
+    request = client.table(TAG_TABLE).select("tag,activity_count,last_used_at")
+    if prefix:
+        # Range scan on the text_pattern_ops index over tag_lower
+        request = request.like("tag_lower", f"{escape_like(prefix)}%")
+    return request.order("activity_count", desc=True).order("tag").limit(limit)
+
+def related_tags_request(client, tag, limit):
+    return (
+        client.table(TAG_PAIR_TABLE).select("tag:other_tag,activity_count")
+        .eq("tag", tag).order("activity_count", desc=True).limit(limit)
+    )
+
+def dashboard_summary_request(client, today, limit):
+    return client.rpc("get_dashboard_summary", {"today_start": today, "recent_limit": limit})
+
+def dashboard_from_summary(summary):
+    """Dashboard data from the get_dashboard_summary result"""
+    summary = summary or {}
+    return {
+        "stats": {
+            "total_today": summary.get("total_today") or 0,
+            "avg_perception": round(float(summary.get("avg_perception") or 0), 2),
+            "total_all_time": summary.get("total_all_time") or 0
+        },
+        "recent": summary.get("recent") or []
+    }
+
+def dashboard_count_requests(client, today):
+    """Exact-count head requests for a database without get_dashboard_summary
+
+    Keyed "today", "total" and then each perception score. Scores only take
+    eleven values, so counting each one gives the exact average without
+    downloading any rows (or running into PostgREST's max-rows cap).
+    """
+    activities = client.table("activities")
+    requests = {
+        "today": activities.select("id", count="exact", head=True).gte("created_at", today),
+        "total": activities.select("id", count="exact", head=True)
+    }
+    for score in PERCEPTION_SCORES:
+        requests[score] = activities.select("id", count="exact", head=True).eq("perception_score", score)
+    return requests
+
+def dashboard_from_counts(counts, recent):
+    """Dashboard data from the dashboard_count_requests counts ({key: count}) and the recent rows"""
+    scored = sum(counts[score] for score in PERCEPTION_SCORES)
+    score_total = sum(score * counts[score] for score in PERCEPTION_SCORES)
+    return {
+        "stats": {
+            "total_today": counts["today"],
+            "avg_perception": round(score_total / scored, 2) if scored else 0,
+            "total_all_time": counts["total"]
+        },
+        "recent": recent
+    }
\ No newline at end of file
@@ -0,0 +1,55 @@
+import argparse
+from itertools import permutations
+
+TAG_TABLE = "activity_tags"
+TAG_PAIR_TABLE = "activity_tag_pairs"
+
+# Tags offered by the entry forms, most used first
+TAG_SUGGESTION_LIMIT = 500
+
+def parse_tags(tags):
+    """Turn a comma-separated string or a list into clean tags
+
+    Whitespace is trimmed and repeated spaces collapsed. A tag that differs
+    from an earlier one only by case is dropped, so "Work, work" stores one
+    tag, spelled as first typed.
+    """
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    cleaned = []
+    seen = set()
+    for tag in tags or []:
+        tag = " ".join(str(tag).split())
+        if tag and tag.lower() not in seen:
+            seen.add(tag.lower())
+            cleaned.append(tag)
+    return cleaned
+
+def tag_row_from_activity(activity):
+    """Get the RPC arguments that fold one inserted activity into the tag index"""
+    return {
+        "activity_timestamp": activity.get("timestamp"),
+        "tags": sorted(set(activity.get("tags") or []))
+    }
+
+def tag_pairs(tags):
+    """Ordered (tag, other_tag) pairs of distinct tags, both ways round"""
+    return list(permutations(sorted(set(tags or [])), 2))
+
+def escape_like(prefix):
+    """Escape LIKE wildcards in a user-typed prefix (backslash is the escape character)"""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the activity_tags and activity_tag_pairs tables")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: recompute the tag index from the activities table")
+    args = parser.parse_args()
+    
+    from .data_handler import get_data_handler
+    
+    if args.command == "rebuild":
+        tag_count = get_data_handler().rebuild_tag_index()
+        print(f"Rebuilt index for {tag_count} tags")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,134 @@
+import base64
+import threading
+import time
+
+import httpx
+
+TUS_VERSION = "1.0.0"
+
+# Supabase Storage only accepts 6 MB chunks on its resumable endpoint
+DEFAULT_CHUNK_SIZE = 6 * 1024 * 1024
+
+class TusUploadError(Exception):
+    """Raised when a resumable upload cannot be created or completed"""
+
+class UploadResumeStore:
+    """Remembers unfinished uploads so a retried submit can pick up where it stopped
+
+    Keyed by the object path, which is derived from the file's content
+    hash. Lives for the life of the process, which covers form resubmits
+    after a dropped connection.
+    """
+    
+    def __init__(self):
+        self._uploads = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            return self._uploads.get(key)
+    
+    def set(self, key, upload):
+        with self._lock:
+            self._uploads[key] = upload
+    
+    def remove(self, key):
+        with self._lock:
+            self._uploads.pop(key, None)
+
+def _encode_metadata(metadata):
+    return ",".join(
+        f"{key} {base64.b64encode(str(value).encode('utf-8')).decode('ascii')}"
+        for key, value in metadata.items()
+    )
+
+class TusUploader:
+    """Client for the tus 1.0 resumable upload protocol
+
+    The file is sent in fixed-size PATCH requests read straight from the
+    file object, so memory use is bounded by chunk_size. After a failed
+    chunk the server's confirmed offset is re-read with HEAD and the upload
+    continues from there.
+    """
+    
+    def __init__(self, endpoint, headers=None, chunk_size=DEFAULT_CHUNK_SIZE, max_retries=5,
+                 retry_delay=1, timeout=60, http_client=None):
+        self.endpoint = endpoint
+        self.headers = dict(headers or {})
+        self.headers["Tus-Resumable"] = TUS_VERSION
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.http_client = http_client or httpx.Client(timeout=timeout)
+    
+    def create(self, size, metadata):
+        """Create an upload on the server and return its URL"""
+        response = self.http_client.post(
+            self.endpoint,
+            headers={
+                **self.headers,
+                "Upload-Length": str(size),
+                "Upload-Metadata": _encode_metadata(metadata)
+            }
+        )
+        if response.status_code != 201 or "Location" not in response.headers:
+            raise TusUploadError(f"Could not create upload: HTTP {response.status_code} {response.text}")
+        # Location may be relative to the endpoint
+        return str(httpx.URL(self.endpoint).join(response.headers["Location"]))
+    
+    def get_offset(self, upload_url):
+        """Return how many bytes the server has confirmed, or None if the upload is gone"""
+        response = self.http_client.head(upload_url, headers=self.headers)
+        if response.status_code in (404, 410):
+            return None
+        if not response.is_success or "Upload-Offset" not in response.headers:
+            raise TusUploadError(f"Could not read upload offset: HTTP {response.status_code}")
+        return int(response.headers["Upload-Offset"])
+    
+    def upload(self, file, size, metadata, upload_url=None, on_created=None):
+        """Send file (a seekable binary file object) and return the upload URL
+
+        Pass the upload_url of an earlier, interrupted attempt to resume it.
+        on_created(upload_url) is called once the upload exists on the server,
+        so callers can remember it for a later resume.
+        """
+        offset = self.get_offset(upload_url) if upload_url else None
+        if offset is None:
+            upload_url = self.create(size, metadata)
+            offset = 0
+            if on_created:
+                on_created(upload_url)
+        
+        failures = 0
+        while offset < size:
+            file.seek(offset)
+            chunk = file.read(self.chunk_size)
+            try:
+                response = self.http_client.patch(
+                    upload_url,
+                    content=chunk,
+                    headers={
+                        **self.headers,
+                        "Upload-Offset": str(offset),
+                        "Content-Type": "application/offset+octet-stream"
+                    }
+                )
+                if response.status_code != 204:
+                    raise TusUploadError(f"Chunk at offset {offset} rejected: HTTP {response.status_code} {response.text}")
+                offset = int(response.headers.get("Upload-Offset", offset + len(chunk)))
+                failures = 0
+            except (httpx.TransportError, TusUploadError):
+                failures += 1
+                if failures > self.max_retries:
+                    raise
+                time.sleep(self.retry_delay * 2 ** (failures - 1))
+                # Resume from whatever the server actually stored
+                try:
+                    confirmed = self.get_offset(upload_url)
+                except httpx.TransportError:
+                    continue
+                if confirmed is None:
+                    raise TusUploadError("Upload expired on the server")
+                offset = confirmed
+        
+        return upload_url
\ No newline at end of file
@@ -0,0 +1,183 @@
+import streamlit as st
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_QUEUE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".activity_queue.db")
+
+FLUSH_BATCH_SIZE = 100
+POLL_INTERVAL = 5
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 300
+MAX_ATTEMPTS = 8
+
+class ActivityQueue:
+    """Durable local queue for activities waiting to be written to the backend
+
+    Activities are committed to a SQLite file (WAL mode) before the form
+    returns, so a slow or unreachable backend never loses a submission. A
+    background worker flushes them in batches, retrying with exponential
+    backoff. Each activity gets its id at enqueue time and is flushed with
+    duplicate ids ignored, so a retry after a lost response can't insert it twice.
+    """
+    
+    def __init__(self, path=DEFAULT_QUEUE_PATH, handler_factory=None):
+        self.path = path
+        self.handler_factory = handler_factory
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS queued_activities (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                status TEXT NOT NULL DEFAULT 'pending'
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS queued_activities_due_idx ON queued_activities (status, next_attempt_at)"
+        )
+        self._connection.commit()
+    
+    def enqueue(self, activity_data):
+        """Persist an activity locally and return its id"""
+        activity = dict(activity_data)
+        activity.setdefault("id", str(uuid.uuid4()))
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO queued_activities (id, payload, enqueued_at, next_attempt_at) VALUES (?, ?, ?, ?)",
+                (activity["id"], json.dumps(activity), now, now)
+            )
+            self._connection.commit()
+        self._wake.set()
+        return activity["id"]
+    
+    def counts(self):
+        """Return the number of pending and failed activities"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT status, COUNT(*) FROM queued_activities GROUP BY status"
+            ).fetchall()
+        counts = {"pending": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+    
+    def failed_activities(self):
+        """Return activities that exhausted their retries, with the last error"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT payload, attempts, last_error FROM queued_activities WHERE status = 'failed' ORDER BY enqueued_at"
+            ).fetchall()
+        return [
+            {"activity": json.loads(payload), "attempts": attempts, "error": error}
+            for payload, attempts, error in rows
+        ]
+    
+    def retry_failed(self):
+        """Move failed activities back to pending for another round of retries"""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE queued_activities SET status = 'pending', attempts = 0, next_attempt_at = ? WHERE status = 'failed'",
+                (time.time(),)
+            )
+            self._connection.commit()
+        self._wake.set()
+    
+    def start_worker(self):
+        """Start the background flush thread if it isn't running"""
+        if self._worker and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._run, name="activity-queue-flush", daemon=True)
+        self._worker.start()
+    
+    def flush(self, db_handler):
+        """Send every due activity to the backend, returning how many were written"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, payload, attempts FROM queued_activities "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY enqueued_at LIMIT ?",
+                (time.time(), FLUSH_BATCH_SIZE)
+            ).fetchall()
+        if not rows:
+            return 0
+        
+        # First attempts go out as one batch; retried rows go one at a time so
+        # a single bad row can't keep failing the rest of the batch
+        fresh = [row for row in rows if row[2] == 0]
+        retried = [row for row in rows if row[2] > 0]
+        groups = ([fresh] if fresh else []) + [[row] for row in retried]
+        
+        written = 0
+        for group in groups:
+            activities = [json.loads(payload) for _, payload, _ in group]
+            report = db_handler.add_activities_batch(activities, chunk_size=len(activities), ignore_duplicates=True)
+            if report["failed_chunks"]:
+                self._mark_failed_attempt(group, report["failed_chunks"][0]["error"])
+            else:
+                self._remove(group)
+                written += len(group)
+        return written
+    
+    def _remove(self, group):
+        with self._lock:
+            self._connection.executemany("DELETE FROM queued_activities WHERE id = ?", [(row[0],) for row in group])
+            self._connection.commit()
+    
+    def _mark_failed_attempt(self, group, error):
+        now = time.time()
+        updates = []
+        for activity_id, _, attempts in group:
+            attempts += 1
+            status = "failed" if attempts >= MAX_ATTEMPTS else "pending"
+            delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+            updates.append((attempts, now + delay, error, status, activity_id))
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE queued_activities SET attempts = ?, next_attempt_at = ?, last_error = ?, status = ? WHERE id = ?",
+                updates
+            )
+            self._connection.commit()
+    
+    def _run(self):
+        db_handler = None
+        while True:
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+            try:
+                if db_handler is None:
+                    db_handler = self.handler_factory()
+                # Keep draining while full batches come back
+                while self.flush(db_handler) >= FLUSH_BATCH_SIZE:
+                    pass
+            except Exception:
+                # Backend unreachable (or not configured yet); try again next poll
+                time.sleep(RETRY_BASE_DELAY)
+
+def show_queue_status(queue):
+    """Show pending and failed queue counts, with a retry button for failures"""
+    counts = queue.counts()
+    if counts["pending"]:
+        st.info(f"🔄 {counts['pending']} activit{'y' if counts['pending'] == 1 else 'ies'} waiting to sync")
+    if counts["failed"]:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.warning(f"⚠️ {counts['failed']} activit{'y' if counts['failed'] == 1 else 'ies'} failed to sync")
+        with col2:
+            if st.button("🔁 Retry Sync", use_container_width=True):
+                queue.retry_failed()
+                st.rerun()
+        with st.expander("View failed activities"):
+            for failed in queue.failed_activities():
+                st.write(f"**{failed['activity'].get('timestamp', 'N/A')}** - {failed['activity'].get('description', '')[:50]}")
+                st.caption(f"{failed['attempts']} attempts, last error: {failed['error']}")
\ No newline at end of file